@@ -1,11 +1,11 @@
 from ..utils import np, pygeos, GeometryError
 from ..utils import path, parseFile, mixItemListToList
 from ..utils.constant import geom
-from ..geometry.element import MoosasGeometry
+from ..geometry.element import MoosasGeometry, MoosasGeometryStore
 from ._obj import _readObj
 
 
-def writeGeo(file_path, model=None, geoList=None, mask=None) -> str:
+def writeGeo(file_path, model=None, geoList=None, mask=None, instanced=False) -> str:
     """Get a *.geo file for the geometry library in the model
 
     .geo is a moosasPy dedicated file format, which uses a simplified file structure to increase I/O speed......
@@ -53,11 +53,16 @@ def writeGeo(file_path, model=None, geoList=None, mask=None) -> str:
     ;
     ...
 
+    A translated copy of a written face can be written as an instance block:
+    i,{source polygon number idd},{polygon number idd},{translation x},{translation y},{translation z}
+    ;
+
     Args:
         file_path(str): output geo file path
         model(MoosasModel): model to export
         geoList(list(MoosasGeometry)): list of geometry objects to export
         mask(list[int]): mask for the geometry index in the geometry library. default is None
+        instanced(bool): write the repeated faces as instance blocks, only moosas reads them. default is False
 
     Returns:
         geo file string
@@ -75,21 +80,8 @@ def writeGeo(file_path, model=None, geoList=None, mask=None) -> str:
         geoIdSet = set([])
         for f in model.getAllFaces():
             geoIdSet = geoIdSet.union(mixItemListToList(f.faceId))
-        geoIdSet = [model.geoId.index(faceId) for faceId in geoIdSet]
-        geoList += list(np.array(model.geometryList)[list(geoIdSet)])
-    geoStr = ''
-    for geo in geoList:
-        faceStr = 'f,' + str(geo.category) + ',' + str(geo.faceId) + '\n'
-        faceStr += 'fn,'
-        faceStr += ','.join([str(x) for x in pygeos.get_coordinates(geo.normal, include_z=True)[0]]) + '\n'
-        rings = pygeos.get_rings(geo.face)
-        for poi in pygeos.get_coordinates(rings[0], include_z=True)[:-1]:
-            faceStr += 'fv,' + ','.join(poi.astype(str)) + '\n'
-        if len(rings) > 1:
-            for i in range(1, len(rings)):
-                for poi in pygeos.get_coordinates(rings[i], include_z=True)[:-1]:
-                    faceStr += f'fh,{i - 1},' + ','.join(poi.astype(str)) + '\n'
-        geoStr += faceStr + ';\n'
+        geoList += [model.getGeo(faceId) for faceId in geoIdSet]
+    geoStr = MoosasGeometryStore(geoList, bind=False).toGeoString(instanced=instanced)
     with open(file_path, 'w+') as f:
         f.write(geoStr)
     return geoStr
@@ -133,7 +125,7 @@ def geoLegacyToGeo(file_path, geo_path=None):
     writeGeo(geo_path, model)
 
 
-def _readGeo(file_path) -> list[MoosasGeometry]:
+def _readGeo(file_path, lazy=False) -> list[MoosasGeometry]:
     """
     .geo is a moosasPy dedicated file format, which uses a simplified file structure to increase I/O speed......
     The .geo file format is: (cat: 0 is the opaque surface, 1 is the translucent surface, and 2 is the air wall)
@@ -179,21 +171,38 @@ def _readGeo(file_path) -> list[MoosasGeometry]:
     fh,1,12.5,10.7,1.8
     ;
     ...
+    i,{source polygon number idd},{polygon number idd},{translation x},{translation y},{translation z}
+    ;
+    An instance block copies a face written before it, see writeGeo().
 
-
+    if lazy, the faces are kept as coordinates and the polygons are built on first access, see MoosasGeometry.
     """
     blocks = parseFile(file_path)
     cat, idd, normal, faces, holes = [], [], [], [], []
+    sources = {}  # {id: (position in cat/idd, normal, faces, raw hole coordinates)} for the instance blocks
     for blk in blocks:
-        coordinates, holeCoordinates = [], {}
+        coordinates, holeCoordinates, rawHoles = [], {}, {}
         for li in blk:
+            if li[0] == "i":
+                if li[1] not in sources:
+                    print(f"******Waring: FileError: ignore face {li[2]}: source {li[1]} not found")
+                    continue
+                (iCat, iNormal, iFace, rawHoles), translation = sources[li[1]], np.array(li[3:6]).astype(float)
+                cat.append(cat[iCat])
+                idd.append(li[2])
+                normal.append(normal[iNormal])
+                faces.append(faces[iFace] + translation)
+                holes.append([geom.round(np.vstack([hole, hole[:1]]) + translation, geom.POINT_PRECISION)
+                              for hole in rawHoles])
+                continue
             if li[0] == "f":
                 cat.append(int(float(li[1])))
                 idd.append(li[2])
                 continue
             if li[0] == "fn":
                 try:
-                    normal.append(pygeos.points(np.array(li[1:]).astype(float)))
+                    nor = np.array(li[1:]).astype(float)
+                    normal.append(nor if lazy else pygeos.points(nor))
                 except:
                     print('******Warning: FileError, empty face normal.')
                     normal.append(None)
@@ -206,19 +215,25 @@ def _readGeo(file_path) -> list[MoosasGeometry]:
                 if li[1] not in holeCoordinates:
                     holeCoordinates[li[1]] = []
                 coor = np.array(li[2:]).astype(float)
+                rawHoles.setdefault(li[1], []).append(coor)
                 coor = geom.round(coor, geom.POINT_PRECISION)
                 holeCoordinates[li[1]].append(list(coor))
                 continue
         if len(coordinates) > 2:
-            faces.append(pygeos.polygons(coordinates + [coordinates[0]]))
-            holes.append([pygeos.polygons(holeCoordinates[coors] + [holeCoordinates[coors][0]]) for coors in
+            sources[idd[-1]] = (len(idd) - 1, len(normal) - 1, len(faces), [np.array(h) for h in rawHoles.values()])
+            faces.append(np.array(coordinates + [coordinates[0]]))
+            holes.append([np.array(holeCoordinates[coors] + [holeCoordinates[coors][0]]) for coors in
                           holeCoordinates.keys()])
 
-    faces = _roundPolygons(faces, geom.POINT_PRECISION)
+    faces = _roundCoordinates(faces, geom.POINT_PRECISION)
+    if not lazy:
+        faces = [pygeos.polygons(coors) for coors in faces]
+        holes = [[pygeos.polygons(coors) for coors in h] for h in holes]
     geos: list[MoosasGeometry] = []
     for f, i, n, c, h in zip(faces, idd, normal, cat, holes):
         try:
-            geos.append(MoosasGeometry(f, i, n, c, h, errors='raise'))
+            # the face without normal is checked at once as it is probably broken
+            geos.append(MoosasGeometry(f, i, n, c, h, errors='raise', lazy=lazy and n is not None))
         except GeometryError as gE:
             print(f"******Waring: FileError: ignore face {i}: {gE.reason}")
     # for aperture,nor in zip (holes,normal):
@@ -240,12 +255,25 @@ def _roundPolygons(polygons: np.ndarray[pygeos.Geometry], precision: float) -> n
         Returns:
             np.ndarray rounded polygons
     """
-    coordinates, coorLengthIndex = [], [0]
-    for p in polygons:
-        coor = pygeos.get_coordinates(p, include_z=True)
-        coordinates += list(coor)
-        coorLengthIndex += [coorLengthIndex[-1] + len(coor)]
-    coordinates = np.array(coordinates)
+    coordinates = _roundCoordinates([pygeos.get_coordinates(p, include_z=True) for p in polygons], precision)
+    return np.array([pygeos.polygons(coors) for coors in coordinates])
+
+
+def _roundCoordinates(coordinateList: list[np.ndarray], precision: float) -> list[np.ndarray]:
+    """
+    the coordinates version of _roundPolygons, which do not build any polygon.
+
+        Args:
+            coordinateList(list[np.ndarray]): (n,3) coordinates of the polygons
+            precision(float): round precision, usually would be geom.POINT_PRECISION
+
+        Returns:
+            list of rounded (n,3) coordinates
+    """
+    if len(coordinateList) == 0:
+        return []
+    coorLengthIndex = np.concatenate([[0], np.cumsum([len(coor) for coor in coordinateList])])
+    coordinates = np.concatenate(coordinateList).astype(float)
     for dim in range(3):
         xIndex = np.argsort(coordinates[:, dim].flatten())
         xReindex = np.argsort(xIndex)
@@ -255,8 +283,7 @@ def _roundPolygons(polygons: np.ndarray[pygeos.Geometry], precision: float) -> n
                 coordinates[i + 1][dim] = coordinates[i][dim]
         coordinates = coordinates[xReindex]
     coordinates = geom.round(coordinates, precision)
-    coordinates = [coordinates[idxS:idxE] for idxS, idxE in zip(coorLengthIndex[:-1], coorLengthIndex[1:])]
-    return np.array([pygeos.polygons(coors) for coors in coordinates])
+    return [coordinates[idxS:idxE] for idxS, idxE in zip(coorLengthIndex[:-1], coorLengthIndex[1:])]
 
 
 def _readGeoLegacy(file_path) -> list[MoosasGeometry]:
@@ -369,7 +369,7 @@ class MoosasGraph(Graph):
             for element in ifcElement:
                 self.encode2LSB(space.id, element)
 
-    def decodeGeo(self, geoUri, model: MoosasModel = None) -> MoosasGeometry:
+    def decodeGeo(self, geoUri, model: MoosasModel = None, lazy=False) -> MoosasGeometry:
         if isinstance(geoUri, str):
             geoUri = URIRef(str(geoUri))
         faceId = self.getObject(geoUri, self.moosas.faceId)
@@ -379,11 +379,16 @@ class MoosasGraph(Graph):
                 return geo[0]
         cat = int(float(self.getObject(geoUri, self.moosas.Category)))
         face = URIRef(str(self.getObject(geoUri, self.geo.hasGeometry)))
-        face = pygeos.Geometry(self.getObject(face, self.geo.asWKT))
+        face = self.getObject(face, self.geo.asWKT)
         holes = [self.getObject(URIRef(str(hole)), self.geo.asWKT) for hole in
-                 self.getObject(geoUri, self.moosas.hasHole)]
-        holes = [pygeos.Geometry(str(h)) for h in holes]
-        return MoosasGeometry(face=face, faceId=faceId, category=cat, holes=holes, errors="raise")
+                 mixItemListToList(self.getObject(geoUri, self.moosas.hasHole))]
+        if lazy:
+            face = _wktCoordinates(str(face))
+            holes = [_wktCoordinates(str(h)) for h in holes]
+        else:
+            face = pygeos.Geometry(str(face))
+            holes = [pygeos.Geometry(str(h)) for h in holes]
+        return MoosasGeometry(face=face, faceId=faceId, category=cat, holes=holes, errors="raise", lazy=lazy)
 
     def decodeElement(self, elementUri, model: MoosasModel = None) -> MoosasElement | None:
         if isinstance(elementUri, str):
@@ -450,7 +455,13 @@ def writeRDF(model: MoosasModel, out_path: str, fileFormat="turtle", dumpUseless
     return g
 
 
-def loadRDF(input_path: str, fileFormat="turtle") -> MoosasModel:
+def _wktCoordinates(wkt: str) -> np.ndarray:
+    """read the coordinates of the first ring of a wkt polygon without building the geometry"""
+    ring = wkt[wkt.index('(') :].strip('( )').split(')')[0]
+    return np.array([point.split() for point in ring.split(',')], dtype=float)
+
+
+def loadRDF(input_path: str, fileFormat="turtle", lazy=False) -> MoosasModel:
     rdfGraph = MoosasGraph.load(input_path, fileFormat=fileFormat)
     model = MoosasModel()
 
@@ -479,7 +490,7 @@ def loadRDF(input_path: str, fileFormat="turtle") -> MoosasModel:
     # construct geometryList
     model.geometryList = []
     for i, geoUri in enumerate(geoList):
-        model.geometryList.append(rdfGraph.decodeGeo(geoUri))
+        model.geometryList.append(rdfGraph.decodeGeo(geoUri, lazy=lazy))
         print(f'\rLOADING: Geometry {i + 1}/{len(geoList)}', end='')
     model.geoId = [geo.faceId for geo in model.geometryList]
     model.newIndex = len(model.geometryList)
@@ -9,7 +9,7 @@ from ._json import _readGeojson,writeJson,writeGeojson
 from ._idf import writeIDF
 from ..utils import path
 
-def modelFromFile(inputPath: str, inputType=None):
+def modelFromFile(inputPath: str, inputType=None, lazy=False):
     """Get a MoosasModel from geometry file *.geo,*.xml,*.obj,*.json(geoJson)
 
     please check the file requirement in each function:
@@ -19,6 +19,8 @@ def modelFromFile(inputPath: str, inputType=None):
     Args:
         inputPath(str): input geometry file.
         inputType(str): input file type. If None the type will be interpreted from the file directly (default: None)
+        lazy(bool): keep the raw coordinates and build the polygons on first access, only *.geo supported.
+            It is faster and lighter for the files written by moosas itself (default: False)
 
     Returns:
         model(MoosasModel): the MoosasModel contain the geometry data.
@@ -32,7 +34,7 @@ def modelFromFile(inputPath: str, inputType=None):
     from ..models import MoosasModel
     model = MoosasModel()
     if inputPath[len(inputPath) - 4:len(inputPath)] == '.geo' or inputType == 'geo':
-        model.geometryList = _readGeo(inputPath)
+        model.geometryList = _readGeo(inputPath, lazy=lazy)
     # elif inputPath[len(inputPath) - 4:len(inputPath)] == '.xml' or inputType == 'xml':
     #     model.geometryList = _readXml(inputPath)
     elif inputPath[len(inputPath) - 4:len(inputPath)] == '.obj' or inputType == 'obj':
@@ -106,7 +106,7 @@ def modelToRad(model: MoosasModel, date: datetime, skyType, lat, lon, diff=10000
     return radStr
 
 def triOpaque(moFace:MoosasElement)->list[pygeos.Geometry]:
-    proj = Projection(origin=np.mean(pygeos.get_coordinates(moFace.face, include_z=True), axis=0), unitZ=moFace.normal)
+    proj = Projection.cached(origin=np.mean(pygeos.get_coordinates(moFace.face, include_z=True), axis=0), unitZ=moFace.normal)
     baseFace = mixItemListToList(moFace.face)
     baseBrep,holes=[],[]
     for face in baseFace:
@@ -115,13 +115,12 @@ def triOpaque(moFace:MoosasElement)->list[pygeos.Geometry]:
             holes+=list(pygeos.get_rings(face))[1:]
     for gls in moFace.glazingElement:
         holes.append(gls.representation())
-    baseBrep = [proj.toUV(face) for face in baseBrep]
-    baseBrep = pygeos.union_all(baseBrep)
-    holes = [proj.toUV(face) for face in holes]
+    baseBrep = pygeos.union_all(proj.toUVArray(baseBrep))
+    holes = proj.toUVArray(holes)
     for h in holes:
         baseBrep = pygeos.difference(baseBrep,h)
     baseBrep = pygeos.delaunay_triangles(baseBrep)
-    baseBrep = [proj.toWorld(tri) for tri in pygeos.get_parts(baseBrep)]
+    baseBrep = list(proj.toWorldArray(pygeos.get_parts(baseBrep)))
     return baseBrep
 def spaceToRad(space: MoosasSpace, date: datetime, skyType, lat, lon, diff=10000,
                radPath=rf"{path.libDir}\rad\model.rad"):
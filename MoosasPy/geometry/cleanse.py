@@ -1,19 +1,28 @@
 # 去重方法
 from __future__ import annotations
 import copy
+import io
+import pickle
+import contextlib
+import random
 import numpy as np
 import pygeos
 
 from .element import *
 from ..utils.tools import searchBy
 from ..utils.constant import geom
-from .geos import equals, overlapEdge, Vector
+from .geos import equals, overlapEdge, Vector, VectorArray
 from ..encoding.convexify import triangulate2dFace
 
 
 def _groupByNormal(listToGroup: list, listOfNormal: list[pygeos.Geometry | np.ndarray]) -> list[list]:
     """group the items by their normal.
-        The items with same factor (both positive and negative) will be pushed in the same group
+        The items with same factor (both positive and negative) will be pushed in the same group.
+        The normals are unitized and sign-folded in one batch, identical directions are merged by np.unique
+        and the rest are hashed into buckets of the angle tolerance, so that each direction is only tested
+        (by Vector.parallel) against the groups in its neighbor buckets.
+        The groups are the same as the greedy matching in the order of the normals,
+        except that the zero normals are isolated in the last group instead of matching any direction.
 
         ---------------------------------
         listToGroup: anything that need to be grouped
@@ -23,70 +32,188 @@ def _groupByNormal(listToGroup: list, listOfNormal: list[pygeos.Geometry | np.nd
     """
     if len(listOfNormal) != len(listToGroup):
         raise Exception('items and normals should have same number.')
+    if len(listToGroup) == 0:
+        return []
     listToGroup = np.array(listToGroup)
-    normalGroup,uniqueNormal = [[len(listOfNormal)-1]],[listOfNormal[-1]]
-    for i,nor in enumerate(listOfNormal[:-1]):
-        matched = False
-        for g,un in enumerate(uniqueNormal):
-            if Vector.parallel(nor,un):
-                normalGroup[g].append(i)
-                matched = True
-                break
-        if not matched:
-            normalGroup.append([i])
-            uniqueNormal.append(nor)
-
+    normals = VectorArray(listOfNormal).array
+    length = np.linalg.norm(normals, axis=1)
+    # the zero normals have no direction, they are put in their own group after the others
+    zeroIdx = np.flatnonzero(length == 0)
+    # the last normal seeds the first group, the others follow in order
+    order = np.roll(np.flatnonzero(length > 0), 1)
+    normalGroup = []
+    if len(order) > 0:
+        unit = normals[order] / length[order, None]
+        # fold the sign so that the first non-zero component is positive
+        unit = unit * np.sign(unit[np.arange(len(unit)), np.argmax(unit != 0, axis=1)])[:, None]
+        uniqueUnit, firstIdx, inverse = np.unique(unit, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        # any direction within the tolerance stays in the neighbor cells of the bucket
+        uniqueGroup = np.zeros(len(uniqueUnit), dtype=int)
+        cell = 2 * np.sqrt(Vector.ANGLE_TOLERANCE)
+        neighborCells = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1]), axis=-1).reshape(-1, 3)
+        buckets, representative = {}, []
+        for u in np.argsort(firstIdx):
+            key = np.floor(uniqueUnit[u] / cell).astype(int)
+            candidates = set()
+            for neighbor in key + neighborCells:
+                candidates.update(buckets.get(tuple(neighbor), ()))
+            for g in sorted(candidates):
+                if Vector.parallel(uniqueUnit[u], representative[g]):
+                    uniqueGroup[u] = g
+                    break
+            else:
+                uniqueGroup[u] = len(representative)
+                representative.append(uniqueUnit[u])
+                for direction in (uniqueUnit[u], -uniqueUnit[u]):
+                    buckets.setdefault(tuple(np.floor(direction / cell).astype(int)), []).append(uniqueGroup[u])
+
+        label = uniqueGroup[inverse]
+        sortedIdx = np.argsort(label, kind='stable')
+        normalGroup = np.split(order[sortedIdx], np.flatnonzero(np.diff(label[sortedIdx])) + 1)
+    if len(zeroIdx) > 0:
+        normalGroup.append(zeroIdx)
     itemsGroup = [list(listToGroup[groupIdx]) for groupIdx in normalGroup]
     return itemsGroup
 
-    normal_ = [Vector(normal).string for normal in listOfNormal]
-    sortedGroup = {nor: [] for nor in np.unique(normal_)}
-    for nor, item in zip(normal_, listToGroup):
-        sortedGroup[nor].append(item)
-    return list(sortedGroup.values())
+
+class _DisjointSet(object):
+    """union-find with path compression and union by size.
+    the keys can be any hashable object (indices, names...), and will be added when they are first met.
+    """
+    __slots__ = ['parent', 'size']
+
+    def __init__(self, keys: Iterable = ()):
+        self.parent: dict = {}
+        self.size: dict = {}
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if key not in self.parent:
+            self.parent[key] = key
+            self.size[key] = 1
+
+    def find(self, key):
+        """the root of the key, the path will be compressed to the root"""
+        self.add(key)
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, key1, key2):
+        root1, root2 = self.find(key1), self.find(key2)
+        if root1 == root2:
+            return root1
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        return root1
+
+    def groups(self) -> list[list]:
+        """the components in the order of their first key, the keys keep the order they were added"""
+        components = {}
+        for key in self.parent:
+            components.setdefault(self.find(key), []).append(key)
+        return list(components.values())
 
 
 def _groupRelateArray(sequences: list) -> list:
-    """join array together if they have intersections"""
-    sequenceSet = [set(s) for s in sequences]
-    length = len(sequenceSet)
-    for _ in range(length):
-        s = sequenceSet.pop()
-        flag = True
-        for i in np.arange(len(sequenceSet) - 1, -1, -1):
-            if set(s) & set(sequenceSet[i]):
-                sequenceSet[i] = s | sequenceSet[i]
-                flag = False
-                break
-        if flag:
-            sequenceSet = [s] + sequenceSet
-    return [list(s) for s in sequenceSet]
+    """join array together if they have intersections.
+    sequences: pairs or sets of hashable keys, the components are found by union-find in near-linear time
+    """
+    disjointSet = _DisjointSet()
+    for sequence in sequences:
+        sequence = list(sequence)
+        for key in sequence:
+            disjointSet.union(sequence[0], key)
+    return disjointSet.groups()
 
 
 def _groupByCollinear(listToGroup: list, listOfNormal: list[pygeos.Geometry | np.ndarray],
                       listOfGeometry: list[pygeos.Geometry]) -> list[list]:
-    """push linestring in a group if they are collinear. based on _groupByNormal function"""
+    """push linestring in a group if they are collinear. based on _groupByNormal function.
+        In each normal group the signed offsets of the lines along the (unitized) normal of the group
+        are calculated at once and sorted, and the groups are split where the gap exceeds geom.POINT_PRECISION.
+        The lines facing the opposite side are not grouped together.
+        The offsets are measured in the xy plane, the items in a group keep their order in the normal group.
+
+        ---------------------------------
+        listToGroup: anything that need to be grouped
+        listOfNormal: the normal of the lines, with the same lengh as listToGroup
+        listOfGeometry: the 2d lines, with the same lengh as listToGroup
+
+        return: 2-dimensional list with the same type as listToGroup
+    """
     if len(listOfNormal) != len(listToGroup) or len(listOfNormal) != len(listOfGeometry):
         raise Exception('items and normals should have same number.')
     if len(listOfNormal)==0:
         return listToGroup
-    groupIdx = _groupByNormal(list(np.arange(len(listToGroup))), listOfNormal)
-    listToGroup = [np.array(listToGroup)[group] for group in groupIdx]
-    listOfNormal = [np.array(listOfNormal)[group] for group in groupIdx]
-    listOfGeometry = [np.array(listOfGeometry)[group] for group in groupIdx]
+    listToGroup = np.array(listToGroup)
+    normals = VectorArray(listOfNormal).array[:, :2]
+    coordinates, coordinateIdx = pygeos.get_coordinates(np.array(listOfGeometry), return_index=True)
+    firstPoint = np.searchsorted(coordinateIdx, np.arange(len(listToGroup)))
+    pointOnLines = coordinates[np.minimum(firstPoint, len(coordinates) - 1)]
     groups = []
-    for itemGroup, norGroup, geometryGroup in zip(listToGroup, listOfNormal, listOfGeometry):
-        extremePoint = np.min(pygeos.get_coordinates(geometryGroup), axis=0)
-        pointOnLines = [pygeos.get_coordinates(geo)[0] for geo in geometryGroup]
-        distance = [Vector.dot(nor, poi - extremePoint) for nor, poi in zip(norGroup, pointOnLines)]
-        thisGroups = {dist: [] for dist in np.unique(distance)}
-        for item, dist in zip(itemGroup, distance):
-            thisGroups[dist].append(item)
-        for gp in list(thisGroups.values()):
-            groups.append(gp)
+    for groupIdx in _groupByNormal(list(np.arange(len(listToGroup))), listOfNormal):
+        groupIdx = np.array(groupIdx)
+        normal = normals[groupIdx[0]]
+        length = np.linalg.norm(normal)
+        normal = normal / length if length > 0 else normal
+        offset = pointOnLines[groupIdx] @ normal
+        # the lines facing the opposite side are kept in their own groups
+        facing = normals[groupIdx] @ normal < 0
+        sortedIdx = np.lexsort((offset, facing))
+        splitAt = np.flatnonzero((np.diff(offset[sortedIdx]) > geom.POINT_PRECISION) |
+                                 (np.diff(facing[sortedIdx]) != 0)) + 1
+        for collinear in np.split(sortedIdx, splitAt):
+            groups.append(list(listToGroup[groupIdx[np.sort(collinear)]]))
     return groups
 
 
+def _candidateNeighbors(indexes: list[int], lines: list[pygeos.Geometry],
+                        tolerance=geom.POINT_PRECISION) -> dict[int, set[int]]:
+    """find the pairs of lines whose bounding boxes (expanded by tolerance) intersect using pygeos.STRtree.
+
+    indexes: the identification of the lines, e.g. the index of walls in model.wallList
+    lines: the 2d lines in the same length of indexes
+
+    return: {index: set of the indexes of the candidate lines}
+    """
+    neighbors = {idx: set() for idx in indexes}
+    if len(lines) < 2:
+        return neighbors
+    bounds = pygeos.bounds(lines)
+    boxes = pygeos.box(bounds[:, 0] - tolerance, bounds[:, 1] - tolerance,
+                       bounds[:, 2] + tolerance, bounds[:, 3] + tolerance)
+    source, target = pygeos.STRtree(lines).query_bulk(boxes)
+    for s, t in zip(source, target):
+        if s != t:
+            neighbors[indexes[s]].add(indexes[t])
+            neighbors[indexes[t]].add(indexes[s])
+    return neighbors
+
+
+def _candidateTasks(group: list[int], neighbors: dict[int, set[int]], pairCounter: dict = None) -> list[list[int]]:
+    """the triangular task lists group[i:] keeping only the candidates of group[i], in the original order.
+    the number of candidate pairs and all pairs in the group are added to pairCounter (e.g. model.pairCounter)
+    """
+    order = {item: i for i, item in enumerate(group)}
+    tasks = []
+    for i, item in enumerate(group):
+        others = sorted([other for other in neighbors[item] if order.get(other, -1) > i], key=order.get)
+        tasks.append([item] + others)
+    if pairCounter is not None:
+        pairCounter['candidate'] += sum(len(task) - 1 for task in tasks)
+        pairCounter['all'] += len(group) * (len(group) - 1) // 2
+    return tasks
+
+
 def partitionWall(walls: list[MoosasWall], model: MoosasContainer, bottom=None, top=None) -> list[MoosasWall]:
     """partition the walls by sorting their coordinates and making polygon using the top and bottom boundaries
     the glazing of all walls will be collected and try to attach to the new wall again.
@@ -125,7 +252,7 @@ def solve_duplicated_level(model: MoosasContainer) -> MoosasContainer:
      """
     del_level = []
     for i in range(1, len(model.levelList)):
-        target = searchBy('level', model.levelList[i], model.faceList)
+        target = model.searchBy('level', model.levelList[i], 'faceList')
         # print(f'level {model.levelList[i]}, floors {len(target)}')
         # plot_object(np.array(model.faceList)[target])
         sum_area = np.sum([pygeos.area(model.faceList[item].force_2d()) for item in target])
@@ -144,6 +271,7 @@ def solve_duplicated_wall(model: MoosasContainer) -> MoosasContainer:
         Identify the duplicated walls that 2 points of them are placed nearby
         you must solve duplication before solving containment
         this func is based on _groupByCollinear. if _groupByCollinear do not perform well, serious error will occur here
+        only the walls with intersected bounding boxes (found by STRtree in each level) will be checked.
     """
     """build up tue duplication check list"""
     duplicateCheckList: list[list[int]] = []
@@ -151,15 +279,15 @@ def solve_duplicated_wall(model: MoosasContainer) -> MoosasContainer:
     edge2d = [w.force_2d() for w in model.wallList]
     for bld_level in model.levelList:
 
-        wall_list = searchBy('level', bld_level, model.wallList)
+        wall_list = model.searchBy('level', bld_level, 'wallList')
+        neighbors = _candidateNeighbors(wall_list, [edge2d[w] for w in wall_list])
         wall_group: list[list[int]] = _groupByCollinear(listToGroup=wall_list,
                                                         listOfNormal=[model.wallList[w].normal for w in
                                                                       wall_list],
                                                         listOfGeometry=[model.wallList[w].force_2d() for w in
                                                                         wall_list])
         for wall_list in wall_group:
-            for i in range(len(wall_list)):
-                duplicateCheckList.append(wall_list[i:])
+            duplicateCheckList += _candidateTasks(list(wall_list), neighbors, model.pairCounter)
 
     """check if the walls are duplicated, and dissolve that wall into the others"""
     for wl, task in enumerate(duplicateCheckList):
@@ -190,18 +318,20 @@ def solve_overlapped_wall(model: MoosasContainer) -> MoosasContainer:
     P.S.
     you must solve duplication before solving containment
     this func is based on _groupByCollinear. if _groupByCollinear do not perform well, serious error will occur here
+    only the walls with intersected bounding boxes (found by STRtree in each level) will be checked.
     """
     """build the containment check list"""
     containCheckList: list[list[int]] = []
     mergeGroup: list[set[int]] = []
     for bld_level in model.levelList:
-        wall_list = searchBy('level', bld_level, model.wallList)
+        wall_list = model.searchBy('level', bld_level, 'wallList')
+        edge2d = [model.wallList[w].force_2d() for w in wall_list]
+        neighbors = _candidateNeighbors(wall_list, edge2d)
         wall_group = _groupByCollinear(listToGroup=wall_list,
                                        listOfNormal=[model.wallList[w].normal for w in wall_list],
-                                       listOfGeometry=[model.wallList[w].force_2d() for w in wall_list])
+                                       listOfGeometry=edge2d)
         for wall_list in wall_group:
-            for i in range(len(wall_list)):
-                containCheckList.append(wall_list[i:])
+            containCheckList += _candidateTasks(list(wall_list), neighbors, model.pairCounter)
 
     """check containment and build the mergeGroup"""
     for i, task in enumerate(containCheckList):
@@ -228,12 +358,28 @@ def solve_overlapped_wall(model: MoosasContainer) -> MoosasContainer:
     return model
 
 
+def _vertexKeys(geometry: pygeos.Geometry | np.ndarray) -> set[tuple]:
+    """the vertices of the geometry as hashable keys, whose x,y are snapped to geom.POINT_PRECISION
+    as what overlapEdge() does, so two geometries overlapEdge() if they have at least 2 common keys.
+    """
+    try:
+        vertices = pygeos.set_precision(pygeos.points(pygeos.get_coordinates(geometry, include_z=True)),
+                                        geom.POINT_PRECISION)
+        return set(map(tuple, pygeos.get_coordinates(vertices, include_z=True) + 0.0))
+    except Exception:
+        return set()
+
+
 def solve_invalid_wall(model: MoosasContainer) -> MoosasContainer:
     """check if the walls are valid including:
     1.zone length or zero height wall
     2.invalid pygeos.Geometry
     3.then dissolve those walls to others valid walls,
     which have coincident edge with the invalid walls and lay below the them.
+
+    the walls are indexed by their snapped vertices, so the walls sharing an edge with the invalid wall
+    are found by counting the common vertices instead of searching the whole level.
+    the index of a wall is refreshed after it dissolves others.
     """
 
     def _isValid(_wall: MoosasWall) -> int:
@@ -251,33 +397,53 @@ def solve_invalid_wall(model: MoosasContainer) -> MoosasContainer:
             return -1
         return 0
 
+    """build the vertex index: {vertex key: set of walls}"""
+    wallKeys = [_vertexKeys(w.face) for w in model.wallList]
+    vertexIndex: dict[tuple, set[int]] = {}
+    for i, keys in enumerate(wallKeys):
+        for key in keys:
+            vertexIndex.setdefault(key, set()).add(i)
+
+    def _unindex(_i: int):
+        for _key in wallKeys[_i]:
+            vertexIndex[_key].discard(_i)
+
     """build the check list for walls' validation"""
-    del_face = []
+    del_face = set()
     check_list = list(np.arange(len(model.wallList)))
     total = len(check_list)
     while len(check_list) > 0:
         i = check_list.pop()
         wall = model.wallList[i]
         print(f'\rCLEANSE: Invalid checking: {total - len(check_list)}/{total}', end='')
-        if _isValid(wall) != 0:
-            del_face.append(i)
-            if _isValid(wall) > 0:
+        validation = _isValid(wall)
+        if validation != 0:
+            del_face.add(i)
+            _unindex(i)
+            if validation > 0:
                 searchLevel = model.levelList.index(wall.level) - 1
-                searchLevel = [model.levelList[searchLevel] + wall.level]
-
-                """find a wall to dissolve this invalid wall"""
-                checkWall = [index for index in searchBy('level', searchLevel, model.wallList) if
-                             not (index in del_face)]
+                searchLevel = model.levelList[searchLevel] + wall.level
+
+                """find a wall to dissolve this invalid wall: at least 2 common vertices"""
+                commonVertex = {}
+                for key in wallKeys[i]:
+                    for j in vertexIndex.get(key, ()):
+                        commonVertex[j] = commonVertex.get(j, 0) + 1
+                checkWall = sorted(j for j, count in commonVertex.items()
+                                   if count >= 2 and model.wallList[j].level == searchLevel)
                 for j in checkWall:
-                    if overlapEdge(wall.face, model.wallList[j].face):
-                        if model.wallList[j].height <= wall.height:
-                            model.wallList[j].dissolve(wall)
-                            check_list.append(j)
-                            break
+                    if model.wallList[j].height <= wall.height:
+                        model.wallList[j].dissolve(wall)
+                        _unindex(j)
+                        wallKeys[j] = _vertexKeys(model.wallList[j].face)
+                        for key in wallKeys[j]:
+                            vertexIndex.setdefault(key, set()).add(j)
+                        check_list.append(j)
+                        break
 
 
     print(f"\t\tdel walls {len(del_face)}")
-    model.wallList = list(np.delete(model.wallList, del_face))
+    model.wallList = list(np.delete(model.wallList, list(del_face)))
     return model
 
 
@@ -300,10 +466,11 @@ def solve_redundant_line(model: MoosasContainer) -> MoosasContainer:
     total_a = len(model.wallList)
     for bld_level in model.levelList:
         total = len(model.wallList)
-        face_list = np.array(model.wallList)[searchBy('level', bld_level, model.wallList)]
+        face_list = model.searchBy('level', bld_level, 'wallList', asObject=True)
         _,redundant = _coPlannerCleanse(face_list)
         if len(redundant) >0:
-            redundant = [list(model.wallList).index(w) for w in redundant]
+            position = {id(w): i for i, w in enumerate(model.wallList)}
+            redundant = [position[id(w)] for w in redundant]
             model.wallList = list(np.delete(model.wallList, redundant))
         print(f'\rCLEANSE: Merge walls: {total - len(model.wallList)} in Level: {bld_level}', end='')
     print(f"\t\ttotal merge wall: {total_a - len(model.wallList)}")
@@ -318,9 +485,8 @@ def _coPlannerCleanse(elements: np.ndarray[MoosasElement]) -> (np.ndarray[Moosas
 
     This function needs to ensure the cleanse performance.
     Therefore, it will not do any simplifications on the geometries,
-    which means a very high calculation cost.
-
-    In the future, a multi processes should be added to this func.
+    but the edge topology is built once with integer edge keys (see getEdgeKey()) and updated incrementally.
+    The levels can be cleansed in parallel by solveByLevel(model, solve_redundant_line, executor).
 
     The process of the func can be described as:
     1. Traverse the horizontal & vertical planes of the same floor and create a dict of all lines (initialized with set())
@@ -328,53 +494,61 @@ def _coPlannerCleanse(elements: np.ndarray[MoosasElement]) -> (np.ndarray[Moosas
     3. Check whether the walls A and B in the set have a common line corresponding to the set length of 2
     4. Iterate through all sets and sets with common elements
     5. Iterate through all sets after the cleanup and call the dissolve method
+    6. Update the dict for the dissolved faces, and only check the faces whose edges have been changed in next round
     ---------------------------------
     elements: MoosasElement or MoosasGeometry as input
 
     Return: merged elements,redundant elements (np.ndarray[MoosasElement],np.ndarray[MoosasElement])
     """
-    faceNum = len(elements)
-    currentFaceNum = 0
+    elements = list(elements)
     redundant = []
-    while currentFaceNum != faceNum:
-        currentFaceNum = faceNum
-        edgeDict = {}
-
-        """Get the topology of all faces"""
-        for faceIdx, moface in enumerate(elements):
-            edges = moface.getEdgeStr()
-            for edge_str in edges:
-                if edge_str not in edgeDict.keys():
-                    edgeDict[edge_str] = [faceIdx]
-                else:
-                    edgeDict[edge_str] += [faceIdx]
-
-        """Find coPlane faces"""
-        _dissolveFaces = []
-        for faces in edgeDict.values():
-            if len(faces) == 2:
-                if Vector.parallel(Vector(elements[faces[0]].normal), Vector(elements[faces[1]].normal)):
-                    coedges = set(elements[faces[0]].getEdgeStr()) & set(elements[faces[1]].getEdgeStr())
-                    if len([edge_str for edge_str in list(coedges) if len(edgeDict[edge_str]) > 2]) == 0:
-                        _dissolveFaces.append({faces[0],faces[1]})
 
-        """Merge dissolve groups"""
-        to_dissolveFaces = _groupRelateArray(_dissolveFaces)
-
-        """Dissolve each group"""
-        delfaces = set()
-        for faces in to_dissolveFaces:
-            faces = list(faces)
+    """Get the topology of all faces"""
+    edgeKeys: list[set[tuple]] = [set(moface.getEdgeKey()) for moface in elements]
+    edgeDict: dict[tuple, list[int]] = {}
+    for faceIdx, keys in enumerate(edgeKeys):
+        for edge_key in keys:
+            edgeDict.setdefault(edge_key, []).append(faceIdx)
+
+    deleted = set()
+    changed = set(range(len(elements)))
+    while len(changed) > 0:
+        """Find coPlane faces around the changed faces"""
+        dissolveGroup, checked = _DisjointSet(), set()
+        for faceIdx in sorted(changed):
+            for edge_key in edgeKeys[faceIdx]:
+                faces = edgeDict[edge_key]
+                if len(faces) != 2 or tuple(sorted(faces)) in checked:
+                    continue
+                checked.add(tuple(sorted(faces)))
+                if Vector.parallel(Vector(elements[faces[0]].normal), Vector(elements[faces[1]].normal)):
+                    coedges = edgeKeys[faces[0]] & edgeKeys[faces[1]]
+                    if all(len(edgeDict[coedge]) <= 2 for coedge in coedges):
+                        dissolveGroup.union(faces[0], faces[1])
+
+        """Dissolve each group and update the topology"""
+        changed = set()
+        for faces in dissolveGroup.groups():
+            faces = sorted(faces)
             parentFace = elements[faces[0]]
             childFaces = [elements[i] for i in faces[1:]]
-            delfaces = delfaces | set(faces[1:])
             redundant += childFaces
             parentFace.dissolve(childFaces)
-
-        elements = list(np.delete(elements, list(delfaces)))
-        faceNum = len(elements)
+            for faceIdx in faces:
+                for edge_key in edgeKeys[faceIdx]:
+                    edgeDict[edge_key].remove(faceIdx)
+                    changed.update(edgeDict[edge_key])
+            deleted.update(faces[1:])
+            edgeKeys[faces[0]] = set(parentFace.getEdgeKey())
+            for edge_key in edgeKeys[faces[0]]:
+                edgeDict.setdefault(edge_key, []).append(faces[0])
+                changed.update(edgeDict[edge_key])
+        changed -= deleted
+
+    elements = [moface for faceIdx, moface in enumerate(elements) if faceIdx not in deleted]
     return elements,redundant
 
+
 def solveIntersectionVertical(model: MoosasContainer) -> MoosasContainer:
     """Calculate the intersection of walls projection in 2d for each floor
     then break those walls into parts.
@@ -383,38 +557,52 @@ def solveIntersectionVertical(model: MoosasContainer) -> MoosasContainer:
     but only solve the intersection between vertical faces (walls).
     Besides, since we implement the function in 2d space, any 3d relations will be ignored.
     in this case, this function do not care about any walls cross multi-level.
+
+    the crossing pairs of each level are found by pygeos.STRtree and intersected in one call,
+    then each wall is broken once by all its crossing points.
     """
     delWalls, newWalls = [], []
     prs = 0
 
     for bld_level in model.levelList:
-        wall_list = searchBy('level', bld_level, model.wallList)
+        wall_list = model.searchBy('level', bld_level, 'wallList')
+        if len(wall_list) < 2:
+            continue
         wallElement = np.array(model.wallList)[wall_list]
         wall2d = np.array([w.force_2d() for w in wallElement])
 
-        for i, wall, w2d in zip(wall_list, wallElement, wall2d):
+        """find the candidate pairs which are not parallel"""
+        tolerance = 1.5 * geom.POINT_PRECISION
+        bounds = pygeos.bounds(wall2d)
+        boxes = pygeos.box(bounds[:, 0] - tolerance, bounds[:, 1] - tolerance,
+                           bounds[:, 2] + tolerance, bounds[:, 3] + tolerance)
+        source, target = pygeos.STRtree(wall2d).query_bulk(boxes)
+        normals = VectorArray([w.normal for w in wallElement]).array
+        crossing = ~VectorArray.parallel(normals[source], normals[target])
+        source, target = source[crossing], target[crossing]
+
+        """intersect all pairs at once and keep the points lay inside the walls"""
+        intersection = pygeos.intersection(wall2d[source], wall2d[target], grid_size=tolerance)
+        valid = (~pygeos.is_empty(intersection)) & (pygeos.get_dimensions(intersection) == 0)
+        source, intersection = source[valid], intersection[valid]
+        points, partIdx = pygeos.get_parts(intersection, return_index=True)
+        source = source[partIdx]
+        twins = pygeos.boundary(wall2d[source])
+        inner = ~pygeos.dwithin(twins, points, geom.POINT_PRECISION)
+        source, points = source[inner], points[inner]
+
+        """break each wall once by all its crossing points"""
+        breakPoints = {}
+        for i, poi in zip(source, points):
+            breakPoints.setdefault(i, []).append(poi)
+        for i, wall in enumerate(wallElement):
             prs += 1
-
             print(f"\rCLEANSE: solve horizontal intersection {prs}/{len(model.wallList)}", end='')
-            parallel = [not(Vector.parallel(Vector(wall.normal), Vector(w.normal))) for w in wallElement]
-            testSet2d = wall2d[parallel]
-            for w2dOther in testSet2d:
-                intersection = pygeos.intersection(w2d, w2dOther,grid_size=1.5*geom.POINT_PRECISION)
-                # print(w2d, w2dOther,Vector.parallel(Vector(w2d), Vector(w2dOther)),intersection)
-                if (not pygeos.is_empty(intersection)) and pygeos.get_dimensions(intersection)==0:
-                    twins =pygeos.points(pygeos.get_coordinates(w2d))
-                    if not (pygeos.dwithin(twins[0], intersection, geom.POINT_PRECISION) or pygeos.dwithin(twins[1], intersection,geom.POINT_PRECISION)):
-                        brkResult = MoosasWall.break_(wall, intersection)
-                        if brkResult is not None:
-                            newWalls += brkResult
-                            delWalls.append(i)
-                # if pygeos.contains(w2d, poi):
-                #     twins = pygeos.points(pygeos.get_coordinates(w2d))
-                #     if not (pygeos.dwithin(twins[0], poi, geom.POINT_PRECISION) or pygeos.dwithin(twins[1], poi,
-                #                                                                                   geom.POINT_PRECISION)):
-                #         wall1, wall2 = MoosasWall.break_(wall, poi)
-                #         newWalls += [wall1, wall2]
-                #         delWalls.append(i)
+            if i in breakPoints:
+                brkResult = MoosasWall.break_(wall, breakPoints[i])
+                if brkResult is not None:
+                    newWalls += brkResult
+                    delWalls.append(wall_list[i])
     print(f'\tbreak walls:{len(delWalls)}',end='')
 
     model.wallList = list(np.delete(model.wallList, delWalls))
@@ -423,40 +611,264 @@ def solveIntersectionVertical(model: MoosasContainer) -> MoosasContainer:
     return model
 
 
-def solveIntersectionHorizontal(model: MoosasContainer) -> MoosasContainer:
-    dividedCount = 0
-    for bldLevelIndex in range(len(model.levelList)):
-        faces = list(np.array(model.faceList)[searchBy('level', model.levelList[bldLevelIndex], model.faceList)])
+class _LevelPickler(pickle.Pickler):
+    """pickler saving the objects in refs {id(obj): key} by their keys, so they are not sent again"""
+
+    def __init__(self, file, refs: dict[int, object]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.refs = refs
+
+    def persistent_id(self, obj):
+        return self.refs.get(id(obj))
+
+
+class _LevelUnpickler(pickle.Unpickler):
+    """unpickler loading the keys given by _LevelPickler as the objects in {key: obj}"""
+
+    def __init__(self, file, objects: dict):
+        super().__init__(file)
+        self.objects = objects
+
+    def persistent_load(self, pid):
+        return self.objects[pid]
+
+
+def _dumps(obj, refs: dict[int, object]) -> bytes:
+    buffer = io.BytesIO()
+    _LevelPickler(buffer, refs).dump(obj)
+    return buffer.getvalue()
+
+
+def _loads(payload: bytes, objects: dict):
+    return _LevelUnpickler(io.BytesIO(payload), objects).load()
+
+
+def _elementState(element: MoosasElement) -> tuple:
+    """the attributes of the walls and glazings that the cleanse stages may change"""
+    return (tuple(mixItemListToList(element.faceId)), tuple(id(gls) for gls in element.glazingElement),
+            element.level, element.offset, getattr(element, 'toplevel', None), getattr(element, 'topoffset', None),
+            id(getattr(element, 'parentFace', None)))
+
+
+def _levelData(model: MoosasContainer, wallIdx: list[int], elementList: str = 'wallList',
+               glazingList: str = 'glazingList') -> tuple[list, list[int], list]:
+    """get the walls (or the elements in elementList) with the given index,
+    their glazings in glazingList (and the index) and geometries"""
+    walls = list(np.array(getattr(model, elementList))[wallIdx])
+    glazingIds = {id(g) for w in walls for g in w.glazingElement}
+    glazingIdx = [i for i, g in enumerate(getattr(model, glazingList)) if id(g) in glazingIds]
+    glazings = [getattr(model, glazingList)[i] for i in glazingIdx]
+    faceIds = [faceId for element in walls + glazings for faceId in mixItemListToList(element.faceId)]
+    geometries = [model.getGeo(faceId) for faceId in dict.fromkeys(faceIds)]
+    return walls, glazingIdx, geometries
+
+
+def _solveLevel(stage, payload: bytes, seed: int, elementList: str = 'wallList',
+                glazingList: str = 'glazingList') -> tuple:
+    """run a cleanse stage on the walls (or the elements in elementList) of one level in the worker process.
+    the walls, glazings and geometries are loaded into a sub-model, and only the changes are sent back:
+    the sent objects which are not changed by the stage are pickled as references.
+
+    return: the pickled (walls, glazings, new geometries, index of the removed geometries, {index: (flip, delete)}
+    of the changed geometries), the original positions of the walls and glazings (-1 for the new ones),
+    the (hit, miss) of the element cache and the pair counter of the sub-model
+    """
+    random.seed(seed)
+    subModel = MoosasContainer()
+    levelList, newIndex, walls, glazings, geometries, args = _loads(payload, {'model': subModel})
+    subModel.levelList = levelList
+    subModel.newIndex = newIndex
+    subModel.geoId = [geo.faceId for geo in geometries]
+    subModel.geometryList = geometries
+    setattr(subModel, elementList, np.array(walls))
+    setattr(subModel, glazingList, glazings)
+    elementState = {id(e): _elementState(e) for e in walls + glazings}
+    geoState = [(geo.flip, geo.delete) for geo in geometries]
+
+    cacheHit, cacheMiss = MoosasElement.cacheCounter['hit'], MoosasElement.cacheCounter['miss']
+    # the progress of the workers is not printed
+    with contextlib.redirect_stdout(io.StringIO()):
+        subModel = stage(subModel, *args)
+    cache = (MoosasElement.cacheCounter['hit'] - cacheHit, MoosasElement.cacheCounter['miss'] - cacheMiss)
+
+    """a wall and its glazings are sent back together if any of them is changed"""
+    changedGlazing = {id(g) for g in glazings if _elementState(g) != elementState[id(g)]}
+    changedWall = {id(w) for w in walls if _elementState(w) != elementState[id(w)]
+                   or any(id(g) in changedGlazing for g in w.glazingElement)}
+    changedGlazing |= {id(g) for w in walls if id(w) in changedWall for g in w.glazingElement}
+    refs = {id(subModel): 'model'}
+    refs.update({id(w): ('wall', i) for i, w in enumerate(walls) if id(w) not in changedWall})
+    refs.update({id(g): ('glazing', i) for i, g in enumerate(glazings) if id(g) not in changedGlazing})
+    refs.update({id(geo): ('geo', i) for i, geo in enumerate(geometries)})
+
+    remainGeo = {id(geo) for geo in subModel.geometryList}
+    newGeometries = [geo for geo in subModel.geometryList if id(geo) not in refs]
+    removedGeo = [i for i, geo in enumerate(geometries) if id(geo) not in remainGeo]
+    geoFlags = {i: (geo.flip, geo.delete) for i, geo in enumerate(geometries) if (geo.flip, geo.delete) != geoState[i]}
+
+    wallPosition = {id(w): i for i, w in enumerate(walls)}
+    glazingPosition = {id(g): i for i, g in enumerate(glazings)}
+    remainWalls, remainGlazings = list(getattr(subModel, elementList)), list(getattr(subModel, glazingList))
+    result = _dumps((remainWalls, remainGlazings, newGeometries, removedGeo, geoFlags), refs)
+    return (result,
+            [wallPosition.get(id(w), -1) for w in remainWalls],
+            [glazingPosition.get(id(g), -1) for g in remainGlazings],
+            cache, subModel.pairCounter)
+
+
+def solveByLevel(model: MoosasContainer, stage, executor=None, elementList: str = 'wallList',
+                 glazingList: str = 'glazingList', levelArgs: list[tuple] = None) -> MoosasContainer:
+    """run a cleanse stage working on the walls of each level separately,
+    i.e. solve_duplicated_wall, solve_overlapped_wall or solveIntersectionVertical, in a process pool.
+
+    the walls of each level are sent with their glazings and geometries (the model is not sent),
+    and only the changed and new elements are sent back. the results are merged in the order of the levels:
+    the remained walls/glazings keep their positions, the new ones are appended,
+    and the new geometries are included to the library with new ids. so the result is the same for any number of workers.
+    the stage is run directly if executor is None.
+    the horizontal faces and skylights can be solved in the same way, see solveIntersectionHorizontal.
+
+    model: the model to solve
+    stage: the cleanse function, stage(model, *args) -> model
+    executor: concurrent.futures.Executor, e.g. ProcessPoolExecutor
+    elementList: name of the list of the elements solved level by level, e.g. 'wallList' or 'faceList'
+    glazingList: name of the list of their glazings, e.g. 'glazingList' or 'skylightList'
+    levelArgs: the extra arguments of the stage for each level in model.levelList,
+        the stage is called once for each level (with the whole model if executor is None)
+
+    return: the model
+    """
+    if levelArgs is None:
+        if executor is None:
+            return stage(model)
+        levelArgs = [()] * len(model.levelList)
+    elif executor is None:
+        for args in levelArgs:
+            model = stage(model, *args)
+        return model
+    levelTasks = [(model.searchBy('level', bld_level, elementList), args)
+                  for bld_level, args in zip(model.levelList, levelArgs)]
+    levelTasks = [(wall_list, args) for wall_list, args in levelTasks if len(wall_list) > 0]
+
+    """send the walls of each level, the elements refer to the model by a key"""
+    tasks = []
+    for wall_list, args in levelTasks:
+        walls, glazingIdx, geometries = _levelData(model, wall_list, elementList, glazingList)
+        glazings = [getattr(model, glazingList)[i] for i in glazingIdx]
+        payload = _dumps((list(model.levelList), model.newIndex, walls, glazings, geometries, args),
+                         {id(model): 'model'})
+        tasks.append((wall_list, glazingIdx, geometries,
+                      executor.submit(_solveLevel, stage, payload, random.getrandbits(32), elementList, glazingList)))
+
+    """merge the results"""
+    modelWalls, modelGlazings = getattr(model, elementList), getattr(model, glazingList)
+    replacedWall, replacedGlazing = {}, {}
+    removedWall, removedGlazing = set(), set()
+    newWalls, newGlazings = [], []
+    for i, (wall_list, glazingIdx, geometries, task) in enumerate(tasks):
+        print(f'\rCLEANSE: {stage.__name__} by level {i + 1}/{len(tasks)}', end='')
+        result, wallPosition, glazingPosition, cache, pairCounter = task.result()
+        MoosasElement.cacheCounter['hit'] += cache[0]
+        MoosasElement.cacheCounter['miss'] += cache[1]
+        for key, count in pairCounter.items():
+            model.pairCounter[key] += count
+        objects = {'model': model}
+        objects.update({('wall', j): modelWalls[w] for j, w in enumerate(wall_list)})
+        objects.update({('glazing', j): modelGlazings[g] for j, g in enumerate(glazingIdx)})
+        objects.update({('geo', j): geo for j, geo in enumerate(geometries)})
+        walls, glazings, newGeometries, removedGeo, geoFlags = _loads(result, objects)
+
+        renamed = {}
+        for geo in newGeometries:
+            # the id in the sub-model, adoptGeo renames the geometry
+            faceId = geo.faceId
+            renamed[faceId] = model.adoptGeo(geo)
+        for j in removedGeo:
+            model.removeGeo(geometries[j].faceId)
+        flipped = []
+        for j, (flip, delete) in geoFlags.items():
+            geometries[j].delete = delete
+            if flip and not geometries[j].flip:
+                flipped.append(geometries[j])
+        if len(flipped) > 0:
+            model.flipGeo(flipped)
+
+        removedWall.update(wall_list)
+        for wall, position in zip(walls, wallPosition):
+            if position >= 0:
+                replacedWall[wall_list[position]] = wall
+                removedWall.discard(wall_list[position])
+            else:
+                newWalls.append(wall)
+        removedGlazing.update(glazingIdx)
+        for glazing, position in zip(glazings, glazingPosition):
+            if position >= 0:
+                replacedGlazing[glazingIdx[position]] = glazing
+                removedGlazing.discard(glazingIdx[position])
+            else:
+                newGlazings.append(glazing)
+        # the memoized faceId of the elements sent back may be renamed,
+        # so are the Uid of the new elements which are given by their first geometry, e.g. wall_n12
+        sent = {id(obj) for obj in objects.values()}
+        for element in walls + glazings:
+            if id(element) not in sent:
+                element.clearCache()
+                prefix, _, faceId = element.Uid.partition('_')
+                if faceId in renamed:
+                    element.Uid = f'{prefix}_{renamed[faceId]}'
+
+    remainWalls = [replacedWall.get(i, w) for i, w in enumerate(modelWalls) if i not in removedWall]
+    remainGlazings = [replacedGlazing.get(i, g) for i, g in enumerate(modelGlazings) if i not in removedGlazing]
+    # the lists keep their types, e.g. the skylights are appended after the packing
+    setattr(model, elementList, remainWalls + newWalls if isinstance(modelWalls, list)
+            else np.array(remainWalls + newWalls))
+    setattr(model, glazingList, remainGlazings + newGlazings if isinstance(modelGlazings, list)
+            else np.array(remainGlazings + newGlazings))
+    print()
+    return model
+
+
+def solveIntersectionHorizontal(model: MoosasContainer, executor=None) -> MoosasContainer:
+    """split the horizontal faces by the edges on their level and the level below.
+    the faces of a level are only split by the 2d boundaries of those edges,
+    so the levels are solved separately by solveByLevel, in a process pool if executor is given.
+    """
+    levelArgs = []
+    for bldLevelIndex, bld_level in enumerate(model.levelList):
         edges = []
         if bldLevelIndex > 0:
-            edges += list(np.array(model.edgeList)[searchBy('level', model.levelList[bldLevelIndex-1], model.edgeList)])
+            edges += list(model.searchBy('level', model.levelList[bldLevelIndex - 1], 'edgeList', asObject=True))
         if bldLevelIndex < len(model.levelList) - 1:
-            edges += list(np.array(model.edgeList)[searchBy('level', model.levelList[bldLevelIndex], model.edgeList)])
-
-        # from ..visual.geometry import plot_object
-        # plot_object(edges,faces,colors=['blue','black'])
-        dividedFaces = []
-
-        while len(faces) > 0:
-            f = faces.pop()
-            dividedFaces.append(f)
-            try:
-                for e in edges:
-                    intersectArea = overlapArea(e.force_2d(), f.force_2d())
-                    if intersectArea > geom.AREA_PRECISION:
-                        if intersectArea < f.area - geom.AREA_PRECISION:
-                            # it means the MoosasFace need to be split
-                            splitF = splitFaces(f, e)
-                            if splitF is not None:
-                                if len(splitF[1])>0 and splitF[0] is not None:
-                                    faces += [splitF[0]] + splitF[1]
-                                    dividedFaces.pop()
-                                    dividedCount += 1
-                                    break
-            except GeometryError:
-                pass
-            print(f'\rPACKING: containBy checking for horizontal Faces-Level{model.levelList[bldLevelIndex]} remain:{len(faces)}', end='')
-    print(f'\tdivided horizontal faces: {dividedCount}')
+            edges += list(model.searchBy('level', bld_level, 'edgeList', asObject=True))
+        levelArgs.append((bld_level, [e.force_2d() for e in edges]))
+
+    originalFaces = list(model.faceList)
+    model = solveByLevel(model, _splitLevelFaces, executor, 'faceList', 'skylightList', levelArgs)
+    remainFaces = {id(f) for f in model.faceList}
+    print(f'\tdivided horizontal faces: {sum(id(f) not in remainFaces for f in originalFaces)}')
+    return model
+
+
+def _splitLevelFaces(model: MoosasContainer, level: float, edges: list[pygeos.Geometry]) -> MoosasContainer:
+    """split the faces on the level by the 2d boundaries of the edges until no face is divided"""
+    faces = list(model.searchBy('level', level, 'faceList', asObject=True))
+
+    # from ..visual.geometry import plot_object
+    # plot_object(edges,faces,colors=['blue','black'])
+    while len(faces) > 0:
+        f = faces.pop()
+        try:
+            for edge2d in edges:
+                intersectArea = overlapArea(edge2d, f.force_2d())
+                if geom.AREA_PRECISION < intersectArea < f.area - geom.AREA_PRECISION:
+                    # it means the MoosasFace need to be split
+                    splitF = _splitFace(f, edge2d)
+                    if splitF is not None and splitF[0] is not None and len(splitF[1]) > 0:
+                        faces += [splitF[0]] + splitF[1]
+                        break
+        except GeometryError:
+            pass
+        print(f'\rPACKING: containBy checking for horizontal Faces-Level{level} remain:{len(faces)}', end='')
     return model
 
 
@@ -467,6 +879,11 @@ def splitFaces(face: MoosasFace, edge: MoosasEdge) -> (MoosasFace, list[MoosasFa
     ***you should check if the face overlaps with the edge first by overlapArea method!!
     ***intersection will only create one face, but pygeos.difference can create multi faces!!
     """
+    return _splitFace(face, edge.force_2d())
+
+
+def _splitFace(face: MoosasFace, edge2d: pygeos.Geometry) -> (MoosasFace, list[MoosasFace]):
+    """splitFaces by the 2d boundary of the edge, the new faces and skylights are put on the level of the face"""
     model: MoosasContainer = face.parent
     if not Vector.parallel(face.normal, [0, 0, 1]):
         return [face,[]]
@@ -474,23 +891,25 @@ def splitFaces(face: MoosasFace, edge: MoosasEdge) -> (MoosasFace, list[MoosasFa
         return [face,[]]
 
     f2d = makeValid(face.force_2d())[0]
-    # print(pygeos.is_valid_reason(f2d), edge.force_2d())
+    # print(pygeos.is_valid_reason(f2d), edge2d)
     """split opaque part"""
-    innerFace = pygeos.force_3d(pygeos.intersection(f2d, edge.force_2d(),grid_size=geom.POINT_PRECISION), z=face.elevation)
-    outerFace = pygeos.force_3d(pygeos.difference(f2d, edge.force_2d(),grid_size=geom.POINT_PRECISION), z=face.elevation)
+    innerFace = pygeos.force_3d(pygeos.intersection(f2d, edge2d,grid_size=geom.POINT_PRECISION), z=face.elevation)
+    outerFace = pygeos.force_3d(pygeos.difference(f2d, edge2d,grid_size=geom.POINT_PRECISION), z=face.elevation)
 
     innerFace = makeValid(innerFace)[0]
     outerFace = [makeValid(outf)[0] for outf in pygeos.get_parts(outerFace) if not pygeos.is_empty(outf)]
     # outerFace = [makeValid(f)[0] for ff in outerFace for f in ff]
     if pygeos.area(innerFace)>geom.AREA_PRECISION:
         innerFace = MoosasFace(model=model,
-                               faceId=model.includeGeo(innerFace, Vector([0, 0, 1]).geometry, face.category))
+                               faceId=model.includeGeo(innerFace, Vector([0, 0, 1]).geometry, face.category),
+                               level=face.level, offset=face.offset)
     else:
         return None
     for i, outf in enumerate(outerFace):
         if pygeos.area(outerFace[i]) > geom.AREA_PRECISION:
             outerFace[i] = MoosasFace(model=model,
-                                      faceId=model.includeGeo(outf, Vector([0, 0, 1]).geometry, face.category))
+                                      faceId=model.includeGeo(outf, Vector([0, 0, 1]).geometry, face.category),
+                                      level=face.level, offset=face.offset)
         else:
             outerFace[i] = None
     outerFace = [outf for outf in outerFace if outf is not None]
@@ -503,7 +922,7 @@ def splitFaces(face: MoosasFace, edge: MoosasEdge) -> (MoosasFace, list[MoosasFa
     innerGlazings, outerGlazings = [], []  # record for inner and outer skylights
     for gls in face.glazingElement:
         g2d = makeValid(gls.force_2d())[0]
-        overArea = overlapArea(g2d, edge.force_2d())
+        overArea = overlapArea(g2d, edge2d)
 
         # aperture lay inside the edge
         if overArea > gls.area - geom.AREA_PRECISION:
@@ -515,17 +934,19 @@ def splitFaces(face: MoosasFace, edge: MoosasEdge) -> (MoosasFace, list[MoosasFa
 
         # aperture need to be split
         else:
-            innerGls = pygeos.force_3d(pygeos.intersection(g2d, edge.force_2d(),grid_size=geom.POINT_PRECISION), z=face.elevation)
-            outerGls = pygeos.force_3d(pygeos.difference(g2d, edge.force_2d(),grid_size=geom.POINT_PRECISION), z=face.elevation)
+            innerGls = pygeos.force_3d(pygeos.intersection(g2d, edge2d,grid_size=geom.POINT_PRECISION), z=face.elevation)
+            outerGls = pygeos.force_3d(pygeos.difference(g2d, edge2d,grid_size=geom.POINT_PRECISION), z=face.elevation)
             outerGls = pygeos.get_parts(outerGls)
 
             innerGls = MoosasSkylight(model=model,
                                       faceId=model.includeGeo(makeValid(innerGls)[0], Vector([0, 0, 1]).geometry,
-                                                              gls.category))
+                                                              gls.category),
+                                      level=face.level, offset=face.offset)
             for i, outf in enumerate(outerGls):
                 outerGls[i] = MoosasSkylight(model=model,
                                              faceId=model.includeGeo(makeValid(outf)[0], Vector([0, 0, 1]).geometry,
-                                                                     gls.category))
+                                                                     gls.category),
+                                             level=face.level, offset=face.offset)
 
             model.skylightList = list(np.append(np.append(model.skylightList, [innerGls]), outerGls))
             model.skylightList.remove(gls)
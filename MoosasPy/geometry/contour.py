@@ -1,6 +1,9 @@
 """Ver0.4.3.3 new contour calculation module, more serious and stable"""
 from __future__ import annotations
 
+import contextlib
+import io
+
 from .geos import *
 from .element import MoosasEdge, MoosasWall, MoosasGlazing, MoosasContainer
 from ..encoding.convexify import triangulate2dFace
@@ -333,6 +336,11 @@ def closed_contour_calculation(model: MoosasContainer, bld_level: float) -> Moos
     # for ed in network.edges:
     #     print(pygeos.get_coordinates([ed.fromP.location,ed.toP.location]).tolist())
 
+    return _documentBoundary(_closedContour(network, bld_level), model)
+
+
+def _closedContour(network: TopoNetwork, bld_level: float) -> list[TopoBound]:
+    """split the network, then find the outer boundaries of each part and divide them"""
     networks = TopoNetwork.splitNetwork(network)
     print(f'\rTOPOLOGY: in {bld_level}: Calculate outer Boundary', end='')
     """calculate the outer boundaries (the biggest boundaries) of each network"""
@@ -358,16 +366,71 @@ def closed_contour_calculation(model: MoosasContainer, bld_level: float) -> Moos
     # 2.5 展平boundarylist并检查是否顺时针,转换为edge
     print(f'\rTOPOLOGY: in {bld_level}: find {len(boundariesNew)} boundaries')
     # plot_plan_in_node(node_list, [bound for group in boundary_coordinates for bound in group], location_list, False, True)
-    model = _documentBoundary(np.array(boundariesNew).flatten(), model)
+    return list(np.array(boundariesNew).flatten())
 
-    return model
 
+def half_edge_contour_calculation(model: MoosasContainer, bld_level: float) -> MoosasContainer:
+    """calculate the closed contour in the given building level by the half-edge face enumeration.
+    Unlike closed_contour_calculation, the boundaries are not divided by depth-limited path searches,
+    all minimal boundaries of the network are found in one traversal (see TopoNetwork.minimalBoundaries).
+    the recognized boundaries will be recorded into the MoosasModel.
 
-def _documentBoundary(boundaries: Iterable[TopoBound], model: MoosasContainer) -> MoosasContainer:
-    for i, bound in enumerate(boundaries):
+    ---------------------------------
+    bld_level: building level to retrieve in float
+    model: get topoEdge from this model
+
+    return: model:MoosasModel
+    """
+    network = TopoNetwork.inLevel(bld_level, model)
+    if network.edges is None or network.nodes is None:
+        return model
+
+    return _documentBoundary(_halfEdgeContour(network, bld_level), model)
+
+
+def _halfEdgeContour(network: TopoNetwork, bld_level: float) -> list[TopoBound]:
+    """enumerate the minimal boundaries of the network"""
+    print(f'\rTOPOLOGY: in {bld_level}: Enumerate minimal boundary', end='')
+    boundaries = network.minimalBoundaries()
+    print(f'\rTOPOLOGY: in {bld_level}: find {len(boundaries)} boundaries')
+    return boundaries
+
+
+def level_contour_calculation(contour, bld_level: float, ids: np.ndarray, lines: np.ndarray,
+                              quiet=False) -> list[list[int]]:
+    """calculate the closed contour of a level from the compact wall projections (see TopoNetwork.levelLines).
+    only the projections are required, so the levels can be sent to other processes,
+    and the boundaries are returned as the index of the walls.
+
+    ---------------------------------
+    contour: _closedContour or _halfEdgeContour
+    bld_level: building level in float
+    ids: (N,) index of the walls in model.wallList
+    lines: (N,2,2) coordinates of the start and end points of the walls
+    quiet: mute the progress printing
+
+    return: list[list[int]] index of the walls in each boundary, in counterclockwise
+    """
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        network = TopoNetwork.fromLines(ids, lines)
+        if network.edges is None or network.nodes is None:
+            return []
+        return _boundaryLoops(contour(network, bld_level))
+
+
+def _boundaryLoops(boundaries: Iterable[TopoBound]) -> list[list[int]]:
+    """the index of the walls in each boundary, the boundaries are turned to counterclockwise"""
+    loops = []
+    for bound in boundaries:
         if not is_ccw(bound.geometry):
             bound.reverse()
-        model.boundaryList.append([model.wallList[edge.modelId] for edge in bound.edgeLoop])
+        loops.append([edge.modelId for edge in bound.edgeLoop])
+    return loops
+
+
+def _documentBoundary(boundaries: Iterable[TopoBound], model: MoosasContainer) -> MoosasContainer:
+    for loop in _boundaryLoops(boundaries):
+        model.boundaryList.append([model.wallList[i] for i in loop])
     return model
 
 
@@ -393,7 +456,7 @@ def packing_edges(model: MoosasContainer, divided_zones) -> MoosasContainer:
     """Divide the boundaries into simple polygons"""
     if divided_zones:
         for levelIdx, bldLevel in enumerate(model.levelList):
-            edges = np.array(model.edgeList)[searchBy('level', bldLevel, model.edgeList)]
+            edges = model.searchBy('level', bldLevel, 'edgeList', asObject=True)
             for edgeIdx, edge in enumerate(edges):
                 holes = [subEdge.force_2d() for subEdge in edges if
                          pygeos.contains(edge.force_2d(), subEdge.force_2d())]
@@ -412,7 +475,7 @@ def packing_edges(model: MoosasContainer, divided_zones) -> MoosasContainer:
                                 model.wallList = np.append(model.wallList, airWall)
                             except Exception as e:
                                 print(f"Air Boundary Error: {e}")
-                    walls = np.array(model.wallList)[searchBy('level', bldLevel, model.wallList)]
+                    walls = model.searchBy('level', bldLevel, 'wallList', asObject=True)
                     newConstructEdges = []
                     for ed in newEdges:
                         try:
@@ -422,6 +485,7 @@ def packing_edges(model: MoosasContainer, divided_zones) -> MoosasContainer:
                     newEdges = newConstructEdges
                     model.edgeList.remove(edge)
                     model.edgeList += newEdges
+                    model.indexChanged()
                 print(f'\rTOPOLOGY: in {bldLevel}: Dividing zones {edgeIdx}/{len(edges)}', end='')
 
     model.wall_remain = list(faceSet)
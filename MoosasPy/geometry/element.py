@@ -12,11 +12,22 @@ from ..utils import pygeos, np, ET, Iterable
 from ..utils.constant import geom
 from ..encoding.convexify import triangulate2dFace
 import re
+import json
+import hashlib
 # 不做inch meter转换
 INCH_METER_MULTIPLIER = 1
 INCH_METER_MULTIPLIER_SQR = 1
 
 
+def _contentDigest(*parts: str | bytes) -> str:
+    """deterministic digest of the parts, unlike hash() it does not change across runs"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
 def _getElement(*key: str, dictionary: dict, strict=True) -> np.ndarray:
     l = []
     for k in key:
@@ -34,15 +45,33 @@ class MoosasGeometry(object):
     the class object can only be created and never be changed.
     the is valid method is used to test whether this object can be used in moosas+.
     """
-    __slots__ = ['__face', '__normal', '__faceId', '__category', '__holes', 'delete', 'flip']
+    __slots__ = ['__face', '__normal', '__faceId', '__category', '__holes', '__polygon', '__lazy', '__hash', 'delete',
+                 'flip']
 
     def __init__(self, face: pygeos.Geometry | np.ndarray, faceId, normal: pygeos.Geometry | Vector | np.ndarray = None,
                  category=0,
-                 holes: list[pygeos.Geometry | np.ndarray] = None, errors='ignore'):
-        if normal is None:
-            normal = faceNormal(face)
+                 holes: list[pygeos.Geometry | np.ndarray] = None, errors='ignore', lazy=False):
+        """lazy: only keep the raw coordinates, the polygon, the normal (if not given) and the validation
+        are done on the first access of the face. Use it for geometries from trusted sources, e.g. saved models.
+        """
         if not holes:
             holes = []
+        self.__polygon = None
+        self.__hash = None
+        self.__lazy = lazy
+        if lazy:
+            self.__face: np.ndarray = self._rawFace(face)
+            self.__holes: list[np.ndarray] = [self._rawFace(hole) for hole in holes]
+            self.__normal: Vector | None = Vector(normal) if normal is not None else None
+            if self.__normal is not None and self.__normal.length() == 0:
+                raise GeometryError(face, "zero-length normal")
+            self.flip = False
+            self.__faceId: str = str(faceId)
+            self.__category: int = category
+            self.delete: bool = False
+            return
+        if normal is None:
+            normal = faceNormal(face)
         # test if input is valid
         if Vector(normal).length() == 0:
             raise GeometryError(face, "zero-length normal")
@@ -62,6 +91,26 @@ class MoosasGeometry(object):
             else:
                 raise GeometryError(face, f"invalid polygon received:{self.invalid()}")
 
+    @staticmethod
+    def _rawFace(face) -> np.ndarray:
+        """vectorized version of _treatFace for the lazy geometries, only drop the duplicated points."""
+        face = pygeos.get_coordinates(face, include_z=True) if isinstance(face, pygeos.Geometry) else np.array(
+            face, dtype=float)
+        if face.ndim != 2 or len(face) < 3:
+            raise GeometryError(face, "too few points")
+        if face.shape[1] == 2:
+            face = np.hstack([face, np.zeros((len(face), 1))])
+        face = face[np.concatenate([[True], np.any(face[1:] != face[:-1], axis=1)])]
+        if len(face) < 3 or (len(face) == 3 and np.all(face[0] == face[-1])):
+            raise GeometryError(face, "too few points")
+        return face
+
+    def _materialize(self) -> None:
+        """build the polygon of a lazy geometry and do the validation skipped in __init__."""
+        self.__lazy = False
+        if self.invalid() is not None:
+            print(f"******Warning: GeometryError, invalid polygon received:{self.invalid()}")
+
     @staticmethod
     def _treatFace(face) -> np.ndarray:
         """preprocess the face or holes."""
@@ -95,8 +144,17 @@ class MoosasGeometry(object):
 
     @property
     def face(self) -> pygeos.Geometry:
-        holes = self.holes if len(self.__holes) > 0 else None
-        return pygeos.polygons(geometries=self.boundary, holes=holes)
+        if self.__polygon is None:
+            if self.__lazy:
+                self._materialize()
+            holes = self.holes if len(self.__holes) > 0 else None
+            self.__polygon = pygeos.polygons(geometries=self.boundary, holes=holes)
+        return self.__polygon
+
+    @property
+    def lazy(self) -> bool:
+        """whether the polygon of the geometry has not been built yet"""
+        return self.__lazy
 
     @property
     def boundary(self):
@@ -104,6 +162,11 @@ class MoosasGeometry(object):
 
     @property
     def normal(self) -> pygeos.Geometry:
+        if self.__normal is None:
+            normal = Vector(faceNormal(self.face))
+            if normal.length() == 0:
+                raise GeometryError(self.face, "zero-length normal")
+            self.__normal = normal
         if self.flip:
             return (-self.__normal).geometry
         else:
@@ -113,6 +176,10 @@ class MoosasGeometry(object):
     def faceId(self) -> str:
         return self.__faceId
 
+    def _rename(self, faceId: str) -> None:
+        """change the id when the geometry is adopted by another library, see MoosasContainer.adoptGeo()"""
+        self.__faceId = str(faceId)
+
     @property
     def category(self) -> int:
         """
@@ -126,6 +193,42 @@ class MoosasGeometry(object):
     def holes(self) -> list[pygeos.Geometry]:
         return [pygeos.linearrings(hole) for hole in self.__holes]
 
+    @property
+    def coordinates(self) -> np.ndarray:
+        """the closed boundary coordinates as a (n,3) array, a view if the geometry is bound to a store"""
+        return self.__face
+
+    @property
+    def holeCoordinates(self) -> list[np.ndarray]:
+        """the closed coordinates of the holes as (n,3) arrays"""
+        return self.__holes
+
+    def _bind(self, face: np.ndarray, holes: list[np.ndarray]) -> None:
+        """replace the coordinates by views of a MoosasGeometryStore, the values should be the same."""
+        self.__face = face
+        self.__holes = holes
+
+    @property
+    def contentHash(self) -> str:
+        """deterministic hash of the quantized coordinates (by geom.POINT_PRECISION), holes, category and flip"""
+        if self.__hash is None:
+            rings = [self.__face] + self.__holes
+            quantized = np.round(np.concatenate(rings) / geom.POINT_PRECISION).astype(np.int64)
+            self.__hash = _contentDigest(quantized.tobytes(), np.array([len(ring) for ring in rings]).tobytes(),
+                                         self.__category)
+        return _contentDigest(self.__hash, 'flip') if self.flip else self.__hash
+
+    def instanceKey(self) -> tuple[tuple, np.ndarray]:
+        """the shape key of the geometry regardless of its position, and the anchor (first point) of the geometry.
+        two geometries with the same key are translated copies of each other within 1e-6.
+        """
+        anchor = self.__face[0]
+        rings = [self.__face] + self.__holes
+        relative = np.round((np.concatenate(rings) - anchor) * 1e6).astype(np.int64)
+        normal = np.round(pygeos.get_coordinates(self.normal, include_z=True)[0], 3) + 0.
+        key = (self.category, tuple(len(ring) for ring in rings), relative.tobytes(), normal.tobytes())
+        return key, anchor
+
     def getEdgeStr(self) -> list[str]:
         """get a unique edge string of the boundary, ignore the direction of the edge."""
         faces = [self.boundary] + self.holes
@@ -151,6 +254,145 @@ class MoosasGeometry(object):
 
         return [edgeStr for edgeStr in edge_str_s if edge_str_s[edgeStr] == 0]
 
+    def getEdgeKey(self) -> list[tuple[int, ...]]:
+        """integer version of getEdgeStr(): (x1, y1, z1, x2, y2, z2) in centimeter, ignore the direction of the edge.
+        the keys are the same as the numbers in the edge strings.
+        """
+        edge_key_s = {}
+        for face in [self.boundary] + self.holes:
+            coors = pygeos.get_coordinates(face, include_z=True)
+            if len(coors) < 2:
+                continue
+            centimeter = np.trunc(coors * 100).astype(np.int64)
+            total = coors[:, 0] + coors[:, 1] + coors[:, 2]
+            start, end = centimeter[:-1], centimeter[1:]
+            swap = (total[:-1] > total[1:])[:, None]
+            keys = np.hstack([np.where(swap, end, start), np.where(swap, start, end)])
+            for key in map(tuple, keys[np.any(start != end, axis=1)].tolist()):
+                edge_key_s[key] = key in edge_key_s
+        return [edgeKey for edgeKey in edge_key_s if not edge_key_s[edgeKey]]
+
+
+class MoosasGeometryStore(object):
+    """columnar (structure-of-arrays) store of a list of MoosasGeometry.
+
+    all coordinates are kept in one contiguous float64 array, and each geometry is bound to views of it,
+    hence whole-model operations (bounding box, normals, export) can be done by single numpy calls.
+    the store does not follow the changes of the library, rebuild it when the library has been changed.
+
+    Attributes:
+        geometries (list[MoosasGeometry]): the geometries in the store.
+        faceId (np.ndarray): (G,) identifications of the geometries.
+        vertices (np.ndarray): (V,3) float64 coordinates of all rings, each ring is closed.
+        ringOffsets (np.ndarray): (R+1,) ring r is vertices[ringOffsets[r]:ringOffsets[r+1]].
+        partOffsets (np.ndarray): (G+1,) geometry g owns rings partOffsets[g]:partOffsets[g+1],
+            the first one is the boundary and the rest are holes.
+        category (np.ndarray): (G,) category of the geometries.
+    """
+    __slots__ = ['geometries', 'faceId', 'vertices', 'ringOffsets', 'partOffsets', 'category', '__normal', '__index']
+
+    def __init__(self, geometries: Iterable[MoosasGeometry], bind=True):
+        """
+        Args:
+            geometries (Iterable[MoosasGeometry]): geometries to store.
+            bind (bool): bind the coordinates of the geometries to the views of the store. Defaults to True.
+        """
+        self.geometries: list[MoosasGeometry] = list(geometries)
+        rings = [ring for geo in self.geometries for ring in [geo.coordinates] + list(geo.holeCoordinates)]
+        rings = [ring if np.all(ring[0] == ring[-1]) else np.vstack([ring, ring[:1]]) for ring in rings]
+        ringLength = np.array([len(ring) for ring in rings], dtype=int)
+        self.ringOffsets = np.concatenate([[0], np.cumsum(ringLength)]).astype(int)
+        self.partOffsets = np.concatenate(
+            [[0], np.cumsum([1 + len(geo.holeCoordinates) for geo in self.geometries])]).astype(int)
+        self.vertices = np.concatenate(rings).astype(np.float64) if len(rings) > 0 else np.zeros((0, 3))
+        self.faceId = np.array([geo.faceId for geo in self.geometries], dtype=str)
+        self.category = np.array([geo.category for geo in self.geometries], dtype=int)
+        self.__normal = np.array([pygeos.get_coordinates(geo.normal, include_z=True)[0] for geo in self.geometries],
+                                 dtype=np.float64).reshape(-1, 3)
+        self.__index = None
+        if bind:
+            for i, geo in enumerate(self.geometries):
+                geo._bind(self.ring(self.partOffsets[i]),
+                          [self.ring(r) for r in range(self.partOffsets[i] + 1, self.partOffsets[i + 1])])
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def ring(self, r: int) -> np.ndarray:
+        """coordinates (a view) of ring r"""
+        return self.vertices[self.ringOffsets[r]:self.ringOffsets[r + 1]]
+
+    def index(self, faceId: str) -> int:
+        """position of a geometry in the store"""
+        if self.__index is None:
+            self.__index = {idd: i for i, idd in enumerate(self.faceId)}
+        return self.__index[faceId]
+
+    @property
+    def normal(self) -> np.ndarray:
+        """(G,3) normals of the geometries (MoosasGeometry.normal, flip considered) when the store is built"""
+        return self.__normal
+
+    @property
+    def vertexOwner(self) -> np.ndarray:
+        """(V,) index of the geometry that each vertex belongs to"""
+        ringOwner = np.repeat(np.arange(len(self.geometries)), np.diff(self.partOffsets))
+        return np.repeat(ringOwner, np.diff(self.ringOffsets))
+
+    def bounds(self) -> np.ndarray:
+        """axis aligned bounding boxes of all geometries.
+
+        Returns:
+            np.ndarray: (G,2,3) [[xmin,ymin,zmin],[xmax,ymax,zmax]] of each geometry
+        """
+        if len(self.geometries) == 0:
+            return np.zeros((0, 2, 3))
+        start = self.ringOffsets[self.partOffsets[:-1]]
+        return np.stack([np.minimum.reduceat(self.vertices, start, axis=0),
+                         np.maximum.reduceat(self.vertices, start, axis=0)], axis=1)
+
+    def meanZ(self) -> np.ndarray:
+        """(G,) average z coordinate of all vertices (holes and closing vertices included) of each geometry"""
+        if len(self.geometries) == 0:
+            return np.zeros(0)
+        start = self.ringOffsets[self.partOffsets[:-1]]
+        count = np.diff(np.append(start, len(self.vertices)))
+        return np.add.reduceat(self.vertices[:, 2], start) / count
+
+    def totalBounds(self) -> np.ndarray:
+        """(2,3) axis aligned bounding box of the whole store"""
+        return np.array([np.min(self.vertices, axis=0), np.max(self.vertices, axis=0)])
+
+    def toGeoString(self, instanced=False) -> str:
+        """dump the store in *.geo format, see IO.writeGeo()
+
+        Args:
+            instanced (bool): write the translated copies of a written geometry as instance blocks. Defaults to False.
+        """
+        vertexStr = self.vertices.astype(str)
+        normalStr = self.__normal.astype(str)
+        geoStr = []
+        definitions = {}
+        for g, geo in enumerate(self.geometries):
+            if instanced:
+                key, anchor = geo.instanceKey()
+                if key in definitions:
+                    source = definitions[key]
+                    translation = anchor - source.coordinates[0]
+                    # only write the instance if the reader can rebuild exactly the same coordinates
+                    if all(np.array_equal(ring + translation, target) for ring, target in
+                           zip([source.coordinates] + source.holeCoordinates, [geo.coordinates] + geo.holeCoordinates)):
+                        geoStr.append(f'i,{source.faceId},{self.faceId[g]},' + ','.join(translation.astype(str)) + '\n;\n')
+                        continue
+                else:
+                    definitions[key] = geo
+            faceStr = [f'f,{self.category[g]},{self.faceId[g]}', 'fn,' + ','.join(normalStr[g])]
+            for r in range(self.partOffsets[g], self.partOffsets[g + 1]):
+                prefix = 'fv,' if r == self.partOffsets[g] else f'fh,{r - self.partOffsets[g] - 1},'
+                faceStr += [prefix + ','.join(poi) for poi in vertexStr[self.ringOffsets[r]:self.ringOffsets[r + 1] - 1]]
+            geoStr.append('\n'.join(faceStr) + '\n;\n')
+        return ''.join(geoStr)
+
 
 class MoosasElement(object):
     """
@@ -199,8 +441,12 @@ class MoosasElement(object):
     'glazingUV': get UV faces of all glazing elements
     'faceUV': get UV faces of itself
     'getEdgeStr': get unique descriptions in string of all edges in this element
+    'getEdgeKey': integer version of getEdgeStr, used to build the edge topology
     'getWeightCenter': Gets the weighted center point
     'add_glazing': add glazing Element to the glazingId.
+    'clearCache': drop the memoized derived values (normal, area, face, faceId, category, force_2d, faceUV),
+        it is called automatically by replaceGeo, dissolve, _merge, add_glazing and level/offset changes.
+    'contentHash': deterministic hash of the type, level, offset, geometries and glazing, stable across runs.
 
     Conceptual method:
     'force_2d': A conceptual approach to obtaining a two-dimensional representation of geometry on a floor plan
@@ -210,7 +456,10 @@ class MoosasElement(object):
     fromDict: construct an element from a dictionary which may be given by toDictionary method from a xmlTree
 
     """
-    __slots__ = ['__geometries', 'level', 'offset', 'Uid', '__glazingElement', 'parent', 'neighbor', 'isOuter', 'space','shading']
+    __slots__ = ['__geometries', '__level', '__offset', '__cache', 'Uid', '__glazingElement', 'parent', 'neighbor',
+                 'isOuter', 'space', 'shading']
+    # hit/miss counter of the memoized derived values for all elements
+    cacheCounter = {'hit': 0, 'miss': 0}
 
     def __init__(self, model: MoosasContainer,
                  faceId: str | list[str] | np.ndarray[str] | MoosasGeometry | list[MoosasGeometry] | np.ndarray[
@@ -221,6 +470,7 @@ class MoosasElement(object):
                  uid=None):
         self.parent: MoosasContainer = model  # this is MoosasModel !!!
         self.Uid: str = generate_code(6) if uid is None else uid
+        self.__cache: dict = {}
         self.level: float = level
         self.offset: float = offset
         self.shading=[]
@@ -238,15 +488,63 @@ class MoosasElement(object):
         for idd in faceId:
             if isinstance(idd, str):
                 try:
-                    idd = model.geoId.index(idd)
+                    geo = model.getGeo(idd)
                 except ValueError as ve:
                     raise ValueError(f"index {idd} is not in the library.")
-                self.__geometries: np.ndarray[MoosasGeometry] = np.append(self.__geometries, model.geometryList[idd])
+                self.__geometries: np.ndarray[MoosasGeometry] = np.append(self.__geometries, geo)
             elif isinstance(idd, MoosasGeometry):
                 self.__geometries: np.ndarray[MoosasGeometry] = np.append(self.__geometries, idd)
             else:
                 raise TypeError("idd must be either a string or a MoosasGeometry")
 
+    @property
+    def level(self) -> float:
+        return self.__level
+
+    @level.setter
+    def level(self, value: float):
+        if getattr(self, '_MoosasElement__level', None) != value \
+                and getattr(self.parent, '_indexVersion', None) is not None:
+            # the attribute index of the model should be refreshed
+            self.parent._indexVersion += 1
+        self.__level = value
+        self.__cache.clear()
+
+    @property
+    def offset(self) -> float:
+        return self.__offset
+
+    @offset.setter
+    def offset(self, value: float):
+        self.__offset = value
+        self.__cache.clear()
+
+    def _memo(self, key, func):
+        """get a derived value from the cache, or calculate it by func() and record it"""
+        try:
+            value = self.__cache[key]
+            MoosasElement.cacheCounter['hit'] += 1
+        except KeyError:
+            MoosasElement.cacheCounter['miss'] += 1
+            value = self.__cache[key] = func()
+        return value
+
+    def clearCache(self) -> None:
+        """drop all memoized derived values of this element"""
+        self.__cache.clear()
+
+    @property
+    def contentHash(self) -> str:
+        """deterministic hash of the element type, level, offset, member geometries and glazing.
+        unlike Uid it is stable across runs, and it can be used as the key to skip the unchanged elements.
+        """
+        ownHash = self._memo('contentHash', lambda: _contentDigest(
+            type(self).__name__, repr(float(self.level)), repr(float(self.offset)),
+            *[geo.contentHash for geo in self.__geometries]))
+        if len(self.__glazingElement) == 0:
+            return ownHash
+        return _contentDigest(ownHash, *[gls.contentHash for gls in self.glazingElement])
+
     @property
     def glazingElement(self) -> list[MoosasGlazing | MoosasSkylight]:
         """protect the __glazingElement attribute"""
@@ -264,17 +562,17 @@ class MoosasElement(object):
         if you want to get a list anyway,
         you can call mixItemListToList() func in utils.tools.
         """
-        return mixItemListToObject([geo.face for geo in self.__geometries])
+        return self._memo('face', lambda: mixItemListToObject([geo.face for geo in self.__geometries]))
 
     @property
     def mergedFace(self) -> pygeos.Geometry:
         """return a single face merging all faces contained in this element"""
         if len(self.__geometries) == 1:
             return self.__geometries[0].face
-        proj = Projection(origin=np.mean(pygeos.get_coordinates(self.face,include_z=True),axis=0),unitZ=self.normal)
-        UVFaces = [proj.toUV(g) for g in self.face]
+        proj = Projection.cached(origin=np.mean(pygeos.get_coordinates(self.face,include_z=True),axis=0),unitZ=self.normal)
+        UVFaces = proj.toUVArray(self.face)
         mergedUVFace = pygeos.force_3d(pygeos.union_all(pygeos.force_2d(UVFaces)),z=0)
-        return proj.toWorld(mergedUVFace)
+        return proj.toWorldArray([mergedUVFace])[0]
     @property
     def holes(self) -> pygeos.Geometry | np.ndarray[pygeos.Geometry]:
         return [h for geo in self.__geometries for h in geo.holes]
@@ -283,16 +581,16 @@ class MoosasElement(object):
     def normal(self) -> np.ndarray:
         """if the element contains multi faces,
         the normal has the best description of the faces will be returned"""
+        return self._memo('normal', self._normal).copy()
+
+    def _normal(self) -> np.ndarray:
         if len(self.__geometries) == 1:
             return Vector(self.__geometries[0].normal).uniform.unit().array
 
         # PCA1: get covariance matrix
         coordinates = pygeos.get_coordinates([geo.face for geo in self.__geometries], include_z=True) - np.array(
             self.getWeightCenter())
-        C = np.zeros((3, 3))
-        for coor in coordinates:
-            C += np.matmul(coor.reshape(3, 1), coor.reshape(1, 3))
-        C /= len(coordinates)
+        C = np.matmul(coordinates.T, coordinates) / len(coordinates)
 
         # PCA2: get minimum characteristic
         eig_values, eig_vectors = np.linalg.eig(C)
@@ -304,7 +602,7 @@ class MoosasElement(object):
             if you want to get a list anyway,
             you can call mixItemListToList() func in utils.tools.
         """
-        return mixItemListToObject([geo.faceId for geo in self.__geometries])
+        return self._memo('faceId', lambda: mixItemListToObject([geo.faceId for geo in self.__geometries]))
 
     @property
     def category(self) -> int | np.ndarray[int]:
@@ -312,12 +610,12 @@ class MoosasElement(object):
             if you want to get a list anyway,
             you can call mixItemListToList() func in utils.tools.
         """
-        return mixItemListToObject([geo.category for geo in self.__geometries])
+        return self._memo('category', lambda: mixItemListToObject([geo.category for geo in self.__geometries]))
 
     @property
     def area(self) -> float:
         """quick link to self.area3d"""
-        return self.area3d()
+        return self._memo('area', self.area3d)
 
     @property
     def elevation(self) -> float:
@@ -366,14 +664,15 @@ class MoosasElement(object):
 
     def replaceGeo(self, geoId):
         # get the geometry(s)
+        self.__cache.clear()
         faceId = mixItemListToList(geoId)
         self.__geometries: np.ndarray[MoosasGeometry] = np.array([])
         for idd in faceId:
             try:
-                idd = self.parent.geoId.index(idd)
-            except:
+                geo = self.parent.getGeo(idd)
+            except ValueError:
                 raise ValueError(f"index {idd} is not in the library.")
-            self.__geometries: np.ndarray[MoosasGeometry] = np.append(self.__geometries, self.parent.geometryList[idd])
+            self.__geometries: np.ndarray[MoosasGeometry] = np.append(self.__geometries, geo)
 
     def delete(self):
         for geo in self.__geometries:
@@ -396,9 +695,11 @@ class MoosasElement(object):
         """Ver1.3 The projection class is added to perform UV expression on the surface and the glass surface
         get the UV faces
         """
-        trans = Projection(self.getWeightCenter(), self.normal)
-        faces = np.array(self.face).flatten()
-        faces = [pygeos.force_2d(trans.toUV(face)) for face in faces]
+        return list(self._memo(('faceUV', uniform), lambda: self._faceUV(uniform)))
+
+    def _faceUV(self, uniform=False) -> list[pygeos.Geometry]:
+        trans = Projection.cached(self.getWeightCenter(), self.normal)
+        faces = list(pygeos.force_2d(trans.toUVArray(self.face)))
         if uniform:
             boundaryBox = pygeos.get_coordinates(faces)
             boundaryBox = [[np.min(boundaryBox.T[0]), np.min(boundaryBox.T[1])],
@@ -423,10 +724,9 @@ class MoosasElement(object):
         gidList = []
         for gElement in self.glazingElement:
             gidList += mixItemListToList(gElement.faceId)
-        for gid in gidList:
-            gface = self.parent.geoFaceList[self.parent.geoId.index(gid)]
-            trans = Projection(self.getWeightCenter(), self.normal)
-            faces.append(trans.toUV(gface))
+        if len(gidList) > 0:
+            trans = Projection.cached(self.getWeightCenter(), self.normal)
+            faces = list(trans.toUVArray([self.parent.getGeo(gid).face for gid in gidList]))
         if uniform:
             boundaryBox = pygeos.get_coordinates(np.array(self.face).flatten())
             boundaryBox = [[np.min(boundaryBox.T[0]), np.min(boundaryBox.T[1])],
@@ -449,6 +749,13 @@ class MoosasElement(object):
             edge_str_s = edge_str_s | set(geo.getEdgeStr())
         return list(edge_str_s)
 
+    def getEdgeKey(self) -> list[tuple[int, ...]]:
+        """get a unique edge key (integers) of the boundary, ignore the direction of the edge. see getEdgeStr()"""
+        edge_key_s = set()
+        for geo in self.__geometries:
+            edge_key_s = edge_key_s | set(geo.getEdgeKey())
+        return list(edge_key_s)
+
     def getWeightCenter(self) -> np.ndarray[np.ndarray]:
         point_list = pygeos.get_coordinates(self.face, include_z=True)[:-1]
         return np.array([np.mean(point_list.T[0]), np.mean(point_list.T[1]), np.mean(point_list.T[2])])
@@ -456,12 +763,14 @@ class MoosasElement(object):
     def add_glazing(self, glazingObject: MoosasGlazing | MoosasSkylight):
         self.__glazingElement = list(np.append(self.__glazingElement, glazingObject))
         glazingObject.parentFace = self
+        self.__cache.clear()
 
     def dissolve(self, others):
         """method to merge multiple elements"""
         if not (isinstance(others, list) or isinstance(others, np.ndarray)):
             others = [others]
         others = list(others)
+        self.__cache.clear()
         target = None
         for o in others:
             # find face with coEdge and merge it
@@ -493,11 +802,12 @@ class MoosasElement(object):
         vectors = [trans.toUV(Vector(v).geometry) for v in vectors]
         unitxSelf, unitxOther, unitySelf, unityOther = vectors
         if Vector.dot(Vector.cross(unitxSelf, unitySelf), Vector.cross(unitxOther, unityOther)) > 0:
-            for g in range(len(other.__geometries)):
-                other.__geometries[g].flip = True
+            other.parent.flipGeo(other.__geometries)
+            other.__cache.clear()
 
         """method to merge one other elements"""
         self.__geometries = np.append(self.__geometries, other.__geometries)
+        self.__cache.clear()
         self.offset = min(self.offset + self.level, other.offset + other.level) - min(self.level, other.level)
         self.level = min(self.level, other.level)
         for gls in other.glazingElement:
@@ -601,6 +911,9 @@ class MoosasFace(MoosasElement):
         super(MoosasFace, self).__init__(model, faceId, level=level, offset=offset, glazingElement=glazingElement,
                                          space=space, glazingId=glazingId, uid=uid)
         self.parentFloors: list[MoosasFloor] = []
+        # a level given with its offset (e.g. by the classification) is used as it is
+        if level is not None and offset is not None:
+            return
         # calculates the plane elevation
         pointlist = pygeos.get_coordinates(self.face, include_z=True)
         coordinates_z = pointlist[:, 2]
@@ -608,8 +921,6 @@ class MoosasFace(MoosasElement):
         _facebotheight = np.round(np.mean(coordinates_z), 3)
         if np.isnan(_facebotheight):
             raise GeometryError(self.face, "invalid geometry")
-        pointlist = list(pointlist)
-        pointlist.pop()
 
         for bld_level in model.levelList:
             if np.abs(_facebotheight - bld_level) < geom.LEVEL_MAX_OFFSET:
@@ -623,7 +934,7 @@ class MoosasFace(MoosasElement):
     @classmethod
     def fromDict(cls, elementDict, model: MoosasContainer):
         element = super(MoosasFace, cls).fromDict(elementDict, model)
-        faceElement = cls(model, element.faceId, element.glazingId)
+        faceElement = cls(model, element.faceId, glazingId=element.glazingId)
         for fid in mixItemListToList(element.faceId):
             model.builtData.elements[fid] = faceElement
         return faceElement
@@ -631,7 +942,7 @@ class MoosasFace(MoosasElement):
     def force_2d(self, region=True) -> pygeos.Geometry:
         # region is an useless arg to ensure consistency
 
-        return pygeos.force_2d(self.face)
+        return self._memo('force_2d', lambda: pygeos.force_2d(self.face))
 
     def to_xml(self, model: MoosasContainer, Element_tag='face', writeGeometry=False):
         face_xml = super(MoosasFace, self).to_xml(model, Element_tag, writeGeometry=writeGeometry)
@@ -744,7 +1055,7 @@ class MoosasWall(MoosasElement):
     @classmethod
     def fromDict(cls, elementDict, model: MoosasContainer):
         element = super(MoosasWall, cls).fromDict(elementDict, model)
-        faceElement = cls(model, element.faceId, element.glazingId)
+        faceElement = cls(model, element.faceId, glazingId=element.glazingId)
         for fid in mixItemListToList(element.faceId):
             model.builtData.elements[fid] = faceElement
         return faceElement
@@ -830,6 +1141,7 @@ class MoosasWall(MoosasElement):
         return np.max(top) - np.min(bot)
 
     def prepareProjection(self):
+        self.clearCache()
         pointlist = pygeos.get_coordinates(self.face, include_z=True)
         bottom = np.min(pointlist[:, 2])
         above = np.max(pointlist[:, 2])
@@ -844,6 +1156,9 @@ class MoosasWall(MoosasElement):
 
     # conceptual method in the based class
     def force_2d(self, top=False, region=False) -> pygeos.Geometry | None:
+        return self._memo(('force_2d', top, region), lambda: self._force_2d(top, region))
+
+    def _force_2d(self, top=False, region=False) -> pygeos.Geometry | None:
         if region:
             lBot, lTop = self.force_2d(False, False), self.force_2d(True, False)
             if not pygeos.disjoint(lBot, lTop):
@@ -1018,6 +1333,11 @@ class MoosasFloor:
         for f in self.face:
             f.parentFloors.append(self)
 
+    @property
+    def contentHash(self) -> str:
+        """deterministic hash of the faces"""
+        return _contentDigest('MoosasFloor', *sorted(f.contentHash for f in self.face))
+
     @classmethod
     def fromDict(cls, floorDict, model: MoosasContainer):
         faces = _getElement('face', dictionary=floorDict)
@@ -1098,6 +1418,12 @@ class MoosasEdge:
         for w in walls:
             self.internalMass+=w.shading
 
+    @property
+    def contentHash(self) -> str:
+        """deterministic hash of the walls and internal mass"""
+        return _contentDigest('MoosasEdge', *sorted(w.contentHash for w in self.wall), 'internalMass',
+                              *sorted(w.contentHash for w in self.internalMass))
+
     def prepareBoundary(self):
         for _wall in self.wall:
             self.__botBound.append(_wall.force_2d())
@@ -1360,6 +1686,17 @@ class MoosasSpace(object):
     def id(self) -> str:
         return self.__id
 
+    @property
+    def contentHash(self) -> str:
+        """deterministic hash of the edge, floor, ceiling, voids and settings of the space.
+        the hashes of the elements are cached, hence only the changed elements are recalculated.
+        """
+        return _contentDigest('MoosasSpace', self.edge.contentHash,
+                              self.floor.contentHash if self.floor is not None else None,
+                              self.ceiling.contentHash if self.ceiling is not None else None,
+                              *sorted(void.contentHash for void in self.void),
+                              json.dumps(self.settings, sort_keys=True, default=str))
+
     @property
     def area(self) -> float:
         area = self.edge.area
@@ -1574,7 +1911,7 @@ class MoosasSpace(object):
         for Moosasface in self.floor.face:
             string_out += str(Moosasface.faceId) + ' '
         string_out += '\n--Area' + ' ' + str((self.area) / INCH_METER_MULTIPLIER_SQR) + '\n'
-        floor_normal = pygeos.get_coordinates(model.geoNormal[model.geoId.index(self.floor.face[0].faceId)],
+        floor_normal = pygeos.get_coordinates(model.getGeo(self.floor.face[0].firstFaceId).normal,
                                               include_z=True).flatten()
         string_out += '--Normal ' + str(floor_normal[0]) + ' ' + str(floor_normal[1]) + ' ' + str(
             floor_normal[2]) + '\n'
@@ -1585,7 +1922,7 @@ class MoosasSpace(object):
         for Moosasface in self.ceiling.face:
             string_out += str(Moosasface.faceId) + ' '
         string_out += '\n--Area' + ' ' + str((self.area) / INCH_METER_MULTIPLIER_SQR) + '\n'
-        floor_normal = pygeos.get_coordinates(model.geoNormal[model.geoId.index(self.ceiling.face[0].faceId)],
+        floor_normal = pygeos.get_coordinates(model.getGeo(self.ceiling.face[0].firstFaceId).normal,
                                               include_z=True).flatten()
         string_out += '--Normal ' + str(floor_normal[0]) + ' ' + str(floor_normal[1]) + ' ' + str(
             floor_normal[2]) + '\n'
@@ -1685,6 +2022,8 @@ class MoosasContainer(object):
 
     Properties:
         spaceIdDict (dict): A dictionary recording spaceId: MoosasSpace.
+        geoStore (MoosasGeometryStore): columnar store of the geometry library.
+        geoDefinitions (dict): {definition faceId: [instance faceId]} of the repeated geometries.
 
     Methods:
         fromDict(cls, spaceDict: dict) -> MoosasSpace: Create MoosasSpace from a dictionary.
@@ -1692,15 +2031,39 @@ class MoosasContainer(object):
         getAllFaces(self) -> List: Get all elements in the model.
         includeGeo(self, geo: pygeos.Geometry, normal: pygeos.Geometry | Vector | np.ndarray = None, cat: int = 0,
                    holes=None) -> str: Include a pygeos.Geometry to the library.
+        adoptGeo(self, geometry: MoosasGeometry) -> str: Include a MoosasGeometry from another library with a new id.
+        flipGeo(self, geometries) -> None: Flip geometries and drop the memoized values of the elements made of them.
         findFace(self, faceId) -> list[MoosasGeometry]: Find a geometry by its geoId.
+        getGeo(self, faceId) -> MoosasGeometry: Get a geometry by its geoId in O(1).
+        searchBy(self, attribute, searchdata, listName, asObject=False) -> list: Indexed searchBy on an element list.
+        geoIndex(self, faceId) -> int: Get the position of a geometry in geoId / geometryList.
+        buildInstances(self) -> int: Detect the repeated geometries in the library as definitions and instances.
+        instanceOf(self, faceId) -> tuple[str, np.ndarray]: Get the definition and translation of a geometry.
     """
 
     def __init__(self):
         """initialize the MoosasModel with default list, and apply type to these list"""
-        self.geoId = []
-        self.geometryList: list[MoosasGeometry] = []
+        # geometry library: two aligned lists and a {faceId: slot} dictionary,
+        # removed slots are left as None and compacted lazily when the lists are read.
+        self._geoId: list[str] = []
+        self._geometryList: list[MoosasGeometry] = []
+        self._geoIndex: dict[str, int] = {}
+        self._geoRemoved = 0
+        self._geoIndexValid = True
+        self._geoStore: MoosasGeometryStore | None = None
         self.newIndex = 0
 
+        # geometry instances: {shape key: [faceId]}, the first one is the definition of the others
+        self._geoInstances: dict[tuple, list[str]] | None = None
+        self._geoInstanceKey: dict[str, tuple[tuple, np.ndarray]] = {}
+
+        # level index: {(listName, attribute): (list, items, version, {value: [index]})}
+        self._attributeIndex: dict[tuple[str, str], tuple] = {}
+        self._indexVersion = 0
+
+        # candidate wall pairs given by the spatial index versus all pairs in the collinear groups of the cleanse stages
+        self.pairCounter: dict[str, int] = {'candidate': 0, 'all': 0}
+
         # horizontalVerticalPlaneSet
         self.faceList: list[MoosasFace] = []
         self.wallList: list[MoosasWall] = []
@@ -1721,6 +2084,190 @@ class MoosasContainer(object):
         # object used to construct a space
         self.builtData = object()
 
+    @property
+    def geoId(self) -> list[str]:
+        """identifications of all geometries in the library, aligned with self.geometryList"""
+        self._compactGeo()
+        return self._geoId
+
+    @geoId.setter
+    def geoId(self, value: Iterable[str]):
+        self._geoId = [str(idd) for idd in value]
+        self._geoStore = None
+        self._geoInstances = None
+        self._geoRemoved = 0
+        self._geoIndexValid = False
+
+    @property
+    def geometryList(self) -> list[MoosasGeometry]:
+        """all MoosasGeometry in the library, aligned with self.geoId"""
+        self._compactGeo()
+        return self._geometryList
+
+    @geometryList.setter
+    def geometryList(self, value: Iterable[MoosasGeometry]):
+        self._geometryList = list(value)
+        self._geoStore = None
+        self._geoInstances = None
+        self._geoRemoved = 0
+        self._geoIndexValid = False
+
+    @property
+    def geoStore(self) -> MoosasGeometryStore:
+        """columnar store of the geometry library, built on first access after the library has been changed.
+        the geometries in the library are bound to the store to share one coordinate array.
+        """
+        if self._geoStore is None:
+            self._geoStore = MoosasGeometryStore(self.geometryList)
+        return self._geoStore
+
+    def buildInstances(self) -> int:
+        """detect the repeated geometries in the library.
+        geometries with the same shape (see MoosasGeometry.instanceKey()) are instances of one definition,
+        which is the first of them in the library. the table is kept by includeGeo() and removeGeo().
+        it is built on the first call of geoDefinitions or instanceOf(), call it directly only to rebuild the table.
+
+        Returns:
+            int: number of definitions
+        """
+        self._geoInstances = {}
+        self._geoInstanceKey = {}
+        for geo in self.geometryList:
+            self._addInstance(geo)
+        return len(self._geoInstances)
+
+    def _addInstance(self, geo: MoosasGeometry) -> None:
+        try:
+            key, anchor = geo.instanceKey()
+        except GeometryError:
+            key, anchor = (geo.faceId,), geo.coordinates[0]
+        self._geoInstanceKey[geo.faceId] = (key, anchor)
+        self._geoInstances.setdefault(key, []).append(geo.faceId)
+
+    @property
+    def geoDefinitions(self) -> dict[str, list[str]]:
+        """{definition faceId: [faceId of its instances, including itself]}"""
+        if self._geoInstances is None:
+            self.buildInstances()
+        return {instances[0]: list(instances) for instances in self._geoInstances.values()}
+
+    def instanceOf(self, faceId: str) -> tuple[str, np.ndarray]:
+        """the definition of a geometry and the translation from the definition to it.
+
+        Args:
+            faceId (str): the id of the geometry in the library
+
+        Returns:
+            tuple[str, np.ndarray]: faceId of the definition and the (3,) translation vector
+
+        Raises:
+            ValueError: if faceId is not in the library
+        """
+        if self._geoInstances is None:
+            self.buildInstances()
+        if faceId not in self._geoInstanceKey:
+            raise ValueError(f"{faceId} is not in the geometry library")
+        key, anchor = self._geoInstanceKey[faceId]
+        definition = self._geoInstances[key][0]
+        return definition, anchor - self._geoInstanceKey[definition][1]
+
+    def _compactGeo(self) -> None:
+        """drop the slots left by removeGeo() and rebuild the index"""
+        if self._geoRemoved > 0:
+            self._geoId = [idd for idd in self._geoId if idd is not None]
+            self._geometryList = [geo for geo in self._geometryList if geo is not None]
+            self._geoRemoved = 0
+            self._geoIndexValid = False
+
+    def _geoSlot(self, faceId: str) -> int:
+        """the slot of a geometry in the (uncompacted) library lists"""
+        if not self._geoIndexValid:
+            self._compactGeo()
+            self._geoIndex = {idd: i for i, idd in enumerate(self._geoId)}
+            self._geoIndexValid = True
+        try:
+            return self._geoIndex[faceId]
+        except (KeyError, TypeError):
+            raise ValueError(f"{faceId} is not in the geometry library")
+
+    def geoIndex(self, faceId: str) -> int:
+        """the position of a geometry in self.geoId / self.geometryList.
+
+        Args:
+            faceId (str): the id of the geometry in the library
+
+        Returns:
+            int: position of the geometry
+
+        Raises:
+            ValueError: if faceId is not in the library, same as list.index()
+        """
+        self._compactGeo()
+        return self._geoSlot(faceId)
+
+    def getGeo(self, faceId: str) -> MoosasGeometry:
+        """get a MoosasGeometry from the library by its id in O(1).
+
+        Args:
+            faceId (str): the id of the geometry in the library
+
+        Returns:
+            MoosasGeometry: the geometry
+
+        Raises:
+            ValueError: if faceId is not in the library
+        """
+        return self._geometryList[self._geoSlot(faceId)]
+
+    def searchBy(self, attribute: str, searchdata, listName: str, asObject=False) -> list:
+        """indexed version of utils.searchBy() for the element lists of the model,
+        e.g. model.searchBy('level', bld_level, 'wallList') == searchBy('level', bld_level, model.wallList)
+
+        the elements are bucketed by the level once, and the buckets are rebuilt only when
+        the list has been replaced or any item of it has been replaced, or the level of an element has been changed.
+        only the level is indexed, since it is the only attribute whose changes are tracked (by MoosasElement.level),
+        use utils.searchBy() for the other attributes.
+
+        Args:
+            attribute (str): attribute to search, only 'level' is supported.
+            searchdata: any data to match, you can give any number of items.
+            listName (str): name of the list in the model, e.g. 'wallList', 'faceList', 'glazingList' or 'edgeList'.
+            asObject (bool): if True, the search will return objects instead of index.
+
+        Returns:
+            list: sorted indexes that match the search data or object (if asObject==True)
+
+        Raises:
+            ValueError: if the attribute is not 'level'
+        """
+        if attribute != 'level':
+            raise ValueError(f"only 'level' is indexed, use utils.searchBy() for {attribute}")
+        elementList = getattr(self, listName)
+        # the items are compared by identity, so the elements replaced in place are also found
+        items = list(elementList)
+        record = self._attributeIndex.get((listName, attribute))
+        if record is None or record[0] is not elementList or record[1] != items \
+                or record[2] != self._indexVersion:
+            buckets = {}
+            for i, element in enumerate(items):
+                if hasattr(element, attribute):
+                    buckets.setdefault(getattr(element, attribute), []).append(i)
+            record = (elementList, items, self._indexVersion, buckets)
+            self._attributeIndex[(listName, attribute)] = record
+        buckets = record[3]
+        targetlist = []
+        for data in np.unique(np.array([searchdata]).flatten()):
+            targetlist += buckets.get(data, [])
+        targetlist.sort()
+        if not asObject:
+            return targetlist
+        else:
+            return np.array(elementList)[targetlist]
+
+    def indexChanged(self) -> None:
+        """force the attribute index to be rebuilt on next self.searchBy()"""
+        self._indexVersion += 1
+
     @property
     def spaceIdDict(self) -> dict:
         """space id dictionary for all spaces in self.spaceList
@@ -1818,20 +2365,78 @@ class MoosasContainer(object):
         faceId = f"n{self.newIndex}"
         self.newIndex += 1
 
-        self.geometryList.append(MoosasGeometry(geo, faceId, normal, cat, holes))
-        self.geoId = list(np.append(self.geoId, [faceId]))
-        return self.geoId[-1]
+        self._appendGeo(MoosasGeometry(geo, faceId, normal, cat, holes))
+        return faceId
+
+    def adoptGeo(self, geometry: MoosasGeometry) -> str:
+        """Include a MoosasGeometry created in another library (e.g. a sub-model of one level) with a new id.
+        the elements holding the geometry will get the new id, but their cache should be cleared.
+
+        Args:
+            geometry (MoosasGeometry): the geometry to include.
+
+        Returns:
+            str: the new geoId of the geometry.
+        """
+        faceId = f"n{self.newIndex}"
+        self.newIndex += 1
+
+        geometry._rename(faceId)
+        self._appendGeo(geometry)
+        return faceId
+
+    def _appendGeo(self, geometry: MoosasGeometry) -> None:
+        if self._geoIndexValid:
+            self._geoIndex[geometry.faceId] = len(self._geoId)
+        self._geometryList.append(geometry)
+        self._geoId.append(geometry.faceId)
+        self._geoStore = None
+        if self._geoInstances is not None:
+            self._addInstance(geometry)
+
+    def flipGeo(self, geometries: Iterable[MoosasGeometry]) -> None:
+        """Flip the normal of the geometries.
+        the geometries can be shared by several elements, so the memoized values of all elements made of them
+        and the columnar store are dropped.
+
+        Args:
+            geometries (Iterable[MoosasGeometry]): geometries to flip.
+        """
+        faceIds = set()
+        for geo in geometries:
+            geo.flip = True
+            faceIds.add(geo.faceId)
+        self._geoStore = None
+        for listName in ['faceList', 'wallList', 'glazingList', 'skylightList']:
+            for element in getattr(self, listName):
+                if not faceIds.isdisjoint(mixItemListToList(element.faceId)):
+                    element.clearCache()
 
     def removeGeo(self, geo: MoosasGeometry | pygeos.Geometry | str):
+        """Remove a geometry from the geometry library.
+        the slot is released in O(1) and the lists are compacted on next read.
+
+        Args:
+            geo (MoosasGeometry | pygeos.Geometry | str): the geometry, its face or its id.
+        """
         if isinstance(geo, pygeos.Geometry):
             for geoItems in self.geometryList:
                 if geoItems.face == geo:
                     geo = geoItems
-        if isinstance(geo, str):
-            geo = self.geometryList[self.geoId.index(geo)]
         if isinstance(geo, MoosasGeometry):
-            self.geometryList.remove(geo)
-            self.geoId.remove(geo.faceId)
+            geo = geo.faceId
+        if isinstance(geo, str):
+            slot = self._geoSlot(geo)
+            self._geoId[slot] = None
+            self._geometryList[slot] = None
+            del self._geoIndex[geo]
+            self._geoRemoved += 1
+            self._geoStore = None
+            if self._geoInstances is not None and geo in self._geoInstanceKey:
+                key = self._geoInstanceKey.pop(geo)[0]
+                self._geoInstances[key].remove(geo)
+                if len(self._geoInstances[key]) == 0:
+                    del self._geoInstances[key]
 
     def findFace(self, faceId: str | list[str]) -> list[MoosasGeometry]:
         """find a geometry in the library
@@ -1845,10 +2450,10 @@ class MoosasContainer(object):
         """
         if isinstance(faceId, str):
             faceId = [faceId]
-        _faceId = []
+        geometries = []
         for idd in faceId:
             try:
-                _faceId.append(self.geoId.index(idd))
-            except:
+                geometries.append(self.getGeo(idd))
+            except ValueError:
                 print(f"the geo: {idd} not in the geometry library.")
-        return [self.geometryList[idd] for idd in _faceId]
+        return geometries
@@ -6,6 +6,8 @@
 """
 from __future__ import annotations
 
+from functools import lru_cache
+
 from ..utils.constant import geom
 from ..utils import pygeos, np, GeometryError, Iterable
 
@@ -313,6 +315,262 @@ class Ray(Vector):
         return f"Ray( ori {self.origin.__repr__()} dir {self.direction.__repr__()} )"
 
 
+class VectorArray(object):
+    """
+        Batch counterpart of Vector backed by a (N,3) array, all operations are done by numpy in a single call.
+        The scalar Vector can be got by indexing, and a VectorArray can be created from a list of Vector.
+        array: the (N,3) float array of the vectors
+    """
+    __slots__ = ['array']
+
+    def __init__(self, vectors: VectorArray | Iterable | np.ndarray | pygeos.Geometry):
+        """
+            accepts VectorArray, (N,2) or (N,3) array, pygeos points array, or a list of Vector/Iterable/pygeos.Geometry
+        """
+        if isinstance(vectors, VectorArray):
+            vectors = vectors.array.copy()
+        elif isinstance(vectors, pygeos.Geometry):
+            vectors = pygeos.get_coordinates(pygeos.force_3d(vectors, z=0), include_z=True)
+        elif isinstance(vectors, np.ndarray) and vectors.dtype != object:
+            vectors = np.array(vectors, dtype=float)
+        else:
+            vectors = [Vector(vec).array for vec in vectors]
+        vectors = np.array(vectors, dtype=float)
+        vectors = vectors.reshape(len(vectors), -1) if vectors.size > 0 else np.zeros((0, 3))
+        if vectors.shape[1] == 2:
+            vectors = np.hstack([vectors, np.zeros((len(vectors), 1))])
+        self.array: np.ndarray = np.nan_to_num(vectors[:, :3], nan=0)
+
+    @classmethod
+    def fromVectors(cls, vectors: Iterable[Vector]):
+        return cls([Vector(vec).array for vec in vectors])
+
+    def toVectors(self) -> list[Vector]:
+        return [Vector(vec) for vec in self.array]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.array[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.array[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.array[:, 2]
+
+    @property
+    def geometry(self) -> np.ndarray[pygeos.Geometry]:
+        """get pygeos points of the vectors"""
+        return pygeos.points(self.array)
+
+    @property
+    def uniform(self) -> VectorArray:
+        """get uniform vectors, see Vector.uniform"""
+        vec = VectorArray(self).unit().array
+        flip = (vec[:, 0] < 0) | ((vec[:, 0] == 0) & (vec[:, 1] < 0)) | (
+                (vec[:, 0] == 0) & (vec[:, 1] == 0) & (vec[:, 2] < 0))
+        vec[flip] *= -1
+        return VectorArray(vec)
+
+    @classmethod
+    def azimuthToVector(cls, azimuth: Iterable[float]) -> VectorArray:
+        """batch version of Vector.azimuthToVector"""
+        azimuth = np.array(azimuth, dtype=float).flatten()
+        azimuth = np.where(azimuth < 0, azimuth + 360, azimuth)
+        x = np.ones(len(azimuth))
+        with np.errstate(all='ignore'):
+            y = np.tan(np.radians(azimuth))
+        x, y = np.where(azimuth > 180, -x, x), np.where(azimuth > 180, -y, y)
+        for ang, vx, vy in [(270, -1, 0), (0, 0, 1), (360, 0, 1), (180, 0, -1)]:
+            x, y = np.where(azimuth == ang, vx, x), np.where(azimuth == ang, vy, y)
+        return cls(np.stack([x, y, np.zeros(len(azimuth))], axis=1)).unit()
+
+    def altitude(self, to_degree=False) -> np.ndarray:
+        """get the angles to Vector([0,0,1])"""
+        with np.errstate(all='ignore'):
+            tan = np.power(self.z, 2) / (np.power(self.x, 2) + np.power(self.y, 2))
+        radius = np.arctan(np.sqrt(tan))
+        if to_degree:
+            radius *= 180 / np.pi
+        return radius
+
+    def azimuth(self, to_degree=False) -> np.ndarray:
+        """get the angles to Vector(0,1,0) in clockwise, see Vector.azimuth"""
+        with np.errstate(all='ignore'):
+            radius = np.arctan(self.y / self.x)
+        radius = np.where(self.x <= 0.0, np.pi + radius, radius)
+        radius = np.where(self.x == 0.0, np.where(self.y >= 0, 0.0, np.pi), radius)
+        if to_degree:
+            radius *= 180 / np.pi
+        return radius
+
+    def length(self, power=False) -> np.ndarray:
+        """get length of the vectors, Set power to True to accelerate the calculation"""
+        if power:
+            return np.einsum('ij,ij->i', self.array, self.array)
+        else:
+            return np.linalg.norm(self.array, axis=1)
+
+    def unit(self) -> VectorArray:
+        """
+            Normalize the vectors. The original array will be modified and returned to itself, same as Vector.unit()
+        """
+        length = self.length()
+        if np.any(length == 0): raise GeometryError(self, 'zero vector')
+        self.array /= length[:, None]
+        return self
+
+    @staticmethod
+    def _asArray(vec) -> np.ndarray:
+        if isinstance(vec, VectorArray):
+            return vec.array
+        if isinstance(vec, np.ndarray) and vec.ndim == 2:
+            return VectorArray(vec).array
+        return Vector(vec).array
+
+    @staticmethod
+    def dot(vec1, vec2) -> np.ndarray:
+        """row-wise dot product, a single Vector will be broadcast to all rows"""
+        return np.sum(VectorArray._asArray(vec1) * VectorArray._asArray(vec2), axis=-1)
+
+    @staticmethod
+    def cross(vec1, vec2) -> VectorArray:
+        """row-wise cross product, a single Vector will be broadcast to all rows"""
+        return VectorArray(np.cross(VectorArray._asArray(vec1), VectorArray._asArray(vec2)).reshape(-1, 3))
+
+    @staticmethod
+    def parallel(vec1, vec2) -> np.ndarray:
+        """row-wise version of Vector.parallel, returns a bool array"""
+        vec1, vec2 = VectorArray._asArray(vec1), VectorArray._asArray(vec2)
+        len1, len2 = np.sum(vec1 * vec1, axis=-1), np.sum(vec2 * vec2, axis=-1)
+        with np.errstate(all='ignore'):
+            dot = np.power(np.sum(vec1 * vec2, axis=-1), 2) / len2 / len1
+        return ((len1 == 0) | (len2 == 0) |
+                ((1.0 + Vector.ANGLE_TOLERANCE > dot) & (dot > 1.0 - Vector.ANGLE_TOLERANCE)))
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.toVectors())
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Vector(self.array[item])
+        return VectorArray(self.array[item])
+
+    def __add__(self, other):
+        return VectorArray(self.array + VectorArray._asArray(other))
+
+    def __sub__(self, other):
+        return VectorArray(self.array - VectorArray._asArray(other))
+
+    def __neg__(self):
+        return VectorArray(-self.array)
+
+    def __mul__(self, other):
+        if isinstance(other, (Vector, VectorArray)):
+            return VectorArray.dot(self, other)
+        other = np.array(other, dtype=float)
+        return VectorArray(self.array * (other[:, None] if other.ndim == 1 else other))
+
+    def __truediv__(self, other):
+        other = np.array(other, dtype=float)
+        return VectorArray(self.array / (other[:, None] if other.ndim == 1 else other))
+
+    def __repr__(self):
+        return f"VectorArray({len(self)})"
+
+
+class RayArray(object):
+    """
+    Batch counterpart of Ray, the origins and directions are VectorArray with the same length.
+    origin: The origins of the rays, VectorArray
+    direction: The unit directions of the rays, VectorArray
+    value: (N,) array to store related data
+    """
+    __slots__ = ['origin', 'direction', 'value']
+
+    def __init__(self, origin, direction, value=None):
+        """
+            a single origin or direction will be broadcast to the length of the others
+        """
+        direction = VectorArray(VectorArray._asArray(direction).reshape(-1, 3)).unit()
+        origin = VectorArray._asArray(origin).reshape(-1, 3)
+        if len(origin) == 1 and len(direction) != 1:
+            origin = np.repeat(origin, len(direction), axis=0)
+        if len(direction) == 1 and len(origin) != 1:
+            direction = VectorArray(np.repeat(direction.array, len(origin), axis=0))
+        if len(origin) != len(direction):
+            raise GeometryError(origin, f'origin and direction have different length {len(origin)}/{len(direction)}')
+        self.origin: VectorArray = VectorArray(origin)
+        self.direction: VectorArray = direction
+        if value is None:
+            value = np.zeros(len(direction))
+        self.value: np.ndarray = np.broadcast_to(np.array(value), (len(direction),)).copy()
+
+    @classmethod
+    def fromRays(cls, rays: Iterable[Ray]) -> RayArray:
+        rays = list(rays)
+        if len(rays) == 0:
+            return cls(np.zeros((0, 3)), np.zeros((0, 3)))
+        return cls(np.array([ra.origin.array for ra in rays]), np.array([ra.direction.array for ra in rays]),
+                   np.array([ra.value for ra in rays]))
+
+    def toRays(self) -> list[Ray]:
+        return [self[i] for i in range(len(self))]
+
+    @classmethod
+    def concatenate(cls, rayArrays: Iterable[RayArray]) -> RayArray:
+        rayArrays = list(rayArrays)
+        if len(rayArrays) == 0:
+            return cls(np.zeros((0, 3)), np.zeros((0, 3)))
+        return cls(np.concatenate([ra.origin.array for ra in rayArrays]),
+                   np.concatenate([ra.direction.array for ra in rayArrays]),
+                   np.concatenate([ra.value for ra in rayArrays]))
+
+    def reverse(self) -> RayArray:
+        return RayArray(self.origin, -self.direction, self.value)
+
+    def mirror(self, mir: Ray | RayArray) -> RayArray:
+        """batch version of Ray.mirror, a single Ray will be broadcast to all rays"""
+        mirDirection = mir.direction.array.reshape(-1, 3)
+        mirDirection = np.where((VectorArray.dot(self.direction, mirDirection) <= 0)[:, None],
+                                -mirDirection, mirDirection)
+        dot = VectorArray.dot(self.direction, mirDirection)
+        transfrom = 2 * (self.direction.array - dot[:, None] * mirDirection)
+        return RayArray(self.origin, self.direction.array + transfrom, self.value).reverse()
+
+    def dump(self) -> list[str]:
+        """
+        get the standard rays export to MoosasRad.exe, see Ray.dump()
+        """
+        rayStr = np.hstack([self.origin.array, self.direction.array]).astype(str)
+        return [','.join(ray) for ray in rayStr]
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.toRays())
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Ray(self.origin.array[item], self.direction.array[item], self.value[item])
+        return RayArray(self.origin.array[item].reshape(-1, 3), self.direction.array[item].reshape(-1, 3),
+                        self.value[item])
+
+    def __setitem__(self, item, ray: Ray):
+        self.origin.array[item] = ray.origin.array
+        self.direction.array[item] = ray.direction.array
+        self.value[item] = ray.value
+
+    def __repr__(self):
+        return f"RayArray({len(self)})"
+
+
 class Projection(Ray):
     """
     Establish a three-dimensional coordinate system based on the infinite plane input and realize the conversion with
@@ -337,6 +595,20 @@ class Projection(Ray):
     def fromRay(cls, plane: Ray):
         return cls(plane.origin, plane.direction)
 
+    @classmethod
+    def cached(cls, origin, unitZ, unitX=None) -> Projection:
+        """
+        Get a shared projection for the plane, so that repeated uv works on the same plane (e.g. the faces and glazing
+        of one element, or a coplanar group) build the rotation matrix only once.
+        the planes are matched by the exact origin and axes, a slightly different plane gets its own projection.
+        The returned projection is shared, do not modify it.
+        """
+        origin, unitZ = Vector(origin).array, Vector(unitZ).array
+        unitX = None if unitX is None else Vector(unitX).array
+        key = (cls, origin.astype(np.float64).tobytes(), unitZ.astype(np.float64).tobytes(),
+               None if unitX is None else unitX.astype(np.float64).tobytes())
+        return _cachedProjection(key, cls, origin, unitZ, unitX)
+
     @classmethod
     def fromPolygon(cls, polygon: pygeos.Geometry):
         unitz = faceNormal(polygon)
@@ -383,6 +655,32 @@ class Projection(Ray):
     def rotateMatrix(self):
         return np.asmatrix(np.array([self.axisX, self.axisY, self.axisZ]).T)
 
+    @property
+    def _isWorld(self) -> bool:
+        return Vector.parallel(self.axisZ, np.array([0, 0, 1])) and Vector.parallel(self.axisX, np.array([1, 0, 0]))
+
+    def toUVArray(self, worldGeometries: Iterable[pygeos.Geometry]) -> np.ndarray[pygeos.Geometry]:
+        """
+        Batch version of toUV. All coordinates of the geometry array are transformed by one matrix multiply and written
+        back by pygeos.set_coordinates, so the structure of the geometries (parts, holes) is kept as is.
+        """
+        worldGeometries = pygeos.force_3d(np.array(worldGeometries, dtype=object).flatten(), z=0)
+        coors = np.nan_to_num(pygeos.get_coordinates(worldGeometries, include_z=True), nan=0)
+        coors = coors - self.origin.array
+        if not self._isWorld:
+            coors = coors @ np.array(self.rotateMatrix)
+        return pygeos.set_coordinates(worldGeometries, coors)
+
+    def toWorldArray(self, UVGeometries: Iterable[pygeos.Geometry]) -> np.ndarray[pygeos.Geometry]:
+        """
+        Batch version of toWorld, see toUVArray.
+        """
+        UVGeometries = pygeos.force_3d(np.array(UVGeometries, dtype=object).flatten(), z=0)
+        coors = np.nan_to_num(pygeos.get_coordinates(UVGeometries, include_z=True), nan=0)
+        if not self._isWorld:
+            coors = coors @ np.array(self.rotateMatrix.I)
+        return pygeos.set_coordinates(UVGeometries, coors + self.origin.array)
+
     @property
     def axisZ(self):
         return self.array
@@ -455,6 +753,18 @@ class Projection(Ray):
             return pygeos.linestrings(coor_new)
 
 
+_projectionCache: dict[tuple, Projection] = {}
+
+
+def _cachedProjection(key, cls, origin, unitZ, unitX=None) -> Projection:
+    """the arrays are not hashable, so the projections are stored by the bytes of the plane"""
+    if key not in _projectionCache:
+        if len(_projectionCache) > 4096:
+            _projectionCache.clear()
+        _projectionCache[key] = cls(origin, unitZ, unitX)
+    return _projectionCache[key]
+
+
 class Transformation2d:
     """
     Realize two-dimensional transformation, including movement and rotation, and define the rotation angle in clockwise
@@ -765,6 +1075,193 @@ def rayFaceIntersect(ray: Ray, face: pygeos.Geometry,
             return None
 
 
+def _signedArea2d(ring: np.ndarray) -> float:
+    return 0.5 * np.sum(ring[:, 0] * np.roll(ring[:, 1], -1) - np.roll(ring[:, 0], -1) * ring[:, 1])
+
+
+def _segmentsCross(a: np.ndarray, b: np.ndarray, segments: np.ndarray) -> np.ndarray:
+    """test if segment ab properly crosses the (K,2,2) segments"""
+    def orient(p, q, r):
+        return (q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0])
+
+    c, d = segments[:, 0], segments[:, 1]
+    o1, o2 = orient(a, b, c), orient(a, b, d)
+    o3, o4 = orient(c, d, a), orient(c, d, b)
+    return (o1 * o2 < 0) & (o3 * o4 < 0)
+
+
+def _earClip(rings: list[np.ndarray]) -> list[tuple[int, int, int]]:
+    """ear clipping triangulation of a 2d polygon with holes.
+    rings: open (n,2) rings, the first one is the boundary
+    return: triangles as indices to the stacked rings
+    """
+    offsets = np.cumsum([0] + [len(ring) for ring in rings])
+    points = np.concatenate(rings)
+    outer = list(range(offsets[0], offsets[1]))
+    if _signedArea2d(points[outer]) < 0:
+        outer.reverse()
+    holes = []
+    for h in range(1, len(rings)):
+        hole = list(range(offsets[h], offsets[h + 1]))
+        if _signedArea2d(points[hole]) > 0:
+            hole.reverse()
+        holes.append(hole)
+    # bridge the holes to the boundary, from the hole with the largest x
+    holes.sort(key=lambda hole: -np.max(points[hole, 0]))
+    for h, hole in enumerate(holes):
+        m = int(np.argmax(points[hole, 0]))
+        hole = hole[m:] + hole[:m]
+        pm = points[hole[0]]
+        edges = [points[[ring[i - 1], ring[i]]] for ring in [outer] + holes[h:] for i in range(len(ring))]
+        edges = np.array(edges)
+        candidates = sorted(range(len(outer)), key=lambda i: np.sum((points[outer[i]] - pm) ** 2))
+        bridge = candidates[0]
+        for i in candidates:
+            if not np.any(_segmentsCross(pm, points[outer[i]], edges)):
+                bridge = i
+                break
+        outer = outer[:bridge + 1] + hole + [hole[0], outer[bridge]] + outer[bridge + 1:]
+
+    triangles = []
+    polygon = list(outer)
+    guard = 0
+    while len(polygon) > 3 and guard < len(polygon):
+        n = len(polygon)
+        earFound = False
+        for i in range(n):
+            ia, ib, ic = polygon[i - 1], polygon[i], polygon[(i + 1) % n]
+            a, b, c = points[ia], points[ib], points[ic]
+            cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+            if cross <= 0:
+                continue
+            others = points[[j for j in polygon if j not in (ia, ib, ic)]]
+            others = others[~(np.all(others == a, axis=1) | np.all(others == b, axis=1) | np.all(others == c, axis=1))]
+            if len(others) > 0:
+                d1 = (b[0] - a[0]) * (others[:, 1] - a[1]) - (b[1] - a[1]) * (others[:, 0] - a[0])
+                d2 = (c[0] - b[0]) * (others[:, 1] - b[1]) - (c[1] - b[1]) * (others[:, 0] - b[0])
+                d3 = (a[0] - c[0]) * (others[:, 1] - c[1]) - (a[1] - c[1]) * (others[:, 0] - c[0])
+                if np.any((d1 >= 0) & (d2 >= 0) & (d3 >= 0)):
+                    continue
+            triangles.append((ia, ib, ic))
+            polygon.pop(i)
+            earFound = True
+            guard = 0
+            break
+        if not earFound:
+            # degenerated vertex (collinear or duplicated), drop it
+            polygon.pop(0)
+            guard += 1
+    if len(polygon) == 3:
+        triangles.append(tuple(polygon))
+    return triangles
+
+
+@lru_cache(maxsize=4096)
+def _triangulateWkb(wkb: bytes) -> np.ndarray:
+    """triangulate a 3d polygon given in wkb, cached since the faces are usually tested many times."""
+    face = pygeos.from_wkb(wkb)
+    rings = [np.nan_to_num(pygeos.get_coordinates(ring, include_z=True)[:-1], nan=0) for ring in
+             pygeos.get_rings(face)]
+    rings = [ring for ring in rings if len(ring) >= 3]
+    if len(rings) == 0 or pygeos.get_num_coordinates(pygeos.get_exterior_ring(face)) < 4:
+        return np.zeros((0, 3, 3))
+    try:
+        normal = faceNormal(face).array
+    except GeometryError:
+        return np.zeros((0, 3, 3))
+    # build a uv basis on the plane of the face
+    axisU = np.cross(normal, [0, 0, 1]) if np.abs(normal[2]) < 0.9 else np.cross(normal, [1, 0, 0])
+    axisU = axisU / np.linalg.norm(axisU)
+    axisV = np.cross(normal, axisU)
+    uv = [np.stack([ring @ axisU, ring @ axisV], axis=1) for ring in rings]
+    points = np.concatenate(rings)
+    triangles = _earClip(uv)
+    if len(triangles) == 0:
+        return np.zeros((0, 3, 3))
+    return points[np.array(triangles)]
+
+
+def triangulateFaces(faces: Iterable[pygeos.Geometry]) -> tuple[np.ndarray, np.ndarray]:
+    """triangulate 3d polygons for the intersection kernel.
+
+    faces: input polygons, the triangulation of each polygon is cached by its shape moved to the origin,
+    hence the repeated (translated) faces are triangulated only once.
+
+    return: triangles (T,3,3) and the index of the face each triangle belongs to (T,)
+    """
+    faces = pygeos.force_3d(np.array(list(faces), dtype=object), z=0)
+    triangles, owner = [], []
+    if len(faces) > 0:
+        coors, index = pygeos.get_coordinates(faces, include_z=True, return_index=True)
+        coors = np.nan_to_num(coors, nan=0)
+        anchors = np.zeros((len(faces), 3))
+        first = np.unique(index, return_index=True)
+        anchors[first[0]] = coors[first[1]]
+        faces = pygeos.set_coordinates(faces.copy(), np.round(coors - anchors[index], 9))
+        for i, face in enumerate(faces):
+            tri = _triangulateWkb(pygeos.to_wkb(face)) + anchors[i]
+            triangles.append(tri)
+            owner.append(np.full(len(tri), i, dtype=int))
+    if len(triangles) == 0:
+        return np.zeros((0, 3, 3)), np.zeros(0, dtype=int)
+    return np.concatenate(triangles), np.concatenate(owner)
+
+
+def rayFaceIntersectBatch(rays: RayArray | Iterable[Ray], faces: Iterable[pygeos.Geometry],
+                          normals: VectorArray | Iterable = None, minDistance=0.0, maxDistance=None,
+                          chunkSize=2000000) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """vectorized ray-face intersection for N rays and M faces.
+
+    the faces are triangulated (and cached) and tested by Moller-Trumbore algorithm, which is exact.
+    the rays are processed in chunks so that the temp arrays have at most chunkSize (ray, triangle) pairs.
+
+    rays: input rays as RayArray or a list of Ray
+    faces: input faces as pygeos polygons
+    normals: optional (M,3) face normals, if provided only the faces facing the ray (dot < -POINT_PRECISION) count
+    minDistance: hits nearer than this distance will be ignored
+    maxDistance: the "rays" are lines with limit length
+
+    return: distance (N,) inf if no hit; face index (N,) -1 if no hit; hit point (N,3) nan if no hit
+    """
+    if not isinstance(rays, RayArray):
+        rays = RayArray.fromRays(rays)
+    faces = list(faces)
+    triangles, owner = triangulateFaces(faces)
+    origin, direction = rays.origin.array, rays.direction.array
+    distance = np.full(len(rays), np.inf)
+    faceIndex = np.full(len(rays), -1, dtype=int)
+    if len(triangles) > 0 and len(rays) > 0:
+        v0 = triangles[:, 0]
+        e1, e2 = triangles[:, 1] - v0, triangles[:, 2] - v0
+        triNormal = None
+        if normals is not None:
+            triNormal = VectorArray(normals).array[owner]
+        step = max(1, int(chunkSize // len(triangles)))
+        for st in range(0, len(rays), step):
+            o, d = origin[st:st + step, None, :], direction[st:st + step, None, :]
+            p = np.cross(d, e2[None])
+            det = np.sum(e1[None] * p, axis=2)
+            with np.errstate(all='ignore'):
+                inv = 1.0 / det
+                tvec = o - v0[None]
+                u = np.sum(tvec * p, axis=2) * inv
+                q = np.cross(tvec, e1[None])
+                v = np.sum(d * q, axis=2) * inv
+                t = np.sum(e2[None] * q, axis=2) * inv
+            valid = (np.abs(det) > 1e-12) & (u >= 0) & (u <= 1) & (v >= 0) & (u + v <= 1) & (t > minDistance)
+            if maxDistance is not None:
+                valid &= t <= maxDistance
+            if triNormal is not None:
+                valid &= np.sum(d * triNormal[None], axis=2) < -geom.POINT_PRECISION
+            t = np.where(valid, t, np.inf)
+            nearest = np.argmin(t, axis=1)
+            distance[st:st + step] = t[np.arange(len(t)), nearest]
+            faceIndex[st:st + step] = np.where(np.isfinite(distance[st:st + step]), owner[nearest], -1)
+    points = np.where(np.isfinite(distance)[:, None], origin + np.nan_to_num(distance, posinf=0)[:, None] * direction,
+                      np.nan)
+    return distance, faceIndex, points
+
+
 def simplify(geo: pygeos.Geometry, include_z=False) -> pygeos.Geometry:
     """simplified the geometry to remove redundant points where the last and next directions are parallel"""
     coordinates = pygeos.get_coordinates(geo, include_z=include_z)[:-1]
@@ -46,9 +46,9 @@ class MoosasGrid(MoosasElement):
 
     @property
     def gridPoints(self):
-        projPts = [self.proj.toWorld(cell.origin.geometry)  for cellLine in self.gridCell for cell in cellLine]
+        projPts = self.proj.toWorldArray([cell.origin.geometry for cellLine in self.gridCell for cell in cellLine])
         maskPts = [cell.valid for cellLine in self.gridCell for cell in cellLine]
-        return np.array(projPts)[maskPts]
+        return projPts[maskPts]
 
     @property
     def mask(self):
@@ -56,6 +56,7 @@ class MoosasGrid(MoosasElement):
     @property
     def gridPolygon(self):
         # Generate grid polygons using the grid points as centers
+        cells, polys = [], []
         for rowIdx, row in enumerate(self.gridCell):
             bound = False
             for colIdx, col in enumerate(self.gridCell[rowIdx]):
@@ -74,7 +75,11 @@ class MoosasGrid(MoosasElement):
                         poly = pygeos.intersection(self.UVFace, poly)
                         bound = self.gridCell[rowIdx, colIdx].valid
 
-                    self.gridCell[rowIdx, colIdx].polygon = self.proj.toWorld(pygeos.force_3d(poly, z=0))
+                    cells.append(self.gridCell[rowIdx, colIdx])
+                    polys.append(poly)
+        # transform all polygons back to world at once
+        for cell, poly in zip(cells, self.proj.toWorldArray(polys)):
+            cell.polygon = poly
         return self.gridCell
 
 
@@ -1,15 +1,18 @@
+from concurrent.futures import Executor
+
 from .element import MoosasContainer, MoosasEdge
-from .contour import closed_contour_calculation
+from .contour import closed_contour_calculation, half_edge_contour_calculation, level_contour_calculation
+from .topology import TopoNetwork
 from .viewFactor import viewFactorTopology
 from ..utils import np, searchBy, pygeos
-from .contour import _documentBoundary
+from .contour import _documentBoundary, _closedContour, _halfEdgeContour
 
 
 def BTGSpaceGeneration(model: MoosasContainer) -> MoosasContainer:
     validBound = []
     for bld_level in model.levelList:
-        faceList = searchBy('level', bld_level, model.faceList, asObject=True)
-        wallList = list(searchBy('level', bld_level, model.wallList, asObject=True))
+        faceList = model.searchBy('level', bld_level, 'faceList', asObject=True)
+        wallList = list(model.searchBy('level', bld_level, 'wallList', asObject=True))
         if len(wallList) > 0:
             for f in faceList:
                 validBound.append(MoosasEdge.selectWall(f.force_2d(), wallList))
@@ -17,20 +20,23 @@ def BTGSpaceGeneration(model: MoosasContainer) -> MoosasContainer:
     return model
 
 
-def CCRSpaceGeneration(model: MoosasContainer) -> MoosasContainer:
-    for bld_level in model.levelList:
-        # wallList = np.array(model.wallList)[searchBy("level", bld_level, model.wallList)]
-        # from .visual.geometry import plot_object
-        # plot_object(wallList)
-        model = closed_contour_calculation(model, bld_level)
-    return model
+def CCRSpaceGeneration(model: MoosasContainer, executor: Executor = None) -> MoosasContainer:
+    # wallList = np.array(model.wallList)[searchBy("level", bld_level, model.wallList)]
+    # from .visual.geometry import plot_object
+    # plot_object(wallList)
+    return _contourByLevel(model, _closedContour, executor)
+
+
+def DCELSpaceGeneration(model: MoosasContainer, executor: Executor = None) -> MoosasContainer:
+    """enumerate the minimal boundaries in the half-edge structure of the walls"""
+    return _contourByLevel(model, _halfEdgeContour, executor)
 
 
 def VFGSpaceGeneration(model: MoosasContainer) -> MoosasContainer:
     """calculate view factor to get the topology of the walls"""
     boundaries = []
     for bld_level in model.levelList:
-        elementList = searchBy('level', bld_level, model.wallList, asObject=True)
+        elementList = model.searchBy('level', bld_level, 'wallList', asObject=True)
         # elementList = list(model.wallList) + list(model.faceList)
         boundariesNew = viewFactorTopology(model,elementList,vfNumber=12)
         print(f'\rTOPOLOGY: in {bld_level}: find {len(boundariesNew)} boundaries')
@@ -38,3 +44,42 @@ def VFGSpaceGeneration(model: MoosasContainer) -> MoosasContainer:
     return _documentBoundary(boundaries,model)
 
 
+def _contourByLevel(model: MoosasContainer, contour, executor: Executor = None) -> MoosasContainer:
+    """calculate the closed contour level by level, only the 2d projections of the walls are used.
+    the levels with the same plan (see TopoNetwork.planFingerprint) are calculated once,
+    and the boundaries are mapped onto the walls of the other levels.
+    only the contours are reused: the slabs are not in the fingerprint,
+    so the floors, ceilings and face splitting are still solved on every level by packing_edges().
+    with an executor, the projections of each level are sent to the processes,
+    and the boundaries are put into model.boundaryList in the order of the levels.
+    BTG and VFG need the whole elements, and always run in the main process.
+    """
+    levelLines = [TopoNetwork.levelLines(bld_level, model) for bld_level in model.levelList]
+    fingerprints = [TopoNetwork.planFingerprint(lines) for _, lines in levelLines]
+    source = {}
+    for i, (key, _) in enumerate(fingerprints):
+        source.setdefault(key, i)
+    uniqueLevel = sorted(source.values())
+
+    if executor is None:
+        loops = {i: level_contour_calculation(contour, model.levelList[i], *levelLines[i]) for i in uniqueLevel}
+    else:
+        futures = {i: executor.submit(level_contour_calculation, contour, model.levelList[i], *levelLines[i],
+                                      quiet=True) for i in uniqueLevel}
+        loops = {}
+        for i, future in futures.items():
+            loops[i] = future.result()
+            print(f'\rTOPOLOGY: in {model.levelList[i]}: find {len(loops[i])} boundaries')
+
+    for i, (ids, lines) in enumerate(levelLines):
+        j = source[fingerprints[i][0]]
+        if i == j:
+            levelLoops = loops[i]
+        else:
+            # the walls in the same position of the sorted segments are matched
+            wallMap = dict(zip(levelLines[j][0][fingerprints[j][1]].tolist(), ids[fingerprints[i][1]].tolist()))
+            levelLoops = [[wallMap[w] for w in loop] for loop in loops[j]]
+            print(f'\rTOPOLOGY: in {model.levelList[i]}: reuse {len(levelLoops)} boundaries in {model.levelList[j]}')
+        for loop in levelLoops:
+            model.boundaryList.append([model.wallList[w] for w in loop])
+    return model
@@ -4,17 +4,29 @@ from .geos import *
 from .element import MoosasWall
 from ..utils.constant import geom
 from ..utils import searchBy, TopologyError,copy
+from .cleanse import _DisjointSet
+
+
+def _gridCell(point: pygeos.Geometry, cellSize: float) -> tuple[int, int]:
+    """the cell of a hash grid with cellSize that the point located in"""
+    return tuple(np.floor(pygeos.get_coordinates(point)[0] / cellSize).astype(int))
+
+
+def _neighborCells(cell: tuple[int, int]) -> list[tuple[int, int]]:
+    """the cell and its 8 neighbors"""
+    return [(cell[0] + i, cell[1] + j) for i in (-1, 0, 1) for j in (-1, 0, 1)]
 
 
 class TopoEdge(object):
     __slots__ = ('modelId', 'fromLocation', 'toLocation', 'uid', 'fromP', 'toP')
 
-    def __init__(self, idd, edge: MoosasWall):
+    def __init__(self, idd, edge: MoosasWall | pygeos.Geometry):
+        """edge: the wall, or its 2d projection line when the wall is not available (e.g. in another process)"""
         self.modelId = idd
-        line2d = edge.force_2d()
+        line2d = edge.force_2d() if isinstance(edge, MoosasWall) else edge
         self.fromLocation = pygeos.set_precision(pygeos.get_point(line2d, 0), geom.POINT_PRECISION)
         self.toLocation = pygeos.set_precision(pygeos.get_point(line2d, 1), geom.POINT_PRECISION)
-        self.uid = edge.Uid
+        self.uid = edge.Uid if isinstance(edge, MoosasWall) else None
         self.fromP: TopoNode | None = None
         self.toP: TopoNode | None = None
 
@@ -45,6 +57,27 @@ class TopoEdge(object):
                 return True
         return False
 
+    @staticmethod
+    def duplicateEdge(edge_list: Iterable[TopoEdge]):
+        """find the edges overlapping with any later edge in the list, so the last one of the duplicates is kept.
+        the edges are hashed by the grid cells of their end points, and only the edges in the neighbor cells are compared.
+        """
+        edge_list = list(edge_list)
+        cellSize = 1.1 * geom.POINT_PRECISION
+        grid = {}
+        delEdges = []
+        for i in range(len(edge_list) - 1, -1, -1):
+            edge = edge_list[i]
+            fromCell = _gridCell(edge.fromLocation, cellSize)
+            candidates = set()
+            for cell in _neighborCells(fromCell):
+                candidates.update(grid.get(cell, ()))
+            if any(TopoEdge.overlap(edge, edge_list[j]) for j in sorted(candidates)):
+                delEdges.append(i)
+            for cell in {fromCell, _gridCell(edge.toLocation, cellSize)}:
+                grid.setdefault(cell, []).append(i)
+        return sorted(delEdges)
+
     @staticmethod
     def isolateEdge(edge_list: Iterable[TopoEdge]):
         nodeList = {}
@@ -131,31 +164,31 @@ class TopoNetwork(object):
         """zero length edges"""
         edges = [topoedge for topoedge in self.edges if topoedge.valid]
         """duplicate edges"""
-        delEdges = []
-        for i in range(len(edges)):
-            for j in range(i + 1, len(edges)):
-                if TopoEdge.overlap(edges[i], edges[j]):
-                    delEdges.append(i)
-                    break
-        edges = np.delete(edges, delEdges)
+        edges = np.delete(edges, TopoEdge.duplicateEdge(edges))
         # plot_object([model.wallList[edge.id] for edge in edge_list], color='black')
 
-        """blur match existing locations and the edge nodes"""
-        location = set()
-        for edge in edges:
-            if edge.fromLocation not in location:
-                for poi in location:
-                    if pygeos.dwithin(edge.fromLocation, poi, 1.1 * geom.POINT_PRECISION):
-                        edge.fromLocation = poi
+        """blur match existing locations and the edge nodes in a hash grid"""
+        cellSize = 1.1 * geom.POINT_PRECISION
+        location = {}
+        grid = {}
+
+        def _weld(poi: pygeos.Geometry) -> pygeos.Geometry:
+            key = tuple(pygeos.get_coordinates(poi)[0] + 0.0)
+            if key not in location:
+                cell = _gridCell(poi, cellSize)
+                candidates = [other for nei in _neighborCells(cell) for other in grid.get(nei, ())]
+                for other in candidates:
+                    if pygeos.dwithin(poi, other, cellSize):
+                        location[key] = other
                         break
-                location.add(edge.fromLocation)
+                else:
+                    location[key] = poi
+                    grid.setdefault(cell, []).append(poi)
+            return location[key]
 
-            if edge.toLocation not in location:
-                for poi in location:
-                    if pygeos.dwithin(edge.toLocation, poi, 1.1 * geom.POINT_PRECISION):
-                        edge.toLocation = poi
-                        break
-                location.add(edge.toLocation)
+        for edge in edges:
+            edge.fromLocation = _weld(edge.fromLocation)
+            edge.toLocation = _weld(edge.toLocation)
 
         """double check zero length edges"""
         edges = [topoedge for topoedge in edges if topoedge.valid]
@@ -188,15 +221,16 @@ class TopoNetwork(object):
                 uniqueNodeDict[edge.toPStr] = [edge]
                 location[edge.toPStr] = edge.toLocation
 
+        nodeIndex = {}
         for i, node in enumerate(list(location.keys())):
             self.nodes.append(TopoNode(i, location[node]))
             self.nodes[-1].connectedEdges = uniqueNodeDict[node]
+            nodeIndex[node] = i
 
         # 2. get the locations of that unique nodes,
-        locationList = [node.location for node in self.nodes]
         for edge in self.edges:
-            fromIdx = locationList.index(edge.fromLocation)
-            toIdx = locationList.index(edge.toLocation)
+            fromIdx = nodeIndex[edge.fromPStr]
+            toIdx = nodeIndex[edge.toPStr]
             self.nodes[fromIdx].neighbor.append(self.nodes[toIdx])
             self.nodes[toIdx].neighbor.append(self.nodes[fromIdx])
             edge.fromP = self.nodes[fromIdx]
@@ -232,54 +266,77 @@ class TopoNetwork(object):
 
         return: TopoNetwork with select edges
         """
-        edge_list = searchBy('level', bld_level, model.wallList)
-        if len(edge_list) == 0:
-            return TopoNetwork()
+        return cls.fromLines(*cls.levelLines(bld_level, model))
+
+    @staticmethod
+    def levelLines(bld_level: float, model) -> tuple[np.ndarray, np.ndarray]:
+        """the compact 2d projections of the walls in a level, which can construct a network by fromLines()
+
+        ---------------------------------
+        bld_level: building level to retrieve in float
+        model: get the walls from this model
+
+        return: (N,) index of the walls in model.wallList, (N,2,2) coordinates of the start and end points
+        """
+        edge_list = model.searchBy('level', bld_level, 'wallList')
         edge_list = [i for i in edge_list if model.wallList[i].force_2d() != None]
         edge_list = [i for i in edge_list if model.wallList[i].height > 0.9]
-        edges = [TopoEdge(i, model.wallList[i]) for i in edge_list]
+        # the points of other geometry types are not valid TopoEdge
+        edge_list = [i for i in edge_list if pygeos.get_type_id(model.wallList[i].force_2d()) == 1]
+        lines = [pygeos.get_coordinates(model.wallList[i].force_2d())[:2] for i in edge_list]
+        return np.array(edge_list, dtype=int), np.array(lines, dtype=np.float64).reshape(-1, 2, 2)
+
+    @staticmethod
+    def planFingerprint(lines: np.ndarray) -> tuple[bytes, np.ndarray]:
+        """fingerprint of the compact 2d projections of the walls (see levelLines()).
+        the end points are snapped to geom.POINT_PRECISION in the same way as TopoEdge and the segments are sorted,
+        so the levels with the same plan (only translated in z) have the same fingerprint.
 
+        ---------------------------------
+        lines: (N,2,2) coordinates of the start and end points
+
+        return: the fingerprint, (N,) order of the sorted segments that matches the walls with the same fingerprint
+        """
+        lines = np.asarray(lines, dtype=np.float64)
+        snapped = pygeos.get_coordinates(pygeos.set_precision(
+            pygeos.points(lines.reshape(-1, 2)), geom.POINT_PRECISION)).reshape(lines.shape)
+        # the snapped coordinates are multiples of the precision, so they are exact as grid indices
+        segments = np.round(snapped / geom.POINT_PRECISION).astype(np.int64)
+        flip = (segments[:, 0, 0] > segments[:, 1, 0]) | (
+                (segments[:, 0, 0] == segments[:, 1, 0]) & (segments[:, 0, 1] > segments[:, 1, 1]))
+        segments[flip] = segments[flip][:, ::-1]
+        segments = segments.reshape(-1, 4)
+        order = np.lexsort(segments.T[::-1])
+        return segments[order].tobytes(), order
+
+    @classmethod
+    def fromLines(cls, ids: Iterable[int], lines: np.ndarray) -> TopoNetwork:
+        """build the network from the compact 2d projections of the walls, see levelLines()
+
+        ---------------------------------
+        ids: index of the walls in the model
+        lines: (N,2,2) coordinates of the start and end points
+
+        return: TopoNetwork with select edges
+        """
+        if len(lines) == 0:
+            return TopoNetwork()
+        edges = [TopoEdge(int(i), line) for i, line in zip(ids, pygeos.linestrings(lines))]
         return TopoNetwork(edges=edges)
 
     @classmethod
     def splitNetwork(cls, oriNetwork: TopoNetwork) -> list[TopoNetwork]:
         """split the network into several isolate part
-        this method can be improved consider the stability facing strange network,
-        especially those with self-interest part
+        the nodes with more than one neighbor are grouped by union-find over the edges,
+        and the parts are in the order of their first node in the network.
         """
+        eligible = {node.idd: node for node in oriNetwork.nodes if len(node.neighbor) > 1}
+        components = _DisjointSet(eligible.keys())
+        for edge in oriNetwork.edges:
+            if edge.fromP.idd in eligible and edge.toP.idd in eligible:
+                components.union(edge.fromP.idd, edge.toP.idd)
 
-        eligible = np.array([node for node in oriNetwork.nodes if len(node.neighbor) > 1])
-        eligible = list(eligible)
-        groups = []
-        while len(eligible) > 0:
-            nodeInGroup = []
-
-            def _findItemBreadth(node: TopoNode):
-                """Recursive Breadth-first search method to find all connected node to the target node
-
-                    ---------------------------------------------
-                    node: target node
-                    avoidPoint: optional nodes that don't want to add in the group
-                    nodeInGroup: please leave blank for this argument
-                    max_depth: maximum iteration to avoid collapse
-
-                    return: list[TopoNode] target nodes which are connected together
-                """
-                if node in nodeInGroup: return False
-                if not (node in eligible): return False
-                nodeInGroup.append(node)
-                for nei in node.neighbor:
-                    _findItemBreadth(nei)
-                return True
-
-            _findItemBreadth(eligible[0])
-
-            groupIndex = [list(eligible).index(item) for item in nodeInGroup]
-            groups.append(nodeInGroup)
-            eligible = np.delete(eligible, groupIndex)
-            eligible = list(eligible)
-
-        return [cls(nodes=nodes) for nodes in groups]
+        return [cls(nodes=[eligible[idd] for idd in group]) for group in components.groups()]
 
     def outerBoundary(self) -> list[TopoBound]:
         """calculate the outer boundary(s) of this network
@@ -350,6 +407,42 @@ class TopoNetwork(object):
 
         return boundary_list
 
+    def minimalBoundaries(self) -> list[TopoBound]:
+        """enumerate all minimal boundaries (faces) of this network in one half-edge (DCEL) traversal.
+        each edge is taken as two half-edges, and the next half-edge of (u->v) is (v->w),
+        where w is the neighbor next to u in the angle-sorted TopoNode.neighbor of v.
+        following the next half-edges, every half-edge is visited once and the faces are in counterclockwise,
+        except for the outer boundary of each isolated part which is in clockwise and would be dropped.
+        """
+        if self.nodes is None or len(self.nodes) < 3:
+            return []
+        neighborIndex = {node.idd: {nei.idd: k for k, nei in enumerate(node.neighbor)} for node in self.nodes}
+
+        boundary_list: list[TopoBound] = []
+        visited = set()
+        for node in self.nodes:
+            for nei in node.neighbor:
+                if (node.idd, nei.idd) in visited:
+                    continue
+                loop: list[TopoNode] = [node]
+                this, other = node, nei
+                while (this.idd, other.idd) not in visited:
+                    visited.add((this.idd, other.idd))
+                    loop.append(other)
+                    k = neighborIndex[other.idd][this.idd]
+                    this, other = other, other.neighbor[(k + 1) % len(other.neighbor)]
+
+                # the loops are broken on the bridges (edges with the same face on both sides)
+                boundary_list += [bound for bound in TopoBound.selfIntersect(TopoBound(loop))
+                                  if _signedArea(bound.nodeLoop) > geom.POINT_PRECISION ** 2]
+        return boundary_list
+
+
+def _signedArea(nodeLoop: list[TopoNode]) -> float:
+    """the area of a closed loop of nodes, positive for counterclockwise"""
+    loc = pygeos.get_coordinates([node.location for node in nodeLoop])
+    return np.sum(loc[:-1, 0] * loc[1:, 1] - loc[1:, 0] * loc[:-1, 1]) / 2
+
 
 class TopoBound(object):
     __slots__ = ('nodeLoop', 'edgeLoop')
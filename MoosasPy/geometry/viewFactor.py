@@ -1,5 +1,5 @@
 from __future__ import annotations
-from .geos import Ray, Vector, rayFaceIntersect, Projection
+from .geos import Ray, Vector, VectorArray, RayArray, rayFaceIntersectBatch, Projection
 from ..utils import np, pygeos
 from ..utils.constant import geom
 from .element import MoosasElement, MoosasWall
@@ -26,13 +26,10 @@ class ViewFactorFace(Ray):
         return (vFF1, vFF2)
 
     def branchTest(self, faces: list[ViewFactorFace], number=100):
-        factor = []
         proj = Projection.fromRay(self)
-        for alt in [-.1,-.05,0,.05,.1]:
-            for j in range(number):
-                vec = Vector.azimuthToVector(5+float(j / int(number-1)) * 360) + Vector(0, 0, alt)
-                if Vector.dot(vec, self.direction) >= 0:
-                    factor.append(Ray(self.origin, vec.unit()))
+        azimuth = VectorArray.azimuthToVector(5 + np.arange(number) / int(number - 1) * 360)
+        vec = VectorArray(np.concatenate([(azimuth + Vector(0, 0, alt)).array for alt in [-.1, -.05, 0, .05, .1]]))
+        factor = RayArray(self.origin, vec[VectorArray.dot(vec, self.direction) >= 0])
         # testFaces = [proj.toUV(f.element.representation()) for f in faces]
         validFaces, representation = [], []
         for f in faces:
@@ -42,24 +39,13 @@ class ViewFactorFace(Ray):
                     representation.append(f.element.representation())
         # validFaces = faces
         # representation = [f.element.representation() for f in faces]
-        for r in factor:
-            dist = []
-            match = False
-            for f, testFace in zip(validFaces, representation):
-                if Vector.dot(f.direction, r.direction) < -geom.POINT_PRECISION:
-                    pt = rayFaceIntersect(r, testFace, normal=f.direction)
-                    if pt:
-                        dists = (r.origin - Vector(pt)).length()
-                        if dists > geom.POINT_PRECISION:
-                            dist.append(dists)
-                            match = True
-                    else:
-                        dist.append(99999)
-                else:
-                    dist.append(99999)
-            if match:
-                self.objects.add(validFaces[np.argmin(dist)])
-
+        if len(validFaces) == 0:
+            return
+        dist, faceIndex, _ = rayFaceIntersectBatch(factor, representation,
+                                                   normals=[f.direction.array for f in validFaces],
+                                                   minDistance=geom.POINT_PRECISION)
+        for i in np.unique(faceIndex[faceIndex >= 0]):
+            self.objects.add(validFaces[i])
 
 
 def viewFactorTopology(model, elementList,vfNumber=64):
@@ -166,15 +166,15 @@ class MoosasModel(MoosasContainer):
             print(f"%.2f" % bld_level, end='')
             if wall_count:
                 print(
-                    f"\t\t{len(searchBy('level', bld_level, self.wallList))}({len(searchBy('level', bld_level, self.wallList)) - wall_count[i]})",
+                    f"\t\t{len(self.searchBy('level', bld_level, 'wallList'))}({len(self.searchBy('level', bld_level, 'wallList')) - wall_count[i]})",
                     end='')
             else:
                 print(
-                    f"\t\t{len(searchBy('level', bld_level, self.wallList))}",
+                    f"\t\t{len(self.searchBy('level', bld_level, 'wallList'))}",
                     end='')
-            print(f"\t\t{len(searchBy('level', bld_level, self.glazingList))}", end='')
-            print(f"\t\t{len(searchBy('level', bld_level, self.skylightList))}", end='')
-            print(f"\t\t{len(searchBy('level', bld_level, self.faceList))}", end='')
+            print(f"\t\t{len(self.searchBy('level', bld_level, 'glazingList'))}", end='')
+            print(f"\t\t{len(self.searchBy('level', bld_level, 'skylightList'))}", end='')
+            print(f"\t\t{len(self.searchBy('level', bld_level, 'faceList'))}", end='')
             print(f"\t\t{len(searchBy('level', bld_level, self.spaceList))}", end='')
             print(
                 f"\t\t{np.round(np.sum([self.spaceList[i].area for i in searchBy('level', bld_level, self.spaceList)]), 1)}\n",
@@ -321,7 +321,7 @@ class MoosasModel(MoosasContainer):
             geoIdSet = set([])
             for f in self.getAllFaces():
                 geoIdSet = geoIdSet.union(mixItemListToList(f.faceId))
-            validGeo = np.array(self.geometryList)[list(geoIdSet)]
+            validGeo = [self.getGeo(faceId) for faceId in geoIdSet]
         features = [
             {
                 "type": "Feature",
@@ -66,17 +66,16 @@ def overlap(inputFile: str, outputFile: str):
     for i, elements in enumerate(elementGroup):
         elements = np.array(elements)
         # project faces to 2d, and group them with the height and faces' category
-        proj = Projection(origin=[0, 0, 0], unitZ=elements[0].normal)
-        faces = [proj.toUV(ele.face) for ele in elements]
+        proj = Projection.cached(origin=[0, 0, 0], unitZ=elements[0].normal)
+        faces = proj.toUVArray([ele.face for ele in elements])
         faceZ = np.array([pygeos.get_coordinates(f, include_z=True)[0] for f in faces])[:,2].flatten()
         faceZ = np.round(faceZ, 2)
         for h in np.unique(faceZ):
             subElements = elements[faceZ == h]
             if len(subElements) > 0:
-                subProj = Projection(origin=[0, 0, 0], unitZ=subElements[0].normal)
-                subElementsFaces = [pygeos.force_2d(subProj.toUV(ele.face)) for ele in subElements]
+                subElementsFaces = pygeos.force_2d(faces[faceZ == h])
                 for j, ele in enumerate(subElements):
-                    print(f"\rprocessing group {subProj.axisZ} on UVHeight {h}: {j}/{len(subElements)}", end='')
+                    print(f"\rprocessing group {proj.axisZ} on UVHeight {h}: {j}/{len(subElements)}", end='')
                     for jk in range(j + 1, len(subElements)):
                         if subElements[j].category == ele.category:
                             # check intersection
@@ -86,7 +85,7 @@ def overlap(inputFile: str, outputFile: str):
                                     intersection) > geom.AREA_PRECISION:
                                 try:
                                     newFaceProj = pygeos.difference(subElementsFaces[j], subElementsFaces[jk])
-                                    newFace = subProj.toWorld(pygeos.force_3d(newFaceProj, z=0))
+                                    newFace = proj.toWorld(pygeos.force_3d(newFaceProj, z=0))
                                     newFaceId = model.includeGeo(newFace, cat=subElements[j].category)
                                     subElements[j].replaceGeo(newFaceId)
                                     treatFaces+=1
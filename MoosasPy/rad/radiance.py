@@ -14,9 +14,9 @@ def _meshToRadObject(geos, material, id):
             print("******Warning: GeometryError, invalid projection while writing rad")
             continue
         try:
-            geoUV = proj.toUV(geo)
+            geoUV = proj.toUVArray([geo])[0]
             triangles = pygeos.delaunay_triangles(geoUV)
-            triangles = [proj.toWorld(tri) for tri in pygeos.get_parts(triangles)]
+            triangles = proj.toWorldArray(pygeos.get_parts(triangles))
             if len(triangles) == 0:
                 return ""
             for trIdx, tri in enumerate(triangles):
@@ -3,7 +3,7 @@ from __future__ import annotations
 from ..utils import path, callCmd,generate_code
 from ..utils import np,os,Iterable
 from ..IO import writeGeo
-from ..geometry.geos import Ray,Vector
+from ..geometry.geos import Ray, Vector, VectorArray, RayArray
 from ..geometry.element import MoosasSpace,MoosasSkylight,MoosasGlazing
 from ..utils.constant import rad
 from ..weather import MoosasCumSky
@@ -130,23 +130,20 @@ def positionRadiation(positionRay: Ray | Iterable[Ray], sky: MoosasCumSky,
             raise Exception('Geo export error: empty model.')
         geo_path = WriteRadGeo(model)
 
+    skyPosition = VectorArray(sky.position).unit()
+    skyValue = np.array(sky.value, dtype=float)
     rays = []
     for pointRay in positionRay:
         # project the direct sun radiation to the pointRay direction
-        thisRays = [Ray(pointRay.origin, pos, value=val) for pos, val in
-                    zip(sky.position, sky.value)]
         # Add ground reflection to the rays
-        nagativeRays = [ra.reverse() for ra in thisRays]
-        for ra in nagativeRays:
-            ra.value *= rad.GROUND_REFLECTION
-        thisRays += nagativeRays
-        for r in thisRays:
-            r.value *= max(Vector.dot(r.direction, pointRay.direction), 0)
-        rays += thisRays
+        thisRays = RayArray(pointRay.origin, np.vstack([skyPosition.array, -skyPosition.array]),
+                            np.concatenate([skyValue, skyValue * rad.GROUND_REFLECTION]))
+        thisRays.value *= np.maximum(VectorArray.dot(thisRays.direction, pointRay.direction), 0)
+        rays.append(thisRays)
+    rays = RayArray.concatenate(rays)
     # whether the ray hit anything
     unHit = np.arange(len(rays))
-    rays = np.array(rays)
-    while reflection >= 0 and len(rays[unHit]) > 0:
+    while reflection >= 0 and len(unHit) > 0:
         newRays = rayTest(rays[unHit], geo_path=geo_path)
         if len(newRays) != len(unHit):
             raise Exception('Ray test error: input and output dont have the same len')
@@ -154,19 +151,19 @@ def positionRadiation(positionRay: Ray | Iterable[Ray], sky: MoosasCumSky,
         for i, thisRay in enumerate(newRays):
             if thisRay is not None:
                 rays[unHit[i]] = thisRay
-                rays[unHit[i]].value *= rad.CONTENT_REFLECTION
+                rays.value[unHit[i]] *= rad.CONTENT_REFLECTION
                 unHitNext.append(unHit[i])
-        unHit = unHitNext
-        if len(rays[unHit]) == 0:
+        unHit = np.array(unHitNext, dtype=int)
+        if len(unHit) == 0:
             break
         reflection -= 1
 
-    rays = np.array([ra.value for ra in rays])
+    rays = rays.value
     rays = rays.reshape(len(positionRay), int(len(rays) / len(positionRay)))
     return np.sum(rays, axis=1)
 
 
-def rayTest(rays: Iterable[Ray], model = None, geo_path: str = None, ray_path: str = None) -> list[
+def rayTest(rays: Iterable[Ray] | RayArray, model = None, geo_path: str = None, ray_path: str = None) -> list[
     Ray | None]:
     """
         call MoosasRad.exe to test the ray face intersection and reflection.
@@ -196,11 +193,14 @@ def rayTest(rays: Iterable[Ray], model = None, geo_path: str = None, ray_path: s
     result_path = os.path.abspath(os.path.join(path.tempDir, prj + '.o'))
 
     # export ray file
-    lines = ''
-    for ra in rays:
-        if not isinstance(ra, Ray):
-            raise Exception(f'expect{Vector},got{type(ra)}')
-        lines += ra.dump() + '\n'
+    if isinstance(rays, RayArray):
+        lines = ''.join([ra + '\n' for ra in rays.dump()])
+    else:
+        lines = ''
+        for ra in rays:
+            if not isinstance(ra, Ray):
+                raise Exception(f'expect{Vector},got{type(ra)}')
+            lines += ra.dump() + '\n'
 
     path.checkBuildDir(ray_path, result_path)
     with open(ray_path, 'w') as f:
@@ -3,7 +3,7 @@ from datetime import datetime
 
 from .rad import rayTest, WriteRadGeo
 from .weather.directsky import MoosasDirectSky
-from .geometry.geos import Vector, Ray
+from .geometry.geos import Vector, Ray, VectorArray, RayArray
 from .utils.date import DateTime
 from .utils import np,Iterable
 from .weather.dest import Location
@@ -63,14 +63,16 @@ def positionSunHour(positionRay: Ray | Iterable[Ray], location: Location = None,
         if leapYear:
             totalDays += 1
 
-    sunPositions = [sunvect for sunvect in sunPositions if sunvect.z >= 0]
-    rayIdx, sunRay = [], []
+    sunPositions = VectorArray(sunPositions)
+    sunPositions = sunPositions[sunPositions.z >= 0]
+    rayIdx, sunRay, rayCount = [], [], 0
     for position in positionRay:
-        validSunRay = [Ray(position.origin, sunvect) for sunvect in sunPositions if
-                       Vector.dot(sunvect, position.direction) > 0]
+        validSunRay = RayArray(position.origin, sunPositions[VectorArray.dot(sunPositions, position.direction) > 0])
 
-        rayIdx.append([len(sunRay), len(sunRay) + len(validSunRay)])
-        sunRay += validSunRay
+        rayIdx.append([rayCount, rayCount + len(validSunRay)])
+        rayCount += len(validSunRay)
+        sunRay.append(validSunRay)
+    sunRay = RayArray.concatenate(sunRay)
 
     refRay = np.array(rayTest(sunRay, geo_path= geo_path))
     if len(refRay) != len(sunRay):
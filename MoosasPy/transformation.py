@@ -5,9 +5,11 @@ https://doi.org/10.1007/s12273-023-1081-6
 """
 from __future__ import annotations
 
+import inspect
 import os.path
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from .geometry.geos import *
 from .models import MoosasModel
@@ -17,10 +19,10 @@ from .IO import modelFromFile, modelToFile, loadRDF, writeRDF
 from .utils.constant import geom
 from .geometry.contour import packing_edges, outerBoundary
 from .encoding.convexify import triangulate2dFace
-from .geometry.spaceGen import BTGSpaceGeneration, CCRSpaceGeneration, VFGSpaceGeneration
+from .geometry.spaceGen import BTGSpaceGeneration, CCRSpaceGeneration, VFGSpaceGeneration, DCELSpaceGeneration
 
 
-def loadModel(filePath:str, fileFormat='turtle') -> MoosasModel:
+def loadModel(filePath:str, fileFormat='turtle', lazy=False) -> MoosasModel:
     """
     Loading MoosasModel from rdf format file. See doc/MoosasRDF for file namespace and description.
 
@@ -30,13 +32,15 @@ def loadModel(filePath:str, fileFormat='turtle') -> MoosasModel:
         any input rdf file
     fileFormat : str, optional
         rdf format, following the definition of rdflib module. Default : 'turtle'
+    lazy : bool, optional
+        keep the raw coordinates of the geometries and build the polygons on first access. Default : False
 
     Returns
     -------
     MoosasModel
         The model for further transformation or analysis.
     """
-    model = loadRDF(filePath, fileFormat=fileFormat)
+    model = loadRDF(filePath, fileFormat=fileFormat, lazy=lazy)
     """2nd level space boundaries topology"""
     model = spaceTopology(model, True)
     model = faceTopology(model)
@@ -72,7 +76,7 @@ def transform(input_path: str, output_path: str = None, geo_path: str = None, in
               output_type: str = None, method=CCRSpaceGeneration,
               solve_duplicated=True, solve_redundant=True, solve_contains=True, triangulate_faces=True,
               break_wall_vertical=True, break_wall_horizontal=True, attach_shading=False,
-              divided_zones=False, standardize=False,
+              divided_zones=False, standardize=False, workers=None,
               stdout=sys.stdout) -> MoosasModel:
     """
     Convert geometric data to structured spatial model with optional processing.
@@ -110,6 +114,7 @@ def transform(input_path: str, output_path: str = None, geo_path: str = None, in
         - VFGSpaceGeneration (L. Jones 2013)
         - BTGSpaceGeneration (H. Chen 2018)
         - CCRSpaceGeneration (J. Xiao 2023)
+        - DCELSpaceGeneration (half-edge minimal face enumeration)
 
     solve_duplicated : bool, optional
         Resolve walls with identical 2D projections (default: True).
@@ -138,6 +143,10 @@ def transform(input_path: str, output_path: str = None, geo_path: str = None, in
     standardize : bool, optional
         Simplify output geometry representations (default: False).
 
+    workers : int, optional
+        Number of processes to cleanse the walls and recognize the contours level by level
+        (default: None, in the main process).
+
     stdout : object, optional
         Output stream for transformation logs (default: sys.stdout).
 
@@ -185,7 +194,8 @@ def transform(input_path: str, output_path: str = None, geo_path: str = None, in
 
     # transformation
     model = structured(model, solve_duplicated, solve_redundant, solve_contains, triangulate_faces, break_wall_vertical,
-                       break_wall_horizontal, attach_shading, divided_zones, standardize, generationMethod=method)
+                       break_wall_horizontal, attach_shading, divided_zones, standardize, generationMethod=method,
+                       workers=workers)
 
     # export the model
     if output_path:
@@ -199,7 +209,7 @@ def transform(input_path: str, output_path: str = None, geo_path: str = None, in
 def structured(model: MoosasModel,
                solve_duplicated=True, solve_redundant=False, solve_contains=False, triangulate_faces=True,
                break_wall_vertical=True, break_wall_horizontal=False, attach_shading=True, divided_zones=False,
-               standardize=False, generationMethod=CCRSpaceGeneration) -> MoosasModel:
+               standardize=False, generationMethod=CCRSpaceGeneration, workers=None) -> MoosasModel:
     """
     Convert a draft model with unstructured geometric data to structured spatial model with optional processing.
 
@@ -214,6 +224,7 @@ def structured(model: MoosasModel,
         - VFGSpaceGeneration (L. Jones 2013)
         - BTGSpaceGeneration (H. Chen 2018)
         - CCRSpaceGeneration (J. Xiao 2023)
+        - DCELSpaceGeneration (half-edge minimal face enumeration)
 
     solve_duplicated : bool, optional
         Resolve walls with identical 2D projections (default: True).
@@ -242,6 +253,13 @@ def structured(model: MoosasModel,
     standardize : bool, optional
         Simplify output geometry representations (default: False).
 
+    workers : int, optional
+        Number of processes to solve the duplicated, overlapped and intersected walls level by level
+        (default: None, in the main process), at most os.cpu_count(). The result is the same as the serial one.
+        The contours of the levels are also recognized in the same pool, if generationMethod accepts
+        an `executor` argument (concurrent.futures.Executor), e.g. CCRSpaceGeneration and DCELSpaceGeneration,
+        and the horizontal faces of the levels are split by the space boundaries in it as well.
+
     Returns
     -------
     MoosasModel
@@ -256,66 +274,81 @@ def structured(model: MoosasModel,
         return
     t0 = time.time()
     t1 = time.time()
+    cacheHit, cacheMiss = MoosasElement.cacheCounter['hit'], MoosasElement.cacheCounter['miss']
+    pairCandidate, pairAll = model.pairCounter['candidate'], model.pairCounter['all']
     model = _classification(model, triangulate_faces, break_wall_vertical)
 
     model.faceList = np.array(model.faceList)
     model.wallList = np.array(model.wallList)
     model.glazingList = np.array(model.glazingList)
 
-    """solve redundant coincident edge for faces that have the same factor"""
-    if solve_redundant:
-        model = solve_redundant_line(model)
-
-    """***We must solve invalid walls.***"""
-    model = solve_invalid_wall(model)
-    model = solve_invalid_face(model)
-    """match glazing"""
-    model = _glazingToFace(model)
-    t2 = time.time()
-
-    '''
-        Deduplication processing: Since the horizontal side has no effect on the recognition result, 
-        only the result based on force2d() on the vertical side is deduplicated
-
-        1. Filter elevations according to the total area of the elevation floor 
-        **The total area is too low, usually sunshades or staircase landings that are not related to the analysis
-
-        2. Use match() to determine the exact overlapping projection lines, and remove one of them directly
-
-        3. Use contains(A,B) to determine the inclusion relationship between large surface A and small surface B:
-            3.1 Use match(A,B) to determine whether there is a small surface C 
-            on the other side after interrupting the large surface A
-            3.2 If there is no small surface, use the broken force_2d () line combined with the elevation to complete 
-            a simple wall surface and replace the original large surface (do not modify the reading data)
-
-        4 Call the dissolve method on three invalid polygons
-            4.1 The bottom elevation and the top elevation are the same/(under fuzzy recognition) 
-            the length is zero/the bottom or top surface has only one point
-            4.2 Invoke the rewrite overlaps algorithm to find adjacent faces
-            4.3 Call dissolve to delete the polygon regardless of whether it is successful or not
-    '''
-    originalWall = [len(searchBy('level', bld_level, model.wallList)) for bld_level in model.levelList]
-
-    """solve redundant coincident edge again after include curtains"""
-    if solve_redundant:
-        model = solve_redundant_line(model)
-
-    """solve duplicated walls that the 2d projections are the same."""
-    if solve_duplicated:
-        model = solve_duplicated_wall(model)
-
-    """***We must solve invalid walls.***"""
-    model = solve_invalid_wall(model)
-    model = solve_invalid_face(model)
-
-    """solve contained walls that the 2d projections are overlapped by others."""
-    if solve_contains:
-        model = solve_overlapped_wall(model)
-
-    """solve the intersection of walls on 2d space"""
-    if break_wall_horizontal:
-        model = solveIntersectionVertical(model)
+    """the walls in different levels can be solved in parallel, one pool is used for all stages"""
+    executor = None
+    if workers is not None:
+        # more processes than cores only add the cost of sending the levels
+        workers = min(workers, os.cpu_count() or 1)
+    if workers is not None and workers > 1 and len(model.levelList) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        """solve redundant coincident edge for faces that have the same factor"""
+        if solve_redundant:
+            model = solveByLevel(model, solve_redundant_line, executor)
+
+        """***We must solve invalid walls.***"""
+        model = solve_invalid_wall(model)
+        model = solve_invalid_face(model)
+        """match glazing"""
+        model = _glazingToFace(model)
+        t2 = time.time()
+
+        '''
+            Deduplication processing: Since the horizontal side has no effect on the recognition result, 
+            only the result based on force2d() on the vertical side is deduplicated
+
+            1. Filter elevations according to the total area of the elevation floor 
+            **The total area is too low, usually sunshades or staircase landings that are not related to the analysis
+
+            2. Use match() to determine the exact overlapping projection lines, and remove one of them directly
+
+            3. Use contains(A,B) to determine the inclusion relationship between large surface A and small surface B:
+                3.1 Use match(A,B) to determine whether there is a small surface C 
+                on the other side after interrupting the large surface A
+                3.2 If there is no small surface, use the broken force_2d () line combined with the elevation to complete 
+                a simple wall surface and replace the original large surface (do not modify the reading data)
+
+            4 Call the dissolve method on three invalid polygons
+                4.1 The bottom elevation and the top elevation are the same/(under fuzzy recognition) 
+                the length is zero/the bottom or top surface has only one point
+                4.2 Invoke the rewrite overlaps algorithm to find adjacent faces
+                4.3 Call dissolve to delete the polygon regardless of whether it is successful or not
+        '''
+        originalWall = [len(model.searchBy('level', bld_level, 'wallList')) for bld_level in model.levelList]
+
+        """solve redundant coincident edge again after include curtains"""
+        if solve_redundant:
+            model = solveByLevel(model, solve_redundant_line, executor)
+
+        """solve duplicated walls that the 2d projections are the same."""
+        if solve_duplicated:
+            model = solveByLevel(model, solve_duplicated_wall, executor)
+
+        """***We must solve invalid walls.***"""
         model = solve_invalid_wall(model)
+        model = solve_invalid_face(model)
+
+        """solve contained walls that the 2d projections are overlapped by others."""
+        if solve_contains:
+            model = solveByLevel(model, solve_overlapped_wall, executor)
+
+        """solve the intersection of walls on 2d space"""
+        if break_wall_horizontal:
+            model = solveByLevel(model, solveIntersectionVertical, executor)
+            model = solve_invalid_wall(model)
+    except BaseException:
+        # the pool is kept for the space generation, see below
+        if executor is not None:
+            executor.shutdown()
+        raise
     t3 = time.time()
 
     """Floor identification of closed areas: // This is the hatch algorithm of AutoCAD, and the effect is average 
@@ -384,14 +417,26 @@ def structured(model: MoosasModel,
     """
 
     """1nd level space boundaries topology"""
-    if divided_zones:
-        """flatten and copy air boundary in all levels to minimize the zones"""
-        model = _copy_air_boundaries(model)
+    try:
+        if divided_zones:
+            """flatten and copy air boundary in all levels to minimize the zones"""
+            model = _copy_air_boundaries(model)
 
-    # CCR method
+        # CCR method
 
-    # # BTG method
-    model = generationMethod(model)
+        # # BTG method
+        if executor is not None and 'executor' in inspect.signature(generationMethod).parameters:
+            model = generationMethod(model, executor=executor)
+        else:
+            if executor is not None:
+                print(f'******Warning: {getattr(generationMethod, "__name__", generationMethod)} '
+                      f'does not accept an executor and runs in the main process')
+            model = generationMethod(model)
+    except BaseException:
+        # the pool is kept for splitting the horizontal faces, see below
+        if executor is not None:
+            executor.shutdown()
+        raise
     t4 = time.time()
 
     """
@@ -403,8 +448,12 @@ def structured(model: MoosasModel,
         above its level, pygeos.contains() gets the first ceiling encountered and feeds it to the model. MoosasFloor
         1.4 Two models. Moosasfloor is combined with a model.Moosasedge to form a model.MoosasSpace
     """
-    model = packing_edges(model, divided_zones)
-    model = solveIntersectionHorizontal(model)
+    try:
+        model = packing_edges(model, divided_zones)
+        model = solveIntersectionHorizontal(model, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
     model = _packing_model(model)
     t5 = time.time()
 
@@ -439,6 +488,10 @@ def structured(model: MoosasModel,
     print(f"Content attachment {'%.3fs' % (t7 - t6)}\t{'%.1f' % ((t7 - t6) / (t7 - t0) * 100)}%\t",
           '\u25A0' * int((t7 - t6) / (t7 - t0) * 50))
     print(f"Total Duration     {'%.3fs' % (t7 - t0)}\t100%")
+    print(f"Element cache      hit {MoosasElement.cacheCounter['hit'] - cacheHit}\t"
+          f"miss {MoosasElement.cacheCounter['miss'] - cacheMiss}")
+    print(f"Wall pair checks   candidate {model.pairCounter['candidate'] - pairCandidate}\t"
+          f"all {model.pairCounter['all'] - pairAll}")
 
     return model
 
@@ -448,7 +501,8 @@ def _classification(model: MoosasModel, triangulate_faces=True, break_wall_verti
         Structuring data by elevation:
         In principle, all changes are made only for MoosasGeometry, ensuring a unique faceId
         1. Point multiplication vectors distinguish horizontal/vertical planes and are packaged into
-        a MoosasFace/MoosasWall** Levels are automatically assigned or generated during __init__ packing process
+        a MoosasFace/MoosasWall** The normals, elevations and levels of the whole library are computed as arrays
+        by the MoosasGeometryStore, and the elements are only built after the levels are clustered (_levelClustering)
         2. Find the transparent object with geo_category=1 and pack it into MoosasGlazing/MoosasSkylight
             2.1 Conversion of glazing to curtain wall for bottom elevation close to floor slab (glazingId==faceId)
         3. Interrupt the wall at full height, and update the bottom projection set self.
@@ -474,100 +528,123 @@ def _classification(model: MoosasModel, triangulate_faces=True, break_wall_verti
             The model for further transformation or analysis.
     """
     if triangulate_faces:
-        delfaces = []
-        for i in range(len(model.geoId)):
-            geo = model.geometryList[i]
-            print(f'\rLOADING: triangulate horizontal faces {i + 1}/{len(model.geoId)}', end='')
-            if np.abs(Vector.dot(geo.normal, pygeos.points([0, 0, 1]))) >= geom.HORIZONTAL_ANGLE_THRESHOLD:
-                if len(geo.holes) > 0:
-                    proj = Projection.fromPolygon(geo.face)
-                    geoProj = proj.toUV(geo.face)
-                    holesProj = [proj.toUV(h) for h in geo.holes]
-                    newHorGeoProj, _ = triangulate2dFace(geoProj, holesProj)
-                    newHorGeos = [proj.toWorld(newHorGeo) for newHorGeo in newHorGeoProj]
-                    for newHorGeo in newHorGeos:
-                        try:
-                            model.includeGeo(newHorGeo, cat=geo.category)
-                        except GeometryError as ge:
-                            print(f"******Warning: {ge}")
-                    delfaces.append(i)
+        store = model.geoStore
+        # only the horizontal faces with holes are triangulated
+        hasHoles = np.diff(store.partOffsets) > 1
+        delfaces = np.flatnonzero((np.abs(store.normal[:, 2]) >= geom.HORIZONTAL_ANGLE_THRESHOLD) & hasHoles)
+        # the repeated faces are instances of one definition, which is triangulated only once
+        definitionFaces = {}
+        for j, i in enumerate(delfaces):
+            geo = store.geometries[i]
+            print(f'\rLOADING: triangulate horizontal faces {j + 1}/{len(delfaces)}', end='')
+            definition, translation = model.instanceOf(geo.faceId)
+            if definition not in definitionFaces:
+                defGeo = model.getGeo(definition)
+                proj = Projection.fromPolygon(defGeo.face)
+                geoProj = proj.toUV(defGeo.face)
+                holesProj = [proj.toUV(h) for h in defGeo.holes]
+                newHorGeoProj, _ = triangulate2dFace(geoProj, holesProj)
+                definitionFaces[definition] = [proj.toWorld(newHorGeo) for newHorGeo in newHorGeoProj]
+            newHorGeos = definitionFaces[definition]
+            if np.any(translation != 0):
+                newHorGeos = [pygeos.apply(newHorGeo, lambda coors: coors + translation, include_z=True)
+                              for newHorGeo in newHorGeos]
+            for newHorGeo in newHorGeos:
+                try:
+                    model.includeGeo(newHorGeo, cat=geo.category)
+                except GeometryError as ge:
+                    print(f"******Warning: {ge}")
 
         model.geoId = list(np.delete(model.geoId, delfaces))
         model.geometryList = list(np.delete(model.geometryList, delfaces))
         print(f'\t\tprocessing faces: {len(delfaces)}')
 
-    for i in range(len(model.geoId)):
-        geo = model.geometryList[i]
-        print(f'\rLOADING: Filtering horizontal faces {i + 1}/{len(model.geoId)}', end='')
-        if np.abs(Vector.dot(geo.normal, pygeos.points([0, 0, 1]))) >= 0.99:
-            if geo.category != 0:
-                # print(' skylight',end='')
-                face = MoosasSkylight(model, geo.faceId)
-                model.skylightList.append(face)
-            else:
-                # print(' opaque', end='')
-                face = MoosasFace(model, geo.faceId)
-                model.faceList.append(face)
-            # print(face.level)
-            if not face.level in model.levelList:
-                model.levelList.append(face.level)
-                model.levelList.sort()
-    print()
-    # Ver1.3 move the incline wall here
-    for i in range(len(model.geoId)):
-        geo = model.geometryList[i]
-        print(f'\rLOADING: Filtering inclined faces {i + 1}/{len(model.geoId)}', end='')
-        if 0.99 > np.abs(Vector.dot(geo.normal, pygeos.points([0, 0, 1]))) >= geom.HORIZONTAL_ANGLE_THRESHOLD:
-            # horizontal faces!
-            if geo.category != 0:
-                # print(' skylight',end='')
-                face = MoosasSkylight(model, geo.faceId)
-                model.skylightList.append(face)
-            else:
-                # print(' opaque', end='')
-                face = MoosasFace(model, geo.faceId)
-                model.faceList.append(face)
-            # print(face.level)
-            if not face.level in model.levelList:
-                model.levelList.append(face.level)
-                model.levelList.sort()
-
-    if len(model.levelList) == 0:
+    # classify the whole library by the z component of the normals
+    store = model.geoStore
+    normalZ = np.abs(store.normal[:, 2])
+    # Ver1.3 the inclined faces are leveled after the flat ones
+    horizontal = np.concatenate([np.flatnonzero(normalZ >= 0.99),
+                                 np.flatnonzero((0.99 > normalZ) & (normalZ >= geom.HORIZONTAL_ANGLE_THRESHOLD))])
+    if len(horizontal) == 0:
         return None
+    print(f'LOADING: Filtering horizontal faces {len(horizontal)}/{len(store)}')
+    height = np.round(store.meanZ()[horizontal], 3)
+    if np.any(np.isnan(height)):
+        raise GeometryError(store.geometries[horizontal[np.isnan(height)][0]].face, "invalid geometry")
+    opaque = store.category[horizontal] == 0
+    area = np.where(opaque, pygeos.area(pygeos.force_2d([store.geometries[i].face for i in horizontal])), 0)
+    levels, levelIdx, remainIdx = _levelClustering(height, area)
+
+    # the faces are put on the merged levels while the skylights stay on their own levels
+    model.levelList = levels[remainIdx == np.arange(len(levels))].tolist()
+    for i, k, h, isOpaque in zip(horizontal, levelIdx, height, opaque):
+        if isOpaque:
+            level = levels[remainIdx[k]]
+            model.faceList.append(MoosasFace(model, store.geometries[i].faceId, level=level, offset=h - level))
+        else:
+            level = levels[k]
+            model.skylightList.append(MoosasSkylight(model, store.geometries[i].faceId, level=level, offset=h - level))
 
-    model = solve_duplicated_level(model)
     print(f'\t\ttotal horizontal faces: {len(model.faceList)} skylights: {len(model.skylightList)}')
     if break_wall_vertical:
         # Ver2.0 break the walls into each level
-        wallList = [model.geoId[i] for i in range(len(model.geoId)) if
-                    np.abs(Vector.dot(model.geometryList[i].normal,
-                                      pygeos.points([0, 0, 1]))) < geom.HORIZONTAL_ANGLE_THRESHOLD]
+        wallList = list(store.faceId[normalZ < geom.HORIZONTAL_ANGLE_THRESHOLD])
         for i, idd in enumerate(wallList):
             model = _break_vertical_faces(model, idd)
             print(f'\rLOADING: Break walls {i + 1}/{len(wallList)}', end='')
-        wallList_new = [model.geoId[i] for i in range(len(model.geoId)) if
-                        np.abs(Vector.dot(model.geometryList[i].normal,
-                                          pygeos.points([0, 0, 1]))) < geom.HORIZONTAL_ANGLE_THRESHOLD]
+        wallList_new = model.geoStore.faceId[
+            np.abs(model.geoStore.normal[:, 2]) < geom.HORIZONTAL_ANGLE_THRESHOLD]
         # print(f'break walls: {len(wallList) - wallcount}')
         print(f'\t\t\tadd walls:{len(wallList_new) - len(wallList)}')
 
-    for i in range(len(model.geoId)):
-        geo = model.geometryList[i]
-        print(f'\rLOADING: Filtering vertical faces {i + 1}/{len(model.geoId)}', end='')
-        if np.abs(Vector.dot(geo.normal, pygeos.points([0, 0, 1]))) < geom.HORIZONTAL_ANGLE_THRESHOLD:
-            # this is the vertical face！
-            if geo.category != 0:
-                # print(' glazing',end='')
-                model.glazingList.append(
-                    MoosasGlazing(model, geo.faceId))
-            else:
-                # print(' wall', end='')
-                model.wallList.append(MoosasWall(model, geo.faceId))
-
+    store = model.geoStore
+    vertical = np.flatnonzero(np.abs(store.normal[:, 2]) < geom.HORIZONTAL_ANGLE_THRESHOLD)
+    print(f'LOADING: Filtering vertical faces {len(vertical)}/{len(store)}')
+    for i in vertical:
+        # this is the vertical face！
+        if store.category[i] != 0:
+            model.glazingList.append(MoosasGlazing(model, store.geometries[i].faceId))
+        else:
+            model.wallList.append(MoosasWall(model, store.geometries[i].faceId))
     print(f"\t\ttotal vertical faces: {len(model.wallList)} glazings: {len(model.glazingList)}")
     return model
 
 
+def _levelClustering(height: np.ndarray, area: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    cluster the elevations of the horizontal faces into building levels.
+    the sorted heights are split where two neighbours are at least geom.LEVEL_MAX_OFFSET apart,
+    each cluster is a level at the height of its first face (in the order of the input),
+    and all faces of the cluster are put on that level.
+    the levels with total floor area less than geom.LEVEL_MIN_AREA are merged into the remaining level below them.
+
+    Parameters
+    ----------
+    height : np.ndarray
+        (N,) elevations of the faces
+    area : np.ndarray
+        (N,) floor area of the faces, use 0 for the faces which are not counted as floors
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        (L,) sorted levels, (N,) index of the level of each face,
+        (L,) index of the remaining level each level is merged into (itself for the remaining levels).
+    """
+    order = np.argsort(height, kind='stable')
+    isStart = np.diff(height[order], prepend=-np.inf) >= geom.LEVEL_MAX_OFFSET
+    start = np.flatnonzero(isStart)
+    levels = height[np.minimum.reduceat(order, start)]
+    levelIdx = np.empty(len(height), dtype=int)
+    levelIdx[order] = np.cumsum(isStart) - 1
+
+    levelArea = np.add.reduceat(area[order], start)
+    keep = levelArea >= geom.LEVEL_MIN_AREA
+    keep[0] = True
+    remainIdx = np.maximum.accumulate(np.where(keep, np.arange(len(levels)), 0))
+    return levels, levelIdx, remainIdx
+
+
 def _matchFaceGlazing(face: MoosasFace | MoosasWall, glazing: MoosasSkylight | MoosasGlazing) -> bool:
     """
     attach the glazing element to the face or wall element.
@@ -602,11 +679,66 @@ def _matchFaceGlazing(face: MoosasFace | MoosasWall, glazing: MoosasSkylight | M
             return False
 
 
+def _candidateFaces(geometries: list[pygeos.Geometry], targets: list[pygeos.Geometry], tolerance: float,
+                    number: int = None, rankBy: tuple[list, list] = None) -> list[np.ndarray]:
+    """
+    find the targets within the tolerance distance of each geometry.
+    the targets are indexed once by pygeos.STRtree, and the distances of the candidate pairs are filtered in one call.
+    a geometry without any target within the tolerance falls back to the nearest targets at any distance.
+
+    Parameters
+    ----------
+    geometries : list[pygeos.Geometry]
+        the geometries to match
+    targets : list[pygeos.Geometry]
+        the potential targets
+    tolerance : float
+        the max distance between a geometry and its targets
+    number : int
+        the max number of targets returned for each geometry, None for all
+    rankBy : tuple[list, list]
+        other representations of (geometries, targets) whose distance is used to sort the candidates,
+        default the same as the geometries and targets
+
+    Returns
+    -------
+    list[np.ndarray]
+        the indices of the targets for each geometry, sorted by the distance (then by the index)
+    """
+    candidates = [np.zeros(0, dtype=int) for _ in range(len(geometries))]
+    if len(geometries) == 0 or len(targets) == 0:
+        return candidates
+    geometries, targets = np.array(geometries), np.array(targets)
+    bounds = pygeos.bounds(geometries)
+    boxes = pygeos.box(bounds[:, 0] - tolerance, bounds[:, 1] - tolerance,
+                       bounds[:, 2] + tolerance, bounds[:, 3] + tolerance)
+    source, target = pygeos.STRtree(targets).query_bulk(boxes)
+    dist = pygeos.distance(geometries[source], targets[target])
+    valid = dist <= tolerance
+    source, target, dist = source[valid], target[valid], dist[valid]
+    if rankBy is not None:
+        dist = pygeos.distance(np.array(rankBy[0])[source], np.array(rankBy[1])[target])
+    order = np.lexsort((target, dist, source))
+    source, target = source[order], target[order]
+    splitAt = np.flatnonzero(np.diff(source)) + 1
+    for src, tar in zip(np.split(source, splitAt), np.split(target, splitAt)):
+        if len(src) > 0:
+            candidates[src[0]] = tar[:number]
+
+    """k-nearest search for the geometries far from all targets"""
+    rankGeometries, rankTargets = (geometries, targets) if rankBy is None else map(np.array, rankBy)
+    for i in [i for i, tar in enumerate(candidates) if len(tar) == 0]:
+        dist = pygeos.distance(rankGeometries[i], rankTargets)
+        candidates[i] = np.lexsort((np.arange(len(targets)), dist))[:number]
+    return candidates
+
+
 def _glazingToFace(model: MoosasModel) -> MoosasModel:
     """
         check each glazings and skylights to find their parent faces.
         if not found, the glazings/ skylights will be changed to a curtain wall or glass roof, whose faceId == glazingId
         but still need to have a copy in model.glazingList/model.skylightList
+        only the faces within the matching tolerance (found by STRtree in each level) will be checked.
 
         Parameters
         ----------
@@ -630,15 +762,19 @@ def _glazingToFace(model: MoosasModel) -> MoosasModel:
     #     elements,_types = eleList[eleIds],eleType[eleIds]
     #     glazings,walls = elements[_types==1],elements[_types==0]
     for bld_level in model.levelList:
-        windowList = np.array(model.glazingList)[searchBy('level', bld_level, model.glazingList)]
-        wallList = np.array(model.wallList)[searchBy('level', bld_level, model.wallList)]
-        for window in windowList:
+        windowList = model.searchBy('level', bld_level, 'glazingList', asObject=True)
+        wallList = model.searchBy('level', bld_level, 'wallList', asObject=True)
+        # the nearest 5 walls (by the bottom lines) within the tolerance are tried,
+        # or the nearest 5 at any distance if no wall is that close
+        candidates = _candidateFaces([w.force_2d(region=True) for w in windowList],
+                                     [w.force_2d(region=True) for w in wallList],
+                                     tolerance=2 * geom.POINT_PRECISION, number=5,
+                                     rankBy=([w.force_2d() for w in windowList], [w.force_2d() for w in wallList]))
+        for window, wallIdx in zip(windowList, candidates):
             glsCount += 1
             print(f"\rLOADING: Matching glazing {glsCount}/{len(model.glazingList)}", end='')
             located = False
-            dist = np.argsort([pygeos.distance(window.force_2d(), w.force_2d()) for w in wallList])
-            # print(pygeos.distance(window.force_2d(), wallList[dist][0].force_2d()))
-            for wall in wallList[dist][:min(5,len(wallList))]:
+            for wall in wallList[wallIdx]:
                 if _matchFaceGlazing(wall, window):
                     located = True
                     validGlsCount += 1
@@ -654,11 +790,21 @@ def _glazingToFace(model: MoosasModel) -> MoosasModel:
     """match skylight"""
     print(f"\rLOADING: Matching skylight", end='')
     validSkyCount = 0
+    skylightFloor, skylightLevel = {}, {}
+    for skyIdx, skylight in enumerate(model.skylightList):
+        skylightLevel.setdefault(skylight.level, []).append(skyIdx)
+    for level, skyIdx in skylightLevel.items():
+        floor = model.searchBy('level', level, 'faceList', asObject=True)
+        candidates = _candidateFaces([model.skylightList[i].force_2d(region=True) for i in skyIdx],
+                                     [fl.force_2d(region=True) for fl in floor], tolerance=2 * geom.POINT_PRECISION)
+        for i, floorIdx in zip(skyIdx, candidates):
+            skylightFloor[i] = list(floor[np.sort(floorIdx)])
+    # the glass roofs are also the candidates of the later skylights in the same level
+    glassRoof = {level: [] for level in skylightLevel}
     for glsCount, skylight in enumerate(model.skylightList):
         print(f"\rLOADING: Matching skylight {glsCount}/{len(model.skylightList)}", end='')
-        floor = np.array(model.faceList)[searchBy('level', skylight.level, model.faceList)]
         located = False
-        for fl in floor:
+        for fl in skylightFloor[glsCount] + glassRoof[skylight.level]:
             if _matchFaceGlazing(fl, skylight):
                 located = True
                 validSkyCount += 1
@@ -668,6 +814,7 @@ def _glazingToFace(model: MoosasModel) -> MoosasModel:
             skyfloor = MoosasFace(model=model, faceId=skylight.faceId)
             skyfloor.add_glazing(skylight)
             model.faceList = list(np.append(model.faceList, [skyfloor]))
+            glassRoof[skylight.level].append(skyfloor)
     print("\t\t\tmatched skylight: ", validSkyCount)
     return model
 
@@ -690,7 +837,7 @@ def _break_vertical_faces(model: MoosasModel, faceId) -> MoosasModel:
             The model for further transformation or analysis.
     """
 
-    geo: pygeos.Geometry = model.geometryList[model.geoId.index(faceId)]
+    geo: pygeos.Geometry = model.getGeo(faceId)
     cat = geo.category
     geo = geo.face
     z = [coor[2] for coor in pygeos.get_coordinates(geo, include_z=True)]
@@ -776,8 +923,8 @@ def _packing_model(model: MoosasModel) -> MoosasModel:
     topology = [{'floor': None, 'ceiling': None} for _ in model.edgeList]
     prs = 0
     for bld_level in model.levelList:
-        edge = searchBy('level', bld_level, model.edgeList)
-        face = searchBy('level', bld_level, model.faceList)
+        edge = model.searchBy('level', bld_level, 'edgeList')
+        face = model.searchBy('level', bld_level, 'faceList')
         for edx, i in enumerate(edge):
             prs += 1
             try:
@@ -809,8 +956,8 @@ def _packing_model(model: MoosasModel) -> MoosasModel:
     print('\rPACKING: Match ceilings', end='')
     prs = 0
     for bld_level, top_level in zip(model.levelList[:-1], model.levelList[1:]):
-        edge = searchBy('level', bld_level, model.edgeList)
-        face = searchBy('level', top_level, model.faceList)
+        edge = model.searchBy('level', bld_level, 'edgeList')
+        face = model.searchBy('level', top_level, 'faceList')
         for i in edge:
             prs += 1
             try:
@@ -1314,8 +1461,8 @@ def _attach_shading(model: MoosasModel) -> MoosasModel:
         centroid = face.getWeightCenter()
         bld_level = [level for level in model.levelList if level < centroid[2]]
         if len(bld_level) > 0:
-            glazing = list(np.array(model.glazingList)[searchBy('level', bld_level[-1], model.glazingList)])
-            glazing += list(np.array(model.skylightList)[searchBy('level', bld_level[-1], model.skylightList)])
+            glazing = list(model.searchBy('level', bld_level[-1], 'glazingList', asObject=True))
+            glazing += list(model.searchBy('level', bld_level[-1], 'skylightList', asObject=True))
             if len(glazing) == 0: continue
             target_glazing = [glazing[0], 10000.0]
             face_2d = face.force_2d()
@@ -1347,7 +1494,7 @@ def _copy_air_boundaries(model: MoosasModel) -> MoosasModel:
     for levelIdx, bld_level in enumerate(model.levelList[:-1]):
         outerBound = outerBoundary(model, bld_level)
         if outerBound is not None:
-            wallInLevel = np.array(model.wallList)[searchBy("level", bld_level, model.wallList)]
+            wallInLevel = model.searchBy('level', bld_level, 'wallList', asObject=True)
             for wid, w in enumerate(model.wallList):
                 print(f'\rTOPOLOGY: Copy air boundaries in level {bld_level} {wid}/{len(model.wallList)}', end='')
                 if w.level != bld_level:
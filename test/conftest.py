@@ -0,0 +1,33 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from MoosasPy.geometry.element import MoosasContainer
+from MoosasPy.geometry.cleanse import solve_invalid_wall, solve_invalid_face
+from MoosasPy.IO._geo import _readGeo
+from MoosasPy.transformation import _classification, _glazingToFace
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _loadModel(fileName: str) -> MoosasContainer:
+    """the model after the classification and glazing matching.
+    a MoosasContainer is used, since the building template of MoosasModel is not needed in the tests
+    """
+    model = MoosasContainer()
+    model.geometryList = _readGeo(os.path.join(TEST_DIR, fileName))
+    model.geoId = [geo.faceId for geo in model.geometryList]
+    model.newIndex = len(model.geoId)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = _classification(model)
+        model = solve_invalid_wall(model)
+        model = solve_invalid_face(model)
+        model = _glazingToFace(model)
+    return model
+
+
+@pytest.fixture
+def loadModel():
+    return _loadModel
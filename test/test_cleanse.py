@@ -0,0 +1,102 @@
+"""the grouping kernels of geometry.cleanse against their reference loops"""
+import numpy as np
+import pygeos
+
+from MoosasPy.geometry.cleanse import _DisjointSet, _groupRelateArray, _groupByNormal, _groupByCollinear
+from MoosasPy.geometry.geos import Vector
+
+
+def _groupByNormalLoop(listToGroup, listOfNormal):
+    """the greedy matching replaced by _groupByNormal"""
+    normalGroup, uniqueNormal = [[len(listOfNormal) - 1]], [listOfNormal[-1]]
+    for i, nor in enumerate(listOfNormal[:-1]):
+        for g, un in enumerate(uniqueNormal):
+            if Vector.parallel(nor, un):
+                normalGroup[g].append(i)
+                break
+        else:
+            normalGroup.append([i])
+            uniqueNormal.append(nor)
+    return [[listToGroup[i] for i in group] for group in normalGroup]
+
+
+def test_groupByNormal_same_as_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        directions = rng.normal(size=(4, 3))
+        normals = [directions[rng.integers(4)] * rng.choice([-1, 1]) * rng.uniform(0.5, 2)
+                   + rng.normal(scale=1e-4, size=3) for _ in range(30)]
+        items = list(range(30))
+        assert _groupByNormal(items, normals) == _groupByNormalLoop(items, normals)
+
+
+def test_groupByNormal_axis_directions():
+    normals = [[0, 0, 1], [1, 0, 0], [0, 0, -1], [-1, 0, 0], [0, 1, 0]]
+    assert _groupByNormal(list('abcde'), normals) == [['e'], ['a', 'c'], ['b', 'd']]
+
+
+def test_groupByNormal_isolates_zero_normals():
+    x, y, zero = [1, 0, 0], [0, 1, 0], [0, 0, 0]
+    assert _groupByNormal([0, 1, 2, 3], [zero, x, y, x]) == [[3, 1], [2], [0]]
+    assert _groupByNormal([0, 1, 2], [x, y, zero]) == [[1], [0], [2]]
+    assert _groupByNormal([0, 1], [zero, zero]) == [[0, 1]]
+    assert _groupByNormal([], []) == []
+
+
+def _componentsBySearch(sequences) -> list[set]:
+    """the connected components of the keys by a breadth-first search"""
+    neighbors = {}
+    for sequence in sequences:
+        for key in sequence:
+            neighbors.setdefault(key, set()).update(sequence)
+    components, visited = [], set()
+    for key in neighbors:
+        if key not in visited:
+            component, front = {key}, [key]
+            while front:
+                front = [other for k in front for other in neighbors[k] if other not in component]
+                component.update(front)
+            visited |= component
+            components.append(component)
+    return components
+
+
+def test_disjointSet():
+    disjointSet = _DisjointSet(range(6))
+    disjointSet.union(4, 1)
+    disjointSet.union(1, 3)
+    disjointSet.union('a', 5)
+    assert disjointSet.find(3) == disjointSet.find(4)
+    assert disjointSet.find(0) == 0
+    assert disjointSet.groups() == [[0], [1, 3, 4], [2], [5, 'a']]
+
+
+def test_groupRelateArray_same_as_search():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        sequences = [list(rng.integers(0, 40, rng.integers(1, 4))) for _ in range(25)]
+        groups = _groupRelateArray(sequences)
+        assert sorted(map(sorted, groups)) == sorted(map(sorted, _componentsBySearch(sequences)))
+        assert sum(map(len, groups)) == len({key for sequence in sequences for key in sequence})
+
+
+def test_groupByCollinear_same_as_pairs():
+    rng = np.random.default_rng(0)
+    angles = np.radians([0, 30, 90])
+    for _ in range(50):
+        angle, sign = rng.choice(angles, 40), rng.choice([-1, 1], 40)
+        direction = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+        normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1) * sign[:, None]
+        offset = rng.choice([0, 0.03, 1, 2.5], 40) * sign
+        start = normal * offset[:, None] + direction * rng.uniform(-5, 5, (40, 1))
+        lines = pygeos.linestrings(np.stack([start, start + direction * rng.uniform(0.5, 2, (40, 1))], axis=1))
+        normals = np.concatenate([normal, np.zeros((40, 1))], axis=1)
+
+        # collinear pairs: the same direction facing the same side, and the offsets within POINT_PRECISION
+        pairs = [[i] for i in range(40)]
+        for i in range(40):
+            for j in range(i):
+                if angle[i] == angle[j] and sign[i] == sign[j] and abs(offset[i] - offset[j]) <= 0.05:
+                    pairs.append([i, j])
+        groups = _groupByCollinear(list(range(40)), list(normals), list(lines))
+        assert sorted(map(sorted, groups)) == sorted(map(sorted, _componentsBySearch(pairs)))
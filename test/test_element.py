@@ -0,0 +1,45 @@
+"""the indexes and caches of MoosasContainer against plain scans"""
+import pytest
+
+from MoosasPy.utils.tools import searchBy
+
+
+def _scan(model, level, listName):
+    return searchBy('level', level, list(getattr(model, listName)))
+
+
+def test_searchBy_same_as_scan(loadModel):
+    model = loadModel('test1_officeHighrise.geo')
+    for listName in ['wallList', 'faceList', 'glazingList']:
+        for level in model.levelList:
+            assert model.searchBy('level', level, listName) == _scan(model, level, listName)
+
+
+def test_searchBy_follows_changes(loadModel):
+    model = loadModel('test1_officeHighrise.geo')
+    low, high = model.levelList[0], model.levelList[1]
+    model.searchBy('level', low, 'wallList')
+
+    # the level of an element is changed
+    model.wallList[0].level = high
+    assert model.searchBy('level', high, 'wallList') == _scan(model, high, 'wallList')
+
+    # an element is replaced in place, the length of the list is not changed
+    other = model.searchBy('level', low, 'wallList', asObject=True)[0]
+    model.wallList[1] = other
+    assert model.searchBy('level', low, 'wallList') == _scan(model, low, 'wallList')
+
+
+def test_searchBy_only_level(loadModel):
+    model = loadModel('test0_6spacesIntersection.geo')
+    with pytest.raises(ValueError):
+        model.searchBy('Uid', model.wallList[0].Uid, 'wallList')
+
+
+def test_level_of_detached_element(loadModel):
+    model = loadModel('test0_6spacesIntersection.geo')
+    wall = model.wallList[0]
+    level = wall.level
+    wall.parent = None
+    wall.level = level + 1.0
+    assert wall.level == level + 1.0
@@ -0,0 +1,64 @@
+"""the batch kernels of geometry.geos against their scalar versions"""
+import numpy as np
+import pygeos
+
+from MoosasPy.geometry.geos import Ray, Projection, rayFaceIntersect, rayFaceIntersectBatch
+
+
+def _randomRectangles(rng, number: int) -> tuple[list[pygeos.Geometry], np.ndarray]:
+    """axis aligned rectangles and the axis of their normals"""
+    faces, axes = [], rng.integers(0, 3, number)
+    for axis in axes:
+        low, size, position = rng.uniform(-5, 5, 2), rng.uniform(0.5, 3, 2), rng.uniform(-5, 5)
+        corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]]) * size + low
+        faces.append(pygeos.polygons(np.insert(corners, axis, position, axis=1)))
+    return faces, axes
+
+
+def _scalarHit(ray: Ray, face: pygeos.Geometry, axis: int) -> float | None:
+    """the distance to the hit of rayFaceIntersect on the plane, which is inside the rectangle"""
+    hit = rayFaceIntersect(ray, face, infinity_face=True)
+    if hit is None:
+        return None
+    hit = pygeos.get_coordinates(hit, include_z=True)[0]
+    corners = np.delete(pygeos.get_coordinates(face, include_z=True), axis, axis=1)
+    if np.all(np.delete(hit, axis) >= corners.min(axis=0)) and np.all(np.delete(hit, axis) <= corners.max(axis=0)):
+        return np.linalg.norm(hit - ray.origin.array)
+    return None
+
+
+def test_rayFaceIntersectBatch_same_as_scalar():
+    rng = np.random.default_rng(0)
+    faces, axes = _randomRectangles(rng, 40)
+    rays = [Ray(rng.uniform(-6, 6, 3), rng.normal(size=3)) for _ in range(150)]
+    distance, faceIndex, point = rayFaceIntersectBatch(rays, faces)
+    for i, ray in enumerate(rays):
+        hits = [(_scalarHit(ray, face, axis), j) for j, (face, axis) in enumerate(zip(faces, axes))]
+        hits = [hit for hit in hits if hit[0] is not None]
+        if len(hits) == 0:
+            assert faceIndex[i] == -1 and np.isinf(distance[i])
+        else:
+            nearest, j = min(hits)
+            assert faceIndex[i] == j
+            assert np.isclose(distance[i], nearest)
+            assert np.allclose(point[i], ray.origin.array + nearest * ray.direction.array)
+
+
+def test_projection_arrays_same_as_scalar():
+    rng = np.random.default_rng(0)
+    geometries = [pygeos.points(rng.uniform(-5, 5, 3)),
+                  pygeos.linestrings(rng.uniform(-5, 5, (3, 3))),
+                  pygeos.polygons([[0, 0, 1], [4, 0, 1], [4, 3, 2], [0, 3, 2]], holes=[[[1, 1, 1.3], [1, 2, 1.6],
+                                                                                       [2, 2, 1.6], [2, 1, 1.3]]])]
+    for _ in range(10):
+        projection = Projection(rng.uniform(-5, 5, 3), rng.normal(size=3))
+        uv = projection.toUVArray(geometries)
+        for geometry, scalar in zip(uv, [projection.toUV(g) for g in geometries[:2]]):
+            assert np.allclose(pygeos.get_coordinates(geometry, include_z=True),
+                               pygeos.get_coordinates(scalar, include_z=True))
+        assert pygeos.get_num_interior_rings(uv[2]) == 1
+        world = projection.toWorldArray(uv)
+        for geometry, original in zip(world, geometries):
+            assert pygeos.get_type_id(geometry) == pygeos.get_type_id(original)
+            assert np.allclose(pygeos.get_coordinates(geometry, include_z=True),
+                               pygeos.get_coordinates(original, include_z=True))
@@ -0,0 +1,31 @@
+"""the *.geo files written by writeGeo are read back as the same geometries"""
+import numpy as np
+import pygeos
+import pytest
+
+from MoosasPy.geometry.element import MoosasContainer
+from MoosasPy.IO._geo import writeGeo, _readGeo
+
+
+def _geometries(geometries) -> list:
+    return [(geo.faceId, geo.category, geo.coordinates.tolist(), [h.tolist() for h in geo.holeCoordinates],
+             pygeos.get_coordinates(geo.normal, include_z=True).tolist()) for geo in geometries]
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_geo_round_trip(tmp_path, lazy):
+    model = MoosasContainer()
+    shell = np.array([[0, 0, 0], [6, 0, 0], [6, 4, 0], [0, 4, 0]])
+    hole = np.array([[2, 1, 0], [2, 3, 0], [3, 3, 0], [3, 1, 0]])
+    for offset in [[0, 0, 0], [0, 0, 3.5], [10, 5, 3.5]]:
+        model.includeGeo(pygeos.polygons(shell + offset, holes=[hole + offset]))
+    model.includeGeo(pygeos.polygons([[0, 0, 0], [0, 4, 0], [0, 4, 3], [0, 0, 3]]), cat=1)
+
+    geoStr = writeGeo(str(tmp_path / 'model.geo'), geoList=list(model.geometryList), instanced=True)
+    # the translated copies of the first slab are written as instance blocks
+    assert sum(line.startswith('i,') for line in geoStr.splitlines()) == 2
+    geometries = _readGeo(str(tmp_path / 'model.geo'), lazy=lazy)
+    assert _geometries(geometries) == _geometries(model.geometryList)
+    for geo, other in zip(geometries, model.geometryList):
+        assert np.array_equal(pygeos.get_coordinates(geo.face, include_z=True),
+                              pygeos.get_coordinates(other.face, include_z=True))
@@ -0,0 +1,63 @@
+"""the stages run level by level in a process pool give the same model as the serial ones"""
+import contextlib
+import copy
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from MoosasPy.geometry.cleanse import (solveByLevel, solve_redundant_line, solve_duplicated_wall,
+                                       solve_overlapped_wall, solveIntersectionVertical, solveIntersectionHorizontal)
+from MoosasPy.geometry.spaceGen import CCRSpaceGeneration, DCELSpaceGeneration
+from MoosasPy.transformation import packing_edges
+
+
+def _loops(boundaryList) -> list:
+    """the boundaries as sorted wall ids, the start and the order of the loops are not compared"""
+    return sorted(sorted(wall.Uid for wall in loop) for loop in boundaryList)
+
+
+def _elements(elementList) -> list:
+    return [(element.Uid, element.contentHash) for element in elementList]
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize('method', [CCRSpaceGeneration, DCELSpaceGeneration])
+def test_generation_workers(method, executor, loadModel):
+    model = loadModel('test1_officeHighrise.geo')
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial = _loops(method(model).boundaryList)
+        model.boundaryList = []
+        parallel = _loops(method(model, executor=executor).boundaryList)
+    assert len(serial) > 0
+    assert parallel == serial
+
+
+def test_cleanse_workers(executor, loadModel):
+    model = loadModel('test7_horizontalIntersection.geo')
+    for stage in [solve_redundant_line, solve_duplicated_wall, solve_overlapped_wall, solveIntersectionVertical]:
+        other = copy.deepcopy(model)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = solveByLevel(model, stage)
+            other = solveByLevel(other, stage, executor)
+        assert _elements(other.wallList) == _elements(model.wallList), stage.__name__
+        assert other.geoId == model.geoId, stage.__name__
+
+
+def test_split_faces_workers(executor, loadModel):
+    model = loadModel('test7_horizontalIntersection.geo')
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = packing_edges(CCRSpaceGeneration(model), False)
+        other = copy.deepcopy(model)
+        faceCount = len(model.faceList)
+        model = solveIntersectionHorizontal(model)
+        other = solveIntersectionHorizontal(other, executor)
+    assert len(model.faceList) > faceCount
+    assert _elements(other.faceList) == _elements(model.faceList)
+    assert _elements(other.skylightList) == _elements(model.skylightList)
+    assert other.geoId == model.geoId
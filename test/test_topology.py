@@ -0,0 +1,67 @@
+"""the hash grids and the face enumeration of geometry.topology against the pairwise checks and CCR"""
+import contextlib
+import io
+
+import numpy as np
+import pygeos
+
+from MoosasPy.geometry.spaceGen import CCRSpaceGeneration, DCELSpaceGeneration
+from MoosasPy.geometry.topology import TopoEdge, TopoNetwork
+
+
+def _randomEdges(rng, number: int) -> list[TopoEdge]:
+    """edges between few grid points, moved by at most one precision step, so many of them are duplicated"""
+    points = rng.integers(0, 4, (number, 2, 2)) * 0.5 + rng.integers(-1, 2, (number, 2, 2)) * 0.05
+    return [TopoEdge(i, line) for i, line in enumerate(pygeos.linestrings(points))]
+
+
+def test_duplicateEdge_same_as_pairs():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        edges = _randomEdges(rng, 60)
+        expected = [i for i in range(len(edges))
+                    if any(TopoEdge.overlap(edges[i], edges[j]) for j in range(i + 1, len(edges)))]
+        assert TopoEdge.duplicateEdge(edges) == expected
+
+
+def test_planFingerprint():
+    rng = np.random.default_rng(0)
+    lines = rng.integers(0, 400, (30, 2, 2)) * 0.05
+    fingerprint, order = TopoNetwork.planFingerprint(lines)
+
+    # the same plan in another order, with reversed segments and the noise within half of the precision
+    permutation = rng.permutation(30)
+    other = lines[permutation] + rng.uniform(-0.01, 0.01, (30, 2, 2))
+    other[::3] = other[::3, ::-1]
+    otherFingerprint, otherOrder = TopoNetwork.planFingerprint(other)
+    assert otherFingerprint == fingerprint
+    # the walls matched by the orders are the same
+    assert np.array_equal(permutation[otherOrder], order)
+
+    moved = lines.copy()
+    moved[0] += 1
+    assert TopoNetwork.planFingerprint(moved)[0] != fingerprint
+
+
+def _edgeLoops(boundaries) -> list:
+    return sorted(sorted(edge.modelId for edge in bound.edgeLoop) for bound in boundaries)
+
+
+def test_minimalBoundaries_rooms():
+    # three rooms in a row (walls 0-9) and a separate square (walls 10-13)
+    lines = [[[0, 0], [2, 0]], [[2, 0], [4, 0]], [[4, 0], [6, 0]], [[6, 0], [6, 2]], [[6, 2], [4, 2]],
+             [[4, 2], [2, 2]], [[2, 2], [0, 2]], [[0, 2], [0, 0]], [[2, 0], [2, 2]], [[4, 0], [4, 2]],
+             [[10, 0], [11, 0]], [[11, 0], [11, 1]], [[11, 1], [10, 1]], [[10, 1], [10, 0]]]
+    network = TopoNetwork.fromLines(range(len(lines)), np.array(lines, dtype=float))
+    assert _edgeLoops(network.minimalBoundaries()) == [[0, 6, 7, 8], [1, 5, 8, 9], [2, 3, 4, 9], [10, 11, 12, 13]]
+
+
+def test_minimalBoundaries_same_as_ccr(loadModel):
+    model = loadModel('test1_officeHighrise.geo')
+    with contextlib.redirect_stdout(io.StringIO()):
+        ccr = CCRSpaceGeneration(model).boundaryList
+        model.boundaryList = []
+        dcel = DCELSpaceGeneration(model).boundaryList
+    assert len(ccr) > 0
+    assert sorted(sorted(wall.Uid for wall in loop) for loop in dcel) == \
+           sorted(sorted(wall.Uid for wall in loop) for loop in ccr)
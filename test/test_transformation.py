@@ -0,0 +1,75 @@
+"""the array kernels of the transformation against plain loops"""
+import contextlib
+import io
+
+import numpy as np
+import pygeos
+
+from MoosasPy.geometry.element import MoosasContainer
+from MoosasPy.transformation import _candidateFaces, _levelClustering, _classification
+
+
+def _randomLines(rng, number: int, size: float) -> np.ndarray:
+    start = rng.uniform(0, size, (number, 2))
+    return pygeos.linestrings(np.stack([start, start + rng.uniform(-1, 1, (number, 2))], axis=1))
+
+
+def test_candidateFaces_same_as_ranking():
+    rng = np.random.default_rng(0)
+    geometries, targets = _randomLines(rng, 60, 20), _randomLines(rng, 80, 20)
+    for tolerance, number in [(0.1, 5), (0.5, None), (2.0, 3)]:
+        candidates = _candidateFaces(geometries, targets, tolerance, number=number)
+        for geometry, candidate in zip(geometries, candidates):
+            dist = pygeos.distance(geometry, targets)
+            ranking = np.lexsort((np.arange(len(targets)), dist))
+            within = ranking[dist[ranking] <= tolerance]
+            expected = within if len(within) > 0 else ranking
+            assert candidate.tolist() == expected[:number].tolist()
+
+
+def test_candidateFaces_far_geometry_gets_nearest():
+    geometries = [pygeos.linestrings([[0, 0], [1, 0]]), pygeos.linestrings([[0, 5], [1, 5]])]
+    targets = [pygeos.linestrings([[0, 0.05], [1, 0.05]]), pygeos.linestrings([[0, 3], [1, 3]]),
+               pygeos.linestrings([[0, 9], [1, 9]])]
+    near, far = _candidateFaces(geometries, targets, 0.1, number=2)
+    assert near.tolist() == [0]
+    assert far.tolist() == [1, 2]
+
+
+def test_levelClustering_gaps_and_merging():
+    height = np.array([3.5, 0.0, 3.0, 0.3, 7.0, 6.8, 4.5, 10.0])
+    area = np.array([20.0, 50.0, 20.0, 10.0, 1.0, 1.0, 0.0, 30.0])
+    levels, levelIdx, remainIdx = _levelClustering(height, area)
+    # 3.0 -> 3.5 -> 4.5 are chained by gaps below LEVEL_MAX_OFFSET, the first face of a cluster gives its level
+    assert levels.tolist() == [0.0, 3.5, 7.0, 10.0]
+    assert levelIdx.tolist() == [1, 0, 1, 0, 2, 2, 1, 3]
+    # the level at 7.0 has too little floor area and is merged into 3.5
+    assert remainIdx.tolist() == [0, 1, 1, 3]
+
+
+def test_levelClustering_merges_into_remaining_level():
+    levels, levelIdx, remainIdx = _levelClustering(np.array([0.0, 3.0, 6.0, 9.0]), np.array([0.0, 1.0, 1.0, 9.0]))
+    assert levels.tolist() == [0.0, 3.0, 6.0, 9.0]
+    assert levelIdx.tolist() == [0, 1, 2, 3]
+    # the bottom level is always kept and consecutive small levels all go to it
+    assert remainIdx.tolist() == [0, 0, 0, 3]
+
+
+def test_classification_triangulates_definitions_once():
+    model = MoosasContainer()
+    shell = [[0, 0, 0], [6, 0, 0], [6, 4, 0], [0, 4, 0]]
+    hole = [[2, 1, 0], [3, 1, 0], [3, 3, 0], [2, 3, 0]]
+    for z in [0, 3.5, 7]:
+        model.includeGeo(pygeos.polygons(np.array(shell) + [0, 0, z], holes=[np.array(hole) + [0, 0, z]]))
+    assert len(model.geoDefinitions) == 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        _classification(model, break_wall_vertical=False)
+
+    # the holed slabs are replaced by the pieces of the definition, moved onto each instance
+    pieces = [[pygeos.get_coordinates(face.face, include_z=True) for face in model.faceList if face.level == z]
+              for z in [0, 3.5, 7]]
+    assert len(pieces[0]) > 1
+    for level, z in zip(pieces[1:], [3.5, 7]):
+        assert len(level) == len(pieces[0])
+        for moved, original in zip(level, pieces[0]):
+            assert np.allclose(moved, original + [0, 0, z])